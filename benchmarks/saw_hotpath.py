@@ -0,0 +1,99 @@
+"""Benchmark the SAW hot paths against the in-process SimAuto stand-in.
+
+Times GetParametersMultipleElement, clean_df_or_series,
+change_parameters_multiple_element_df, get_ybus and get_lodf_matrix on
+synthetic cases of increasing size, so that conversion and parsing
+overhead in SAW can be measured without PowerWorld:
+
+    python -m benchmarks.saw_hotpath --scales 1000 10000 80000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from gridwb.saw import SAW
+from gridwb.fake_simauto import FakeSimAuto, synthetic_case, write_ybus
+
+
+def timed(fn, repeat: int) -> float:
+    """Return the best wall clock time of repeat calls to fn."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_scale(n_bus: int, repeat: int, lodf_max_bus: int) -> dict:
+    case = synthetic_case(n_bus)
+    saw = SAW("synthetic.pwb", pwcom=FakeSimAuto(case))
+    fields = saw.GetFieldList("branch")["internal_field_name"].tolist()
+    results = {}
+
+    results["GetParametersMultipleElement"] = timed(
+        lambda: saw.GetParametersMultipleElement("branch", fields), repeat
+    )
+
+    # Clean a fresh copy of the raw string frame each time.
+    saw.pw_order = True
+    raw = saw.GetParametersMultipleElement("branch", fields)
+    saw.pw_order = False
+    results["clean_df_or_series"] = timed(
+        lambda: saw.clean_df_or_series(raw.copy(), "branch"), repeat
+    )
+
+    keys = saw.get_key_field_list("branch")
+    df = saw.GetParametersMultipleElement("branch", keys + ["LineLimMVA"])
+    results["change_parameters_multiple_element_df"] = timed(
+        lambda: saw.change_parameters_multiple_element_df("branch", df), repeat
+    )
+
+    # Parse a pre-written file, then the full round trip.
+    with tempfile.NamedTemporaryFile(suffix=".mat", delete=False) as f:
+        path = f.name
+    write_ybus(path, case.ybus())
+    results["get_ybus (parse)"] = timed(
+        lambda: saw.get_ybus(full=False, file=path), repeat
+    )
+    os.unlink(path)
+    results["get_ybus"] = timed(lambda: saw.get_ybus(full=False), repeat)
+    results["get_ybus (native)"] = timed(
+        lambda: saw.get_ybus(full=False, native=True), repeat
+    )
+    results["get_branch_admittance"] = timed(saw.get_branch_admittance, repeat)
+
+    if n_bus <= lodf_max_bus:
+        results["get_lodf_matrix"] = timed(saw.get_lodf_matrix, repeat)
+
+    saw.exit()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scales", nargs="+", type=int, default=[1000, 10000, 80000],
+        help="Number of buses of each synthetic case.",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Repeats per measurement."
+    )
+    parser.add_argument(
+        "--lodf-max-bus", type=int, default=1000,
+        help="Largest case to run get_lodf_matrix on.",
+    )
+    args = parser.parse_args()
+
+    for n_bus in args.scales:
+        print(f"{n_bus} buses")
+        for name, seconds in bench_scale(
+            n_bus, args.repeat, args.lodf_max_bus
+        ).items():
+            print(f"    {name:<40s} {seconds * 1e3:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
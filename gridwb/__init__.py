@@ -11,10 +11,15 @@
     not respected by PowerWorld/SimAuto. This exception is only raised
     via SAW helper methods like
     ``change_and_confirm_params_multiple_element``
+*   warmup_kernels: Compile or load the cached contingency analysis
+    kernels ahead of their first use.
+*   kernel_backends: Report whether the contingency analysis kernels
+    run on numba or on the numpy fallbacks.
 *   __version__: ESA's version.
 """
 # Please keep the docstring above up to date with all the imports.
 from .saw import SAW, PowerWorldError, COMError, CommandNotRespectedError,\
     Error
+from ._performance_jit import warmup_kernels, kernel_backends
 
 __version__ = "1.3.5"
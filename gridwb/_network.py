@@ -0,0 +1,162 @@
+"""Vectorized builders for network matrices (admittance and incidence)
+from branch and bus columns. These are shared by SAW and the workbench,
+so that both assemble matrices the same way.
+"""
+
+import numpy as np
+from scipy.sparse import csr_matrix, coo_matrix
+
+BRANCH_KINDS = {"line": "Line", "transformer": "Transformer"}
+
+
+def bus_index(bus_numbers, buses) -> np.ndarray:
+    """Map bus numbers to their positions in a listing of buses.
+
+    :param bus_numbers: Array of bus numbers to map, e.g. the from bus
+        of every branch.
+    :param buses: Array of the bus numbers of the case, in matrix
+        order. They need not be sorted or contiguous.
+
+    :returns: Integer array of positions in buses, one per bus number.
+
+    :raises KeyError: if a bus number is not in buses.
+    """
+    buses = np.asarray(buses)
+    bus_numbers = np.asarray(bus_numbers)
+    order = np.argsort(buses, kind="mergesort")
+    ordered = buses[order]
+    pos = np.searchsorted(ordered, bus_numbers)
+    pos[pos == len(ordered)] = 0
+    if bus_numbers.size and (
+        not len(ordered) or not np.array_equal(ordered[pos], bus_numbers)
+    ):
+        missing = np.setdiff1d(bus_numbers, ordered)
+        raise KeyError(f"Buses {missing[:10].tolist()} are not in the case.")
+    return order[pos]
+
+
+def branch_mask(status=None, device_type=None, closed_only=False, kind=None):
+    """Select branches by status and device type.
+
+    :param status: Array of LineStatus values ("Closed"/"Open").
+    :param device_type: Array of BranchDeviceType values.
+    :param closed_only: Set to True to drop open branches.
+    :param kind: "line" or "transformer" to keep only that kind of
+        branch, or None to keep both.
+
+    :returns: Boolean array, True for the branches to keep, or None if
+        every branch is kept.
+    """
+    keep = None
+    if closed_only:
+        keep = np.asarray(status) == "Closed"
+    if kind is not None:
+        if kind not in BRANCH_KINDS:
+            raise ValueError(f"kind must be one of {list(BRANCH_KINDS)}.")
+        is_kind = np.asarray(device_type) == BRANCH_KINDS[kind]
+        keep = is_kind if keep is None else keep & is_kind
+    return keep
+
+
+def incidence(f, t, n_bus: int, keep=None, sign: int = 1, fmt: str = "csr", dtype=float):
+    """Build the branch to bus incidence matrix.
+
+    :param f: Position of the from bus of every branch.
+    :param t: Position of the to bus of every branch.
+    :param n_bus: Number of buses.
+    :param keep: Optional boolean array. Branches where it is False get
+        no row.
+    :param sign: Entry of the from bus. The to bus gets -sign.
+    :param fmt: Sparse format of the result, "csr" or "csc".
+    :param dtype: Data type of the entries.
+
+    :returns: A (branches x buses) sparse matrix.
+    """
+    f = np.asarray(f)
+    t = np.asarray(t)
+    if keep is not None:
+        keep = np.asarray(keep, dtype=bool)
+        f = f[keep]
+        t = t[keep]
+    n = len(f)
+    rows = np.repeat(np.arange(n), 2)
+    cols = np.column_stack([f, t]).ravel()
+    vals = np.tile(np.array([sign, -sign], dtype=dtype), n)
+    return coo_matrix((vals, (rows, cols)), shape=(n, n_bus)).asformat(fmt)
+
+
+def branch_admittance(f, t, r, x, c, tap, phase, n_bus: int, closed=None, g=None):
+    """Build the branch admittance matrices Yf and Yt, which map bus
+    voltages to the current injected at the from and to end of every
+    branch.
+
+    :param f: Position of the from bus of every branch.
+    :param t: Position of the to bus of every branch.
+    :param r: Series resistance in per unit.
+    :param x: Series reactance in per unit.
+    :param c: Total line charging susceptance in per unit.
+    :param tap: Off-nominal tap ratio (1 for lines).
+    :param phase: Phase shift in degrees.
+    :param n_bus: Number of buses.
+    :param closed: Optional boolean array, False for open branches.
+        Open branches keep their row, but carry no current.
+    :param g: Optional total shunt conductance in per unit. Like the
+        charging susceptance, half of it is at each end.
+
+    :returns: Yf and Yt as (branches x buses) csr matrices.
+    """
+    yff, yft, ytf, ytt = _branch_terms(r, x, c, tap, phase, closed, g)
+    n = len(yff)
+    i = np.r_[np.arange(n), np.arange(n)]
+    j = np.r_[f, t]
+    Yf = csr_matrix((np.r_[yff, yft], (i, j)), (n, n_bus))
+    Yt = csr_matrix((np.r_[ytf, ytt], (i, j)), (n, n_bus))
+    return Yf, Yt
+
+
+def bus_admittance(
+    f, t, r, x, c, tap, phase, n_bus: int, closed=None, ysh=None, g=None
+):
+    """Build the bus admittance matrix, Ybus.
+
+    See branch_admittance for the branch parameters.
+
+    :param ysh: Optional shunt admittance of every bus, in per unit.
+
+    :returns: Ybus as an (buses x buses) csr matrix.
+    """
+    yff, yft, ytf, ytt = _branch_terms(r, x, c, tap, phase, closed, g)
+    rows = [f, f, t, t]
+    cols = [f, t, f, t]
+    vals = [yff, yft, ytf, ytt]
+    if ysh is not None:
+        rows.append(np.arange(n_bus))
+        cols.append(np.arange(n_bus))
+        vals.append(np.asarray(ysh, dtype=complex))
+    Ybus = coo_matrix(
+        (np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(n_bus, n_bus),
+    )
+    return Ybus.tocsr()
+
+
+def _branch_terms(r, x, c, tap, phase, closed=None, g=None):
+    """Return the four entries (ff, ft, tf, tt) of every branch's two
+    port admittance, with a complex tap on the from side. The shunt
+    admittance g + jc is split evenly between the ends."""
+    ys = 1 / (np.asarray(r, dtype=float) + 1j * np.asarray(x, dtype=float))
+    ysh = 1j * np.asarray(c, dtype=float)
+    if g is not None:
+        ysh = ysh + np.asarray(g, dtype=float)
+    if closed is not None:
+        closed = np.asarray(closed, dtype=bool)
+        ys = np.where(closed, ys, 0)
+        ysh = np.where(closed, ysh, 0)
+    tap = np.asarray(tap, dtype=float) * np.exp(
+        1j * np.pi / 180 * np.asarray(phase, dtype=float)
+    )
+    ytt = ys + ysh / 2
+    yff = ytt / (tap * np.conj(tap))
+    yft = -ys / np.conj(tap)
+    ytf = -ys / tap
+    return yff, yft, ytf, ytt
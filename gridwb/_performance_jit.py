@@ -8,6 +8,11 @@ try:  # pragma: no cover
 except ImportError:
     use_numba = False
 
+if use_numba:  # pragma: no cover
+    prange = nb.prange
+else:  # pragma: no cover
+    prange = range
+
 
 def _initialize_bound(bpmax, bpmin, bnmax, bnmin, A):
     bp0 = A.copy()
@@ -40,9 +45,171 @@ def _calculate_bound(bp, bn, Amax1, Amin1, Wbuf1, Wbuf2):
     return np.maximum(wb1, wb2)
 
 
-if use_numba:  # pragma: no cover
-    initialize_bound = nb.njit()(_initialize_bound)
-    calculate_bound = nb.njit()(_calculate_bound)
-else:  # pragma: no cover
-    initialize_bound = _initialize_bound
-    calculate_bound = _calculate_bound
+def _initialize_bound_tile(bpmax, bpmin, bnmax, bnmin, A, AT, rows):
+    # Rows of the bound of _initialize_bound, from A[rows, :] and
+    # AT = A[:, rows].T, so the full A is never needed.
+    r, n = A.shape
+    w = np.empty_like(A)
+    for i in range(r):
+        k = rows[i]
+        for j in range(n):
+            a = A[i, j]
+            at = AT[i, j]
+            b1 = max(bpmax[k] * a, bpmin[k] * a) + max(bpmax[j] * at, bpmin[j] * at)
+            b2 = max(bnmax[k] * a, bnmin[k] * a) + max(bnmax[j] * at, bnmin[j] * at)
+            w[i, j] = max(b1, b2)
+    return w
+
+
+def _initialize_bound_tile_numpy(bpmax, bpmin, bnmax, bnmin, A, AT, rows):
+    # Vectorized _initialize_bound_tile, for when numba is not available.
+    def buf(vmax, vmin):
+        return np.maximum(vmax[rows, None] * A, vmin[rows, None] * A) + np.maximum(
+            vmax * AT, vmin * AT
+        )
+
+    return np.maximum(buf(bpmax, bpmin), buf(bnmax, bnmin))
+
+
+def _n2_violations(lodf, f, lim, A0, rows, offsets, out, counts, fake):
+    # Enumerate the pairs (i, j > i) flagged in A0 for each i in rows, in
+    # parallel over rows. The violations of rows[r] are written to out
+    # from offsets[r] on, and their number to counts[r]. Pairs with a
+    # singular outage matrix are counted in fake[r].
+    length = len(f)
+    for r in prange(len(rows)):
+        i = rows[r]
+        idx = offsets[r]
+        f_new = np.zeros(length)
+        for j in range(i + 1, A0.shape[1]):
+            if A0[i, j]:
+                temp1 = lodf[i, i] * lodf[j, j]
+                temp2 = lodf[i, j] * lodf[j, i]
+                det = temp1 - temp2
+                if det == 0:
+                    fake[r] += 1
+                else:
+                    num = 0
+                    temp3 = lodf[j, j] * f[i] - lodf[i, j] * f[j]
+                    temp4 = lodf[i, i] * f[j] - lodf[j, i] * f[i]
+                    xq_0 = temp3 / det
+                    xq_1 = temp4 / det
+                    for k in range(length):
+                        f_new[k] = f[k] - lodf[k, i] * xq_0 - lodf[k, j] * xq_1
+                        if abs(f_new[k]) > lim[k]:
+                            num = num + 1
+                    if f_new[i] > lim[i]:
+                        num = num - 1
+                    if f_new[j] > lim[j]:
+                        num = num - 1
+                    if num > 0:
+                        out[idx, 0] = i
+                        out[idx, 1] = j
+                        out[idx, 2] = num
+                        idx += 1
+        counts[r] = idx - offsets[r]
+
+
+def _n2_violations_numpy(lodf, f, lim, A0, rows, offsets, out, counts, fake):
+    # Vectorized _n2_violations, for when numba is not available. Pairs
+    # are handled in blocks of columns of the post-contingency flows, and
+    # threads can share the rows as numpy releases the GIL.
+    block = max(1, 2**22 // max(len(f), 1))
+    for r in range(len(rows)):
+        i = rows[r]
+        idx = offsets[r]
+        candidates = i + 1 + np.flatnonzero(A0[i, i + 1 :])
+        fake[r] = 0
+        for start in range(0, len(candidates), block):
+            js = candidates[start : start + block]
+            det = lodf[i, i] * lodf[js, js] - lodf[i, js] * lodf[js, i]
+            singular = det == 0
+            fake[r] += np.sum(singular)
+            js, det = js[~singular], det[~singular]
+            xq_0 = (lodf[js, js] * f[i] - lodf[i, js] * f[js]) / det
+            xq_1 = (lodf[i, i] * f[js] - lodf[js, i] * f[i]) / det
+            f_new = f[:, None] - lodf[:, i, None] * xq_0 - lodf[:, js] * xq_1
+            num = np.sum(np.abs(f_new) > lim[:, None], axis=0)
+            num -= f_new[i] > lim[i]
+            num -= f_new[js, np.arange(len(js))] > lim[js]
+            hit = num > 0
+            n = np.sum(hit)
+            out[idx : idx + n, 0] = i
+            out[idx : idx + n, 1] = js[hit]
+            out[idx : idx + n, 2] = num[hit]
+            idx += n
+        counts[r] = idx - offsets[r]
+
+
+# Kernel registry: name -> (kernel, fallback without numba, numba options).
+# Kernels are compiled with cache=True, so the machine code is stored
+# next to this module and later processes load it instead of compiling.
+KERNELS = {
+    "initialize_bound": (_initialize_bound, _initialize_bound, {}),
+    "calculate_bound": (_calculate_bound, _calculate_bound, {}),
+    "initialize_bound_tile": (
+        _initialize_bound_tile,
+        _initialize_bound_tile_numpy,
+        {},
+    ),
+    "n2_violations": (_n2_violations, _n2_violations_numpy, {"parallel": True}),
+}
+
+
+def _build(name: str):
+    kernel, fallback, options = KERNELS[name]
+    if use_numba:  # pragma: no cover
+        return nb.njit(cache=True, **options)(kernel)
+    return fallback  # pragma: no cover
+
+
+initialize_bound = _build("initialize_bound")
+calculate_bound = _build("calculate_bound")
+initialize_bound_tile = _build("initialize_bound_tile")
+n2_violations = _build("n2_violations")
+
+
+def kernel_backends() -> dict:
+    """Return the backend of each contingency kernel: "numba" if numba
+    is installed, otherwise "numpy" for the vectorized fallbacks or
+    "python" for plain Python loops."""
+    if use_numba:  # pragma: no cover
+        return {name: "numba" for name in KERNELS}
+    return {  # pragma: no cover
+        name: "python" if kernel is fallback else "numpy"
+        for name, (kernel, fallback, _) in KERNELS.items()
+    }
+
+
+def warmup_kernels(dtypes=(np.float64,)) -> dict:
+    """Compile (or load from the on-disk cache) the contingency kernels
+    for the given float types, e.g. right after starting a worker
+    process, so the first analysis does not pay for it.
+
+    :param dtypes: Float types to compile the bounding kernels for. Add
+        np.float32 when using n2_fast(dtype=np.float32).
+
+    :returns: Dictionary of the seconds spent on each kernel.
+    """
+    from time import perf_counter
+
+    seconds = dict.fromkeys(KERNELS, 0.0)
+
+    def run(name, *args):
+        start = perf_counter()
+        globals()[name](*args)
+        seconds[name] += perf_counter() - start
+
+    rows = np.arange(2)
+    for dtype in dtypes:
+        v = np.zeros(2, dtype=dtype)
+        m = np.zeros((2, 2), dtype=dtype)
+        run("initialize_bound", v, v, v, v, m)
+        run("calculate_bound", m, m, v, v, m, m)
+        run("initialize_bound_tile", v, v, v, v, m, m, rows)
+    f = np.ones(2)
+    idx = np.zeros(2, dtype=np.int64)
+    A0 = np.zeros((2, 2), dtype=bool)
+    out = np.zeros((0, 3))
+    run("n2_violations", np.eye(2), f, f, A0, rows, idx, out, idx.copy(), idx.copy())
+    return seconds
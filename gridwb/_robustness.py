@@ -0,0 +1,192 @@
+"""Vectorized network robustness metrics. The functions take branch and
+bus columns as arrays, so they can be evaluated for many operating
+points without building graphs.
+"""
+
+import numpy as np
+from scipy.sparse import coo_matrix, csr_matrix, diags, identity
+from scipy.sparse.linalg import splu
+
+
+def rcf(from_bus, to_bus, flow, max_percent) -> np.ndarray:
+    """Compute the RCF robustness metric of one or more operating points.
+
+    Every branch is directed along its flow. A bus's outgoing branches
+    take a share p of its total outflow. The nodal robustness is
+    -sum(tolerance * p * log10(p)), where a branch's tolerance is
+    100 / LineMaxPercent. RCF sums the nodal robustness weighted by each
+    bus's share of all flow. Parallel branches count separately.
+
+    :param from_bus: Position of the from bus of every branch.
+    :param to_bus: Position of the to bus of every branch.
+    :param flow: Branch flows (LineMW) from the from bus, either one
+        array or one row per operating point.
+    :param max_percent: Branch loadings (LineMaxPercent), in the shape
+        of flow or one array for all operating points.
+
+    :returns: The RCF value, or an array of one value per row of flow.
+    """
+    from_bus = np.asarray(from_bus, dtype=np.int64)
+    to_bus = np.asarray(to_bus, dtype=np.int64)
+    flow = np.asarray(flow, dtype=float)
+    single = flow.ndim == 1
+    flow = np.atleast_2d(flow)
+    max_percent = np.broadcast_to(np.asarray(max_percent, dtype=float), flow.shape)
+    n_case = flow.shape[0]
+    n_bus = int(max(from_bus.max(initial=-1), to_bus.max(initial=-1))) + 1
+
+    # One group per (operating point, source bus)
+    source = np.where(flow < 0, to_bus, from_bus)
+    group = (source + n_bus * np.arange(n_case)[:, None]).ravel()
+    size = n_case * n_bus
+    w = np.abs(flow).ravel()
+
+    outflow = np.bincount(group, weights=w, minlength=size)
+    total = np.where(outflow == 0, 0.000001, outflow)
+    p = w / total[group]
+    tolerance = 100 / (max_percent.ravel() + 0.000001)
+    # Some p = 0, and assume the base is 10
+    nodal_robust = -np.bincount(
+        group, weights=tolerance * p * np.log10(p + 1e-6), minlength=size
+    ).reshape(n_case, n_bus)
+
+    outflow = outflow.reshape(n_case, n_bus)
+    significance = outflow / outflow.sum(axis=1, keepdims=True)
+    res = (nodal_robust * significance).sum(axis=1)
+    return res[0] if single else res
+
+
+def energy_flow_matrix(
+    gen_bus,
+    gen_flow,
+    load_bus,
+    load_flow,
+    from_bus,
+    to_bus,
+    flow,
+    loss,
+    n_bus: int,
+    split_generator: bool = True,
+) -> csr_matrix:
+    """Assemble the energy flow matrix (EFM) of ecological network
+    analysis. The actors are, in order: the source, the generators, the
+    buses, the load sink and the loss sink. Entry (i, j) is the flow from
+    actor i to actor j.
+
+    :param gen_bus: Bus position of every generator.
+    :param gen_flow: Output of every generator.
+    :param load_bus: Bus position of every load.
+    :param load_flow: Demand of every load.
+    :param from_bus: Position of the from bus of every branch.
+    :param to_bus: Position of the to bus of every branch.
+    :param flow: Branch flows from the from bus.
+    :param loss: Branch losses, taken from the from bus.
+    :param n_bus: Number of buses.
+    :param split_generator: Set to False to merge the generators of each
+        bus into one actor.
+
+    :returns: The EFM as a csr_matrix.
+    """
+    gen_bus = np.asarray(gen_bus, dtype=np.int64)
+    gen_flow = np.asarray(gen_flow, dtype=float)
+    if not split_generator:
+        gen_bus, actor = np.unique(gen_bus, return_inverse=True)
+        gen_flow = np.bincount(actor, weights=gen_flow, minlength=len(gen_bus))
+    from_bus = np.asarray(from_bus, dtype=np.int64)
+    to_bus = np.asarray(to_bus, dtype=np.int64)
+    flow = np.asarray(flow, dtype=float)
+    n_gen = len(gen_bus)
+    size = n_gen + n_bus + 3
+    gens = 1 + np.arange(n_gen)
+    bus = 1 + n_gen
+    load_sink = 1 + n_gen + n_bus
+    loss_sink = 2 + n_gen + n_bus
+    forward = flow > 0
+    rows = [
+        np.zeros(n_gen, dtype=np.int64),  # source to generators
+        gens,  # generators to their buses
+        bus + np.asarray(load_bus, dtype=np.int64),  # buses to the load sink
+        bus + np.where(forward, from_bus, to_bus),  # along the branch flows
+        bus + from_bus,  # branch losses
+    ]
+    cols = [
+        gens,
+        bus + gen_bus,
+        np.full(len(rows[2]), load_sink),
+        bus + np.where(forward, to_bus, from_bus),
+        np.full(len(from_bus), loss_sink),
+    ]
+    vals = [
+        gen_flow,
+        gen_flow,
+        np.asarray(load_flow, dtype=float),
+        np.abs(flow),
+        np.abs(np.asarray(loss, dtype=float)),
+    ]
+    return coo_matrix(
+        (np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(size, size),
+    ).tocsr()
+
+
+def ecological_metrics(T, block: int = 256) -> tuple:
+    """Compute the ecological network metrics of an energy flow matrix.
+
+    :param T: Energy flow matrix, as returned by energy_flow_matrix.
+    :param block: Number of right-hand sides per sparse solve when
+        computing the diagonal of Leontief's inverse.
+
+    :returns: A tuple of the Ecological Robustness (Reco), the Ascendancy
+        (ASC), the Development Capacity (DC), the Cycled Throughflow
+        (tstc), the Finn Cycling Index (CI) and the Total System Overhead
+        (TSO).
+    """
+    T = csr_matrix(T, dtype=float)
+    T.sum_duplicates()
+    s = T.shape[0]
+    k = 1  # coefficient variable
+    tstp = T.sum()
+    T_csum = np.asarray(T.sum(axis=0)).ravel()  # sum over colums
+    T_rsum = np.asarray(T.sum(axis=1)).ravel()  # sum over rows
+
+    # P = T^T, so its row sums are the column sums of T
+    P = T.T.tocsr()
+    P_rsum = T_csum
+    if P_rsum[1] != 0:
+        Q = diags((P_rsum > 0) / P_rsum[1]) @ P
+    else:
+        Q = csr_matrix((s, s))
+
+    # Diagonal of N = inv(eye(s) - Q), Leontief's Inverse
+    lu = splu((identity(s, format="csc") - Q).tocsc())
+    inner = np.arange(1, s - 2)
+    d_N = np.empty(len(inner))
+    for start in range(0, len(inner), block):
+        idx = inner[start : start + block]
+        rhs = np.zeros((s, len(idx)))
+        rhs[idx, np.arange(len(idx))] = 1
+        d_N[start : start + block] = lu.solve(rhs)[idx, np.arange(len(idx))]
+
+    inflow = T[0].sum()
+    internal_flow = T[2 : s - 2].sum()
+
+    # total system throughflow (inflow + internal_flow)
+    tstf = inflow + internal_flow
+
+    c_re = (d_N - 1) / d_N  # cycling efficiency vector
+    tstc = np.dot(c_re, P_rsum[1 : s - 2])  # cycled throughflow
+    ci = tstc / tstf  # Finn Cycling Index (CI)
+
+    # Entropy terms over the nonzero flows
+    C = T.tocoo()
+    t = C.data
+    den = T_rsum[C.row] * T_csum[C.col]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = np.where(den == 0, 0, t * tstp / den)
+        ami = np.sum(np.where(value > 0, t / tstp * np.log2(value), 0))
+        asc = ami * tstp  # Ascendancy (ASC)
+        dc = -np.sum(np.where(t / tstp > 0, t * np.log2(t / tstp), 0))
+
+    tso = dc - asc  # Total System Overhead (TSO)
+    reco = -1 * k * (asc / dc) * np.log(asc / dc)  # Robustness (R)
+    return reco, asc, dc, tstc, ci, tso
@@ -0,0 +1,961 @@
+"""fake_simauto provides FakeSimAuto, an in-process stand-in for
+PowerWorld's ``pwrworld.SimulatorAuto`` COM object, and
+synthetic_case, which builds an in-memory case of a requested size.
+
+The stand-in answers the SimAuto functions used by SAW with the same
+tuple shapes SimAuto returns (an error string followed by the data, all
+values as strings), so SAW can be exercised off Windows and without a
+PowerWorld license:
+
+.. code:: python
+
+    >>> from gridwb import SAW
+    >>> from gridwb.fake_simauto import FakeSimAuto, synthetic_case
+    >>> saw = SAW("fake.pwb", pwcom=FakeSimAuto(synthetic_case(1000)))
+
+Nothing is solved. Power flow, LODF and shift factor results are
+plausible synthetic numbers, and the Ybus written by
+SaveYbusInMatlabFormat is assembled from the case's branch data.
+"""
+
+import datetime
+import json
+import os
+import re
+
+import numpy as np
+from scipy.sparse import csr_matrix, coo_matrix, diags, bmat
+
+# Data types as reported by GetFieldList.
+INTEGER = "Integer"
+REAL = "Real"
+STRING = "String"
+
+# Virtual fields computed on request. The location number selects the
+# outaged branch (LODFMult) or the monitored branch (MultBusTLRSens).
+_VIRTUAL_FIELDS = {
+    "branch": "LODFMult",
+    "bus": "MultBusTLRSens",
+}
+
+# Tokenizer for the values inside an auxiliary file DATA section.
+_AUX_TOKEN = re.compile(r'"[^"]*"|\'[^\']*\'|[^\s"\']+')
+_AUX_DATA = re.compile(
+    r"DATA\s*\(\s*([^,\s]+)\s*,\s*\[(.*?)\][^)]*\)\s*\{(.*?)\}",
+    re.DOTALL | re.IGNORECASE,
+)
+_AUX_SCRIPT = re.compile(r"SCRIPT\s*[^{]*\{(.*?)\}", re.DOTALL | re.IGNORECASE)
+_AUX_FILTER = re.compile(
+    r"FILTER\s*\(([^)]*)\)\s*\{(.*?)<SUBDATA\s+Condition>(.*?)</SUBDATA>\s*\}",
+    re.DOTALL | re.IGNORECASE,
+)
+# Double quoted JSON strings, with escaped quotes.
+_AUX_STRING = re.compile(r'"(?:[^"\\]|\\.)*"')
+
+# Advanced filter conditions modelled by the fake, on numbers (or
+# strings for String fields).
+_FILTER_CONDITIONS = {
+    "=": lambda v, a, b: v == a,
+    "<>": lambda v, a, b: v != a,
+    ">": lambda v, a, b: v > a,
+    "<": lambda v, a, b: v < a,
+    ">=": lambda v, a, b: v >= a,
+    "<=": lambda v, a, b: v <= a,
+    "between": lambda v, a, b: (v >= a) & (v <= b),
+    "notbetween": lambda v, a, b: (v < a) | (v > b),
+    "contains": lambda v, a, b: np.char.find(v.astype(str), a) >= 0,
+    "notcontains": lambda v, a, b: np.char.find(v.astype(str), a) < 0,
+    "startswith": lambda v, a, b: np.char.startswith(v.astype(str), a),
+}
+_SUBDATA = re.compile(r"<SUBDATA.*?</SUBDATA>", re.DOTALL | re.IGNORECASE)
+_SCRIPT_CALL = re.compile(r"^\s*(\w+)\s*(?:\((.*)\))?\s*$", re.DOTALL)
+
+
+class FakeTable(object):
+    """One object type of a FakeCase. Values are kept as numpy arrays
+    and formatted to SimAuto-style strings on first request."""
+
+    def __init__(self, fields: list, data: dict):
+        """
+        :param fields: List of (key_field, internal_field_name,
+            field_data_type) tuples, e.g. ('*1*', 'BusNum', 'Integer').
+            Use '' as key_field for non-key fields.
+        :param data: Dictionary mapping internal field names to
+            one-dimensional arrays of equal length.
+        """
+        self.fields = list(fields)
+        self.types = {name: dtype for _, name, dtype in self.fields}
+        self.keys = [name for key, name, _ in self.fields if key]
+        self.data = {}
+        for name, dtype in self.types.items():
+            self.data[name] = _as_typed(data[name], dtype)
+        self._strings = {}
+        self._index = None
+
+    def __len__(self):
+        return len(self.data[self.fields[0][1]])
+
+    def strings(self, field: str) -> tuple:
+        """Return the given field as a tuple of strings."""
+        try:
+            return self._strings[field]
+        except KeyError:
+            pass
+        out = tuple(_format(self.data[field], self.types[field]))
+        self._strings[field] = out
+        return out
+
+    def index(self) -> dict:
+        """Map key tuples (as normalized strings) to row positions."""
+        if self._index is None:
+            cols = [
+                _normalize(self.data[k], self.types[k]) for k in self.keys
+            ]
+            self._index = {key: i for i, key in enumerate(zip(*cols))}
+        return self._index
+
+    def update(self, fields: list, rows: np.ndarray, create: bool) -> str:
+        """Apply a block of values. Rows are matched on the key fields.
+
+        :returns: An error string, or '' on success.
+        """
+        missing = [f for f in fields if f not in self.types]
+        if missing:
+            return f"Error: fields {missing} not found."
+        if any(k not in fields for k in self.keys):
+            return "Error: all key fields must be provided."
+
+        index = self.index()
+        keys = [
+            _normalize(rows[:, fields.index(k)], self.types[k]) for k in self.keys
+        ]
+        pos = np.array([index.get(key, -1) for key in zip(*keys)], dtype=int)
+
+        new = pos < 0
+        if new.any():
+            if not create:
+                return "Error: object not found and CreateIfNotFound is NO."
+            start = len(self)
+            pos[new] = np.arange(start, start + new.sum())
+            for name, dtype in self.types.items():
+                pad = np.full(new.sum(), "" if dtype == STRING else 0)
+                self.data[name] = np.concatenate(
+                    [self.data[name], _as_typed(pad, dtype)]
+                )
+            self._strings.clear()
+            self._index = None
+
+        # Rows were matched on their keys, so the key columns keep their
+        # values and the index stays valid.
+        for j, name in enumerate(fields):
+            self.data[name][pos] = _as_typed(rows[:, j], self.types[name])
+            self._strings.pop(name, None)
+        return ""
+
+
+class FakeCase(object):
+    """An in-memory case: a dictionary of FakeTable keyed by lower case
+    object type."""
+
+    def __init__(self, tables: dict, version: str = "23", build_date: int = 45000):
+        self.tables = {k.lower(): v for k, v in tables.items()}
+        self.version = version
+        self.build_date = build_date
+
+    def table(self, ObjectType: str):
+        return self.tables.get(ObjectType.lower())
+
+    def field_type(self, ObjectType: str, field: str):
+        """Data type of a (possibly virtual) field, or None."""
+        table = self.table(ObjectType)
+        if table is None:
+            return None
+        if field in table.types:
+            return table.types[field]
+        base = _VIRTUAL_FIELDS.get(ObjectType.lower())
+        if base is not None and _virtual_location(field, base) is not None:
+            return REAL
+        return None
+
+    def column(self, ObjectType: str, field: str) -> tuple:
+        """Return a stored or virtual field as a tuple of strings."""
+        obj = ObjectType.lower()
+        table = self.tables[obj]
+        if field in table.types:
+            return table.strings(field)
+        loc = _virtual_location(field, _VIRTUAL_FIELDS[obj])
+        if obj == "branch":
+            return self._lodf_column(loc)
+        return self._isf_column(loc)
+
+    def ybus(self) -> csr_matrix:
+        """Assemble the bus admittance matrix in native bus order."""
+        bus = self.tables["bus"]
+        br = self.tables["branch"]
+        nb = len(bus)
+        pos = {num: i for i, num in enumerate(bus.data["BusNum"].tolist())}
+        closed = br.data["LineStatus"] == "Closed"
+        f = np.array([pos[b] for b in br.data["BusNum"][closed].tolist()])
+        t = np.array([pos[b] for b in br.data["BusNum:1"][closed].tolist()])
+        r, x = br.data["LineR"][closed], br.data["LineX"][closed]
+        ys = 1 / (r + 1j * x)
+        ysh_br = br.data["LineG"][closed] + 1j * br.data["LineC"][closed]
+        tap = br.data["LineTap"][closed] * np.exp(
+            1j * np.pi / 180 * br.data["LinePhase"][closed]
+        )
+        ytt = ys + ysh_br / 2
+        yff = ytt / (tap * np.conj(tap))
+        yft = -ys / np.conj(tap)
+        ytf = -ys / tap
+        rows = np.r_[f, f, t, t]
+        cols = np.r_[f, t, f, t]
+        vals = np.r_[yff, yft, ytf, ytt]
+        base = float(self.tables["sim_solution_options"].data["SBase"][0])
+        ysh = (bus.data["BusSSMW"] + 1j * bus.data["BusSS"]) / base
+        y = coo_matrix((vals, (rows, cols)), shape=(nb, nb)).tocsr()
+        return (y + diags(ysh)).tocsr()
+
+    def _lodf_column(self, outage: int) -> tuple:
+        n = len(self.tables["branch"])
+        col = ["0.000000"] * n
+        if outage >= n:
+            return tuple(col)
+        rng = np.random.default_rng(outage)
+        rows = rng.integers(0, n, size=min(8, n))
+        for r, v in zip(rows.tolist(), rng.uniform(-60, 60, rows.size).tolist()):
+            col[r] = f"{v:.6f}"
+        col[outage] = "-100.000000"
+        return tuple(col)
+
+    def _isf_column(self, branch: int) -> tuple:
+        n = len(self.tables["bus"])
+        col = ["0.000000"] * n
+        rng = np.random.default_rng(branch)
+        rows = rng.integers(0, n, size=min(8, n))
+        for r, v in zip(rows.tolist(), rng.uniform(-1, 1, rows.size).tolist()):
+            col[r] = f"{v:.6f}"
+        return tuple(col)
+
+
+# noinspection PyPep8Naming
+class FakeSimAuto(object):
+    """In-process stand-in for the pwrworld.SimulatorAuto COM object.
+
+    Every SimAuto function returns a tuple whose first element is the
+    error string ('' on success), exactly as SimAuto does.
+    """
+
+    def __init__(self, case: FakeCase = None):
+        """
+        :param case: The FakeCase to serve. Defaults to a 100 bus
+            synthetic case.
+        """
+        self.case = synthetic_case(100) if case is None else case
+        self.CreateIfNotFound = False
+        self.UIVisible = False
+        self.CurrentDir = os.getcwd()
+        self.ProcessID = os.getpid()
+        self.RequestBuildDate = self.case.build_date
+        self.file_name = None
+        self.script_log = []
+        self.filters = {}
+        self._state = None
+
+    @property
+    def ProgramInformation(self):
+        build = datetime.datetime(1899, 12, 30) + datetime.timedelta(
+            days=self.case.build_date
+        )
+        return (("Simulator", self.case.version, build),)
+
+    # Case handling.
+    def OpenCase(self, FileName):
+        self.file_name = _value(FileName)
+        return ("",)
+
+    def OpenCaseType(self, FileName, FileType, Options=""):
+        return self.OpenCase(FileName)
+
+    def CloseCase(self):
+        return ("",)
+
+    def SaveCase(self, FileName, FileType="PWB", Overwrite=True):
+        return ("",)
+
+    def GetCaseHeader(self, FileName=None):
+        return ("", ("GridWorkBench synthetic case",))
+
+    def SaveState(self):
+        self._state = {
+            obj: {k: v.copy() for k, v in table.data.items()}
+            for obj, table in self.case.tables.items()
+        }
+        return ("",)
+
+    def LoadState(self):
+        if self._state is None:
+            return ("Error: No state has been saved.",)
+        for obj, data in self._state.items():
+            table = self.case.tables[obj]
+            table.data = {k: v.copy() for k, v in data.items()}
+            table._strings.clear()
+            table._index = None
+        return ("",)
+
+    # Field metadata.
+    def GetFieldList(self, ObjectType):
+        table = self.case.table(_value(ObjectType))
+        if table is None:
+            return (f"Error: object type {ObjectType} not found.",)
+        rows = [(k, n, t, n, n) for k, n, t in table.fields]
+        # Virtual fields are listed once, not per location.
+        base = _VIRTUAL_FIELDS.get(_value(ObjectType).lower())
+        if base is not None:
+            rows.append(("", base, REAL, base, base))
+        return ("", tuple(rows))
+
+    def GetSpecificFieldList(self, ObjectType, FieldList):
+        table = self.case.table(_value(ObjectType))
+        if table is None:
+            return (f"Error: object type {ObjectType} not found.",)
+        wanted = _value(FieldList)
+        rows = [
+            (n, n.split(":")[0], n, n)
+            for _, n, _ in table.fields
+            if "ALL" in wanted or n in wanted
+        ]
+        return ("", tuple(rows))
+
+    def GetSpecificFieldMaxNum(self, ObjectType, Field):
+        table = self.case.table(_value(ObjectType))
+        if table is None:
+            return -1
+        locs = [
+            int(n.split(":")[1]) if ":" in n else 0
+            for _, n, _ in table.fields
+            if n.split(":")[0] == Field
+        ]
+        return max(locs) if locs else -1
+
+    # Reading data.
+    def GetParametersSingleElement(self, ObjectType, ParamList, Values):
+        obj, params, values = _value(ObjectType), _value(ParamList), _value(Values)
+        if obj.lower() == "powerworldsession":
+            session = {
+                "Version": self.case.version,
+                "ExeBuildDate": str(self.case.build_date),
+            }
+            return ("", tuple(session.get(p, "") for p in params))
+        table = self.case.table(obj)
+        if table is None:
+            return (f"Error: object type {obj} not found.",)
+        key = tuple(
+            _normalize(np.array([values[params.index(k)]], dtype=object), table.types[k])[0]
+            for k in table.keys
+        )
+        row = table.index().get(key)
+        if row is None:
+            return (f"Error: {obj} {key} not found.",)
+        return ("", tuple(self.case.column(obj, p)[row] for p in params))
+
+    def GetParametersMultipleElement(self, ObjectType, ParamList, FilterName=""):
+        obj, params = _value(ObjectType), _value(ParamList)
+        error = self._check_fields(obj, params)
+        if error:
+            return (error,)
+        error, cols = self._columns(obj, params, _value(FilterName))
+        if error:
+            return (error,)
+        if not cols or not len(cols[0]):
+            return ("", None)
+        return ("", cols)
+
+    def GetParametersMultipleElementFlatOutput(self, ObjectType, ParamList, FilterName=""):
+        obj, params = _value(ObjectType), _value(ParamList)
+        error = self._check_fields(obj, params)
+        if error:
+            return (error,)
+        error, cols = self._columns(obj, params, _value(FilterName))
+        if error:
+            return (error,)
+        n = len(cols[0]) if cols else 0
+        if not n:
+            return ("",)
+        flat = np.empty((n, len(params)), dtype=object)
+        for j, col in enumerate(cols):
+            flat[:, j] = col
+        return ("", str(n), str(len(params))) + tuple(flat.ravel().tolist())
+
+    def ListOfDevices(self, ObjType, FilterName=""):
+        table = self.case.table(_value(ObjType))
+        if table is None:
+            return (f"Error: object type {ObjType} not found.",)
+        error, rows = self._filter_rows(_value(ObjType), _value(FilterName))
+        if error:
+            return (error,)
+        if rows is None:
+            rows = slice(None)
+        if not len(table.data[table.keys[0]][rows]):
+            return ("", tuple(None for _ in table.keys))
+        return ("", tuple(tuple(table.data[k][rows].tolist()) for k in table.keys))
+
+    def ListOfDevicesAsVariantStrings(self, ObjType, FilterName=""):
+        table = self.case.table(_value(ObjType))
+        if table is None:
+            return (f"Error: object type {ObjType} not found.",)
+        error, cols = self._columns(_value(ObjType), table.keys, _value(FilterName))
+        if error:
+            return (error,)
+        return ("", cols)
+
+    def ListOfDevicesFlatOutput(self, ObjType, FilterName=""):
+        table = self.case.table(_value(ObjType))
+        if table is None:
+            return (f"Error: object type {ObjType} not found.",)
+        error, cols = self._columns(_value(ObjType), table.keys, _value(FilterName))
+        if error:
+            return (error,)
+        flat = [v for row in zip(*cols) for v in row]
+        return ("", str(len(cols[0])), str(len(cols))) + tuple(flat)
+
+    def TSGetContingencyResults(self, CtgName, ObjFieldList, StartTime, StopTime):
+        # No transient results are ever stored.
+        return ("", None, (None,))
+
+    # Writing data.
+    def ChangeParametersSingleElement(self, ObjectType, ParamList, Values):
+        return self.ChangeParametersMultipleElement(ObjectType, ParamList, [Values])
+
+    def ChangeParametersMultipleElement(self, ObjectType, ParamList, ValueList):
+        obj, params = _value(ObjectType), list(_value(ParamList))
+        table = self.case.table(obj)
+        if table is None:
+            return (f"Error: object type {obj} not found.",)
+        rows = [_value(v) for v in ValueList]
+        if not rows:
+            return ("",)
+        block = np.empty((len(rows), len(params)), dtype=object)
+        block[:] = rows
+        return (table.update(params, block, self.CreateIfNotFound),)
+
+    def ChangeParametersMultipleElementFlatInput(
+        self, ObjectType, ParamList, NoOfObjects, ValueList
+    ):
+        params = _value(ParamList)
+        values = np.array(_value(ValueList), dtype=object)
+        rows = values.reshape(int(NoOfObjects), len(params)).tolist()
+        return self.ChangeParametersMultipleElement(ObjectType, params, rows)
+
+    # Scripts and auxiliary files.
+    def RunScriptCommand(self, Statements):
+        for statement in _split_statements(_value(Statements)):
+            error = self._run_statement(statement)
+            if error:
+                return (error,)
+        return ("",)
+
+    def RunScriptCommand2(self, Statements, StatusMessage):
+        return self.RunScriptCommand(Statements)
+
+    def ProcessAuxFile(self, FileName):
+        with open(_value(FileName), "r") as f:
+            text = f.read()
+        text = re.sub(r"//[^\n]*", "", text)
+        for header, body, conditions in _AUX_FILTER.findall(text):
+            error = self._define_filter(header, body, conditions)
+            if error:
+                return (error,)
+        text = _AUX_FILTER.sub("", text)
+        text = _SUBDATA.sub("", text)
+        for obj, header, body in _AUX_DATA.findall(text):
+            fields = [h.strip() for h in header.split(",") if h.strip()]
+            tokens = [t.strip("\"'") for t in _AUX_TOKEN.findall(body)]
+            if len(tokens) % len(fields):
+                return (f"Error: malformed DATA section for {obj}.",)
+            table = self.case.table(obj)
+            if table is None:
+                # Object types the fake does not model are accepted.
+                self.script_log.append(f"DATA({obj})")
+                continue
+            block = np.array(tokens, dtype=object).reshape(-1, len(fields))
+            error = table.update(fields, block, True)
+            if error:
+                return (error,)
+        for body in _AUX_SCRIPT.findall(text):
+            out = self.RunScriptCommand(body)
+            if out[0]:
+                return out
+        return ("",)
+
+    def WriteAuxFile(self, FileName, FilterName, ObjectType, ToAppend, FieldList):
+        obj, fields = _value(ObjectType), _value(FieldList)
+        table = self.case.table(obj)
+        if table is None:
+            return (f"Error: object type {obj} not found.",)
+        if isinstance(fields, str):
+            fields = [f for _, f, _ in table.fields]
+        cols = [self.case.column(obj, f) for f in fields]
+        with open(_value(FileName), "a" if ToAppend else "w") as fp:
+            fp.write(f"DATA ({obj}, [{', '.join(fields)}])\n{{\n")
+            for row in zip(*cols):
+                fp.write(" ".join(f'"{v}"' for v in row) + "\n")
+            fp.write("}\n")
+        return ("",)
+
+    def SendToExcel(self, ObjectType, FilterName, FieldList):
+        return ("",)
+
+    # Helpers.
+    def _define_filter(self, header: str, body: str, conditions: str) -> str:
+        """Store an advanced filter from an auxiliary file FILTER section.
+        Returns an error string, or '' on success."""
+        fields = [h.strip().lower() for h in header.split(",")]
+        values = dict(zip(fields, _aux_strings(body)))
+        if "objecttype" not in values or "filtername" not in values:
+            return "Error: malformed FILTER section."
+        rows = []
+        for line in conditions.strip().splitlines():
+            row = _aux_strings(line)
+            if len(row) != 4:
+                return f"Error: malformed filter condition {line.strip()}."
+            rows.append(tuple(row))
+        self.filters[values["filtername"]] = (
+            values["objecttype"].lower(),
+            values.get("filterlogic", "AND").upper(),
+            rows,
+        )
+        return ""
+
+    def _filter_rows(self, obj: str, name: str):
+        """Positions of the objects of obj passing the named advanced
+        filter, or None for no filter. Returns (error string, rows)."""
+        if not name:
+            return "", None
+        definition = self.filters.get(name)
+        if definition is None or definition[0] != obj.lower():
+            return f"Error: filter {name} not found for {obj}.", None
+        _, logic, conditions = definition
+        table = self.case.table(obj)
+        masks = []
+        for field, condition, value, other in conditions:
+            test = _FILTER_CONDITIONS.get(condition.lower())
+            if field not in table.types or test is None:
+                return f"Error: cannot apply filter condition {field} {condition}.", None
+            data = table.data[field]
+            if table.types[field] == STRING:
+                data = np.char.strip(data.astype(str))
+            else:
+                value, other = float(value), float(other) if other else np.nan
+            masks.append(test(data, value, other))
+        combine = np.logical_or if logic == "OR" else np.logical_and
+        return "", np.flatnonzero(combine.reduce(masks))
+
+    def _columns(self, obj: str, params, FilterName: str = ""):
+        """Fields of the objects passing a filter, as tuples of strings.
+        Returns (error string, columns)."""
+        error, rows = self._filter_rows(obj, FilterName)
+        if error:
+            return error, None
+        cols = tuple(self.case.column(obj, p) for p in params)
+        if rows is not None:
+            cols = tuple(tuple(col[i] for i in rows.tolist()) for col in cols)
+        return "", cols
+
+    def _check_fields(self, obj: str, params) -> str:
+        if self.case.table(obj) is None:
+            return f"Error: object type {obj} not found."
+        for p in params:
+            if self.case.field_type(obj, p) is None:
+                return f"Error: field {p} not found for {obj}."
+        return ""
+
+    def _run_statement(self, statement: str) -> str:
+        self.script_log.append(statement)
+        match = _SCRIPT_CALL.match(statement)
+        if match is None:
+            return f"Error: cannot parse script command {statement}."
+        name, args = match.group(1).lower(), _split_args(match.group(2) or "")
+        if name == "saveybusinmatlabformat":
+            write_ybus(args[0], self.case.ybus())
+        elif name == "savejacobian":
+            write_jacobian(args[0], self.case.ybus())
+            with open(args[1], "w") as f:
+                f.write("")
+        return ""
+
+
+def _aux_strings(text: str) -> list:
+    """The double quoted (JSON) strings in a line of an auxiliary file."""
+    return [json.loads(t) for t in _AUX_STRING.findall(text)]
+
+
+def write_ybus(path: str, ybus: csr_matrix) -> None:
+    """Write a Ybus the way SaveYbusInMatlabFormat does."""
+    coo = ybus.tocoo()
+    order = np.lexsort((coo.col, coo.row))
+    rows, cols, vals = coo.row[order] + 1, coo.col[order] + 1, coo.data[order]
+    with open(path, "w") as f:
+        f.write("j = sqrt(-1);\n")
+        f.write(f"Ybus = sparse({ybus.shape[0]});\n")
+        f.writelines(
+            f"Ybus({i},{k}) = {v.real:.6f} + j*({v.imag:.6f});\n"
+            for i, k, v in zip(rows.tolist(), cols.tolist(), vals.tolist())
+        )
+
+
+def write_jacobian(path: str, ybus: csr_matrix) -> None:
+    """Write a Jacobian with the sparsity of a power flow Jacobian the
+    way SaveJacobian does. The values are a stand-in built from the
+    Ybus, not the derivative of an actual solution."""
+    g, b = csr_matrix(ybus.real), csr_matrix(ybus.imag)
+    coo = bmat([[-b, g], [-g, -b]]).tocoo()
+    order = np.lexsort((coo.col, coo.row))
+    rows, cols, vals = coo.row[order] + 1, coo.col[order] + 1, coo.data[order]
+    with open(path, "w") as f:
+        f.write(f"Jac = sparse({coo.shape[0]});\n")
+        f.writelines(
+            f"Jac({i},{k}) = {v:.6f};\n"
+            for i, k, v in zip(rows.tolist(), cols.tolist(), vals.tolist())
+        )
+
+
+def synthetic_case(
+    n_bus: int,
+    seed: int = 0,
+    extra_fields: int = 100,
+    branches_per_bus: float = 1.3,
+) -> FakeCase:
+    """Build a random, connected synthetic case.
+
+    Buses are stored in a shuffled (non bus number) order, ~10% of the
+    branches are transformers and every branch is closed.
+
+    :param n_bus: Number of buses.
+    :param seed: Seed for the random number generator.
+    :param extra_fields: Number of extra CustomFloat fields to add to
+        buses and branches, to mimic reading wide tables.
+    :param branches_per_bus: Ratio of branches to buses.
+
+    :returns: A FakeCase.
+    """
+    rng = np.random.default_rng(seed)
+    custom = [("", f"CustomFloat:{i + 1}", REAL) for i in range(extra_fields)]
+
+    def extra(n):
+        return {f: rng.normal(size=n).round(4) for _, f, _ in custom}
+
+    # Buses. Numbers are unique but stored in shuffled order.
+    bus_num = rng.permutation(np.arange(1, n_bus + 1))
+    n_sub = max(1, n_bus // 3)
+    sub_num = rng.integers(1, n_sub + 1, n_bus)
+    nom_kv = rng.choice([69.0, 138.0, 230.0, 345.0, 500.0], n_bus)
+
+    # Branches. A random spanning tree plus extra random connections.
+    n_tree = n_bus - 1
+    order = rng.permutation(bus_num)
+    tree_to = order[1:]
+    tree_from = order[rng.integers(0, np.arange(1, n_bus))]
+    n_extra = max(0, int(branches_per_bus * n_bus) - n_tree)
+    ex_from = rng.choice(bus_num, n_extra)
+    ex_to = rng.choice(bus_num, n_extra)
+    keep = ex_from != ex_to
+    f_bus = np.r_[tree_from, ex_from[keep]]
+    t_bus = np.r_[tree_to, ex_to[keep]]
+    n_br = f_bus.size
+    # Parallel circuits get increasing circuit ids.
+    pair = np.minimum(f_bus, t_bus) * (n_bus + 1) + np.maximum(f_bus, t_bus)
+    _, inv = np.unique(pair, return_inverse=True)
+    circuit = np.zeros(n_br, dtype=int)
+    seen = {}
+    for i, p in enumerate(inv.tolist()):
+        seen[p] = seen.get(p, 0) + 1
+        circuit[i] = seen[p]
+    is_xf = rng.random(n_br) < 0.1
+    r = rng.uniform(0.001, 0.02, n_br)
+    x = r * rng.uniform(5, 15, n_br)
+    c = np.where(is_xf, 0.0, rng.uniform(0.0, 0.3, n_br))
+    tap = np.where(is_xf, rng.uniform(0.95, 1.05, n_br), 1.0)
+    phase = np.where(is_xf & (rng.random(n_br) < 0.05), rng.uniform(-10, 10, n_br), 0.0)
+    mw = rng.normal(0, 50, n_br)
+    mvr = rng.normal(0, 10, n_br)
+    mva = np.hypot(mw, mvr)
+    lim = (mva * rng.uniform(1.5, 3.0, n_br) + 10).round(1)
+    length = np.where(is_xf, 0.0, rng.uniform(1, 150, n_br))
+
+    # Generators and loads.
+    gen_bus = rng.choice(bus_num, max(1, n_bus // 5), replace=False)
+    n_gen = gen_bus.size
+    load_bus = rng.choice(bus_num, max(1, (3 * n_bus) // 5), replace=False)
+    n_load = load_bus.size
+    shunt_bus = rng.choice(bus_num, max(1, n_bus // 20), replace=False)
+    n_shunt = shunt_bus.size
+    bus_cat = np.full(n_bus, "PQ", dtype=object)
+    bus_cat[np.isin(bus_num, gen_bus)] = "PV"
+    bus_cat[bus_num == gen_bus[0]] = "Slack"
+    bus_ss = np.zeros(n_bus)
+    bus_ss[np.isin(bus_num, shunt_bus)] = rng.uniform(-50, 50, n_shunt)
+
+    tables = {
+        "Bus": FakeTable(
+            [
+                ("*1*", "BusNum", INTEGER),
+                ("", "BusName", STRING),
+                ("", "BusName_NomVolt", STRING),
+                ("", "BusNomVolt", REAL),
+                ("", "BusPUVolt", REAL),
+                ("", "BusAngle", REAL),
+                ("", "BusNetMW", REAL),
+                ("", "BusNetMVR", REAL),
+                ("", "BusCat", STRING),
+                ("", "BusSS", REAL),
+                ("", "BusSSMW", REAL),
+                ("", "SubNum", INTEGER),
+                ("", "AreaNum", INTEGER),
+                ("", "ZoneNum", INTEGER),
+                ("", "Latitude:1", REAL),
+                ("", "Longitude:1", REAL),
+                ("", "CustomFloat", REAL),
+            ]
+            + custom,
+            {
+                "BusNum": bus_num,
+                "BusName": np.array([f"BUS{b} " for b in bus_num.tolist()]),
+                "BusName_NomVolt": np.array(
+                    [f"BUS{b}_{v:g}" for b, v in zip(bus_num.tolist(), nom_kv.tolist())]
+                ),
+                "BusNomVolt": nom_kv,
+                "BusPUVolt": rng.uniform(0.95, 1.05, n_bus).round(6),
+                "BusAngle": rng.uniform(-30, 30, n_bus).round(4),
+                "BusNetMW": rng.normal(0, 30, n_bus).round(4),
+                "BusNetMVR": rng.normal(0, 10, n_bus).round(4),
+                "BusCat": bus_cat,
+                "BusSS": bus_ss,
+                "BusSSMW": np.zeros(n_bus),
+                "SubNum": sub_num,
+                "AreaNum": rng.integers(1, 5, n_bus),
+                "ZoneNum": rng.integers(1, 20, n_bus),
+                "Latitude:1": rng.uniform(29, 36, n_bus).round(5),
+                "Longitude:1": rng.uniform(-106, -94, n_bus).round(5),
+                "CustomFloat": np.zeros(n_bus),
+                **extra(n_bus),
+            },
+        ),
+        "Branch": FakeTable(
+            [
+                ("*1*", "BusNum", INTEGER),
+                ("*2*", "BusNum:1", INTEGER),
+                ("*3*", "LineCircuit", STRING),
+                ("", "BranchDeviceType", STRING),
+                ("", "LineStatus", STRING),
+                ("", "Status", STRING),
+                ("", "LineR", REAL),
+                ("", "LineX", REAL),
+                ("", "LineC", REAL),
+                ("", "LineG", REAL),
+                ("", "LineR:2", REAL),
+                ("", "LineX:2", REAL),
+                ("", "LineTap", REAL),
+                ("", "LinePhase", REAL),
+                ("", "LineMW", REAL),
+                ("", "LineMW:1", REAL),
+                ("", "LineMVR", REAL),
+                ("", "LineMVR:1", REAL),
+                ("", "LineMVA", REAL),
+                ("", "MWFrom", REAL),
+                ("", "LineLimMVA", REAL),
+                ("", "LineMaxPercent", REAL),
+                ("", "LineLossMW", REAL),
+                ("", "LineLossMVR", REAL),
+                ("", "LineLengthByParameters:2", REAL),
+                ("", "SubNum", INTEGER),
+                ("", "SubNum:1", INTEGER),
+                ("", "Selected", STRING),
+            ]
+            + custom,
+            {
+                "BusNum": f_bus,
+                "BusNum:1": t_bus,
+                "LineCircuit": np.array([f"{ckt} " for ckt in circuit.tolist()]),
+                "BranchDeviceType": np.where(is_xf, "Transformer", "Line"),
+                "LineStatus": np.full(n_br, "Closed"),
+                "Status": np.full(n_br, "Closed"),
+                "LineR": r.round(6),
+                "LineX": x.round(6),
+                "LineC": c.round(6),
+                "LineG": np.zeros(n_br),
+                "LineR:2": (r * 100).round(4),
+                "LineX:2": (x * 100).round(4),
+                "LineTap": tap.round(5),
+                "LinePhase": phase.round(3),
+                "LineMW": mw.round(4),
+                "LineMW:1": (-mw).round(4),
+                "LineMVR": mvr.round(4),
+                "LineMVR:1": (-mvr).round(4),
+                "LineMVA": mva.round(4),
+                "MWFrom": mw.round(4),
+                "LineLimMVA": lim,
+                "LineMaxPercent": (100 * mva / lim).round(3),
+                "LineLossMW": (r * mva ** 2 / 100).round(5),
+                "LineLossMVR": (x * mva ** 2 / 100).round(5),
+                "LineLengthByParameters:2": length.round(3),
+                "SubNum": sub_num[np.searchsorted(np.sort(bus_num), f_bus)],
+                "SubNum:1": sub_num[np.searchsorted(np.sort(bus_num), t_bus)],
+                "Selected": np.full(n_br, "NO"),
+                **extra(n_br),
+            },
+        ),
+        "Gen": FakeTable(
+            [
+                ("*1*", "BusNum", INTEGER),
+                ("*2*", "GenID", STRING),
+                ("", "GenMW", REAL),
+                ("", "GenMVR", REAL),
+                ("", "GenMVA", REAL),
+                ("", "GenMWMax", REAL),
+                ("", "GenMWMin", REAL),
+                ("", "GenMVRMax", REAL),
+                ("", "GenMVRMin", REAL),
+                ("", "GenVoltSet", REAL),
+                ("", "GenProdCost", REAL),
+                ("", "GenStatus", STRING),
+            ],
+            {
+                "BusNum": gen_bus,
+                "GenID": np.full(n_gen, "1 "),
+                "GenMW": rng.uniform(10, 500, n_gen).round(3),
+                "GenMVR": rng.normal(0, 40, n_gen).round(3),
+                "GenMVA": rng.uniform(10, 500, n_gen).round(3),
+                "GenMWMax": np.full(n_gen, 600.0),
+                "GenMWMin": np.zeros(n_gen),
+                "GenMVRMax": np.full(n_gen, 300.0),
+                "GenMVRMin": np.full(n_gen, -300.0),
+                "GenVoltSet": np.ones(n_gen),
+                "GenProdCost": rng.uniform(100, 20000, n_gen).round(2),
+                "GenStatus": np.full(n_gen, "Closed"),
+            },
+        ),
+        "Load": FakeTable(
+            [
+                ("*1*", "BusNum", INTEGER),
+                ("*2*", "LoadID", STRING),
+                ("", "LoadStatus", STRING),
+                ("", "LoadMW", REAL),
+                ("", "LoadMVR", REAL),
+                ("", "LoadMVA", REAL),
+                ("", "LoadSMW", REAL),
+                ("", "LoadSMVR", REAL),
+                ("", "LoadIMW", REAL),
+                ("", "LoadIMVR", REAL),
+                ("", "LoadZMW", REAL),
+                ("", "LoadZMVR", REAL),
+            ],
+            {
+                "BusNum": load_bus,
+                "LoadID": np.full(n_load, "1 "),
+                "LoadStatus": np.full(n_load, "Closed"),
+                "LoadMW": rng.uniform(0, 200, n_load).round(3),
+                "LoadMVR": rng.uniform(0, 50, n_load).round(3),
+                "LoadMVA": rng.uniform(0, 210, n_load).round(3),
+                "LoadSMW": rng.uniform(0, 200, n_load).round(3),
+                "LoadSMVR": rng.uniform(0, 50, n_load).round(3),
+                "LoadIMW": np.zeros(n_load),
+                "LoadIMVR": np.zeros(n_load),
+                "LoadZMW": np.zeros(n_load),
+                "LoadZMVR": np.zeros(n_load),
+            },
+        ),
+        "Shunt": FakeTable(
+            [
+                ("*1*", "BusNum", INTEGER),
+                ("*2*", "ShuntID", STRING),
+                ("", "ShuntMW", REAL),
+                ("", "ShuntMVR", REAL),
+                ("", "ShuntStatus", STRING),
+            ],
+            {
+                "BusNum": shunt_bus,
+                "ShuntID": np.full(n_shunt, "1 "),
+                "ShuntMW": np.zeros(n_shunt),
+                "ShuntMVR": bus_ss[np.isin(bus_num, shunt_bus)],
+                "ShuntStatus": np.full(n_shunt, "Closed"),
+            },
+        ),
+        "Substation": FakeTable(
+            [
+                ("*1*", "SubNum", INTEGER),
+                ("", "SubName", STRING),
+                ("", "Latitude", REAL),
+                ("", "Longitude", REAL),
+                ("", "GICSubGroundOhms", REAL),
+            ],
+            {
+                "SubNum": np.arange(1, n_sub + 1),
+                "SubName": np.array([f"SUB{s} " for s in range(1, n_sub + 1)]),
+                "Latitude": rng.uniform(29, 36, n_sub).round(5),
+                "Longitude": rng.uniform(-106, -94, n_sub).round(5),
+                "GICSubGroundOhms": rng.uniform(0.1, 1.0, n_sub).round(4),
+            },
+        ),
+        "Sim_Solution_Options": FakeTable(
+            [
+                ("", "SBase", REAL),
+                ("", "ConvergenceTol:2", REAL),
+                ("", "ChkVars", STRING),
+            ],
+            {"SBase": [100.0], "ConvergenceTol:2": [0.1], "ChkVars": ["YES"]},
+        ),
+        "PWCaseInformation": FakeTable(
+            [("", "BusPUVolt:1", REAL)],
+            {"BusPUVolt:1": [0.95]},
+        ),
+    }
+    return FakeCase(tables)
+
+
+def _value(v):
+    """Unwrap a pywin32 VARIANT, if that is what SAW passed along."""
+    return getattr(v, "value", v)
+
+
+def _as_typed(values, dtype: str) -> np.ndarray:
+    arr = np.asarray(values, dtype=object if dtype == STRING else None)
+    if dtype == INTEGER:
+        return np.asarray(np.asarray(arr, dtype=float), dtype=np.int64)
+    if dtype == REAL:
+        return np.asarray(arr, dtype=float)
+    return np.array([str(v) for v in arr.tolist()], dtype=object)
+
+
+def _format(values: np.ndarray, dtype: str) -> list:
+    if dtype == INTEGER:
+        return [str(v) for v in values.tolist()]
+    if dtype == REAL:
+        return [f"{v:.6f}" for v in values.tolist()]
+    return values.tolist()
+
+
+def _normalize(values: np.ndarray, dtype: str) -> list:
+    """Normalize key values so '1', 1 and ' 1 ' compare equal."""
+    if dtype == STRING:
+        return [str(v).strip() for v in values.tolist()]
+    return [int(float(v)) for v in values.tolist()]
+
+
+def _virtual_location(field: str, base: str):
+    if field == base:
+        return 0
+    if field.startswith(base + ":") and field[len(base) + 1:].isdigit():
+        return int(field[len(base) + 1:])
+    return None
+
+
+def _split_statements(statements: str) -> list:
+    """Split script statements on semicolons outside of quotes."""
+    parts = re.findall(r'(?:"[^"]*"|[^;"])+', statements)
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _split_args(args: str) -> list:
+    """Split script arguments on commas outside of quotes/brackets."""
+    parts = re.findall(r'(?:"[^"]*"|\[[^\]]*\]|[^,"\[])+', args)
+    return [p.strip().strip('"') for p in parts]
@@ -16,22 +16,47 @@ from pathlib import Path, PureWindowsPath
 from typing import Union, List, Tuple
 import re
 import datetime
+import hashlib
 import json
-from toolz.itertoolz import partition_all
+import pickle
 
-import math
 import numpy as np
-from numpy.linalg import multi_dot, det, solve, inv
+from numpy.linalg import det, solve, inv
 import pandas as pd
 from scipy.sparse import csr_matrix, coo_matrix, hstack, vstack
 import scipy.sparse.linalg
 import scipy
 import networkx as nx
-from tqdm import trange
-import pythoncom
-import win32com
-from win32com.client import VARIANT
 import tempfile
+import time
+import itertools
+import weakref
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+# Import pywin32. It only exists on Windows, so SAW may also be bound
+# to an in-process SimAuto stand-in (see gridwb.fake_simauto).
+try:  # pragma: no cover
+    import pythoncom
+    import win32com
+    from win32com.client import VARIANT
+
+    use_pywin32 = True
+except ImportError:  # pragma: no cover
+    pythoncom = None
+    win32com = None
+    VARIANT = None
+    use_pywin32 = False
+
+from .sensitivity import DCSensitivity
+from ._robustness import rcf, energy_flow_matrix, ecological_metrics
+from ._network import (
+    bus_index,
+    branch_admittance,
+    branch_mask,
+    bus_admittance,
+    incidence,
+)
 
 # Import numba
 try:  # pragma: no cover
@@ -41,22 +66,13 @@ try:  # pragma: no cover
 except ImportError:
     use_numba = False
 
-# Import corresponding AOT/JIT functions
-import platform
-
-PYTHON_VERSION = platform.python_version_tuple()
-if PYTHON_VERSION[1] in ["7", "8", "9", "10"]:  # pragma: no cover
-    try:
-        exec(
-            f"from .performance{PYTHON_VERSION[0]}{PYTHON_VERSION[1]} import initialize_bound, calculate_bound"
-        )
-    except ImportError or RuntimeError:
-        warnings.warn(
-            "Fail to load ahead-of-time compiled module. Downgrade to just-in-time module for compatibility."
-        )
-        from ._performance_jit import initialize_bound, calculate_bound
-else:  # pragma: no cover
-    from ._performance_jit import initialize_bound, calculate_bound
+# Contingency analysis kernels (numba when available)
+from ._performance_jit import (
+    initialize_bound,
+    calculate_bound,
+    initialize_bound_tile,
+    n2_violations,
+)
 
 # Before doing anything else, set up the locale. The docs note this is
 # not thread safe, and should thus be done right away.
@@ -72,6 +88,9 @@ DATA_TYPES = ["Integer", "Real", "String"]
 # Hard-code based on indices.
 NUMERIC_TYPES = DATA_TYPES[:2]
 NON_NUMERIC_TYPES = DATA_TYPES[-1]
+# Numpy kinds the PowerWorld data types are converted to when cleaning
+# data. Anything else (i.e. String) is kept as an object ("O") string.
+FIELD_KINDS = {"Integer": "i", "Real": "f"}
 
 # RequestBuildDate uses Delphi conventions, which counts days since
 # Dec. 30th, 1899.
@@ -100,6 +119,34 @@ class SAW(object):
         ],
     }
 
+    # Schema of compact results, see compact_df. String fields become
+    # categorical if they're listed here, or if at most
+    # COMPACT_CATEGORY_RATIO of their values are distinct.
+    COMPACT_CATEGORY_FIELDS = {
+        "AreaName",
+        "BranchDeviceType",
+        "BusCat",
+        "GenID",
+        "GenStatus",
+        "LineCircuit",
+        "LineStatus",
+        "LoadID",
+        "LoadStatus",
+        "ShuntID",
+        "ShuntStatus",
+        "ZoneName",
+    }
+    COMPACT_CATEGORY_RATIO = 0.5
+
+    # Measured or solved Real fields, which compact_df stores as float32
+    # on request. Parameters such as impedances keep float64.
+    COMPACT_FLOAT32_FIELDS = set(itertools.chain(*POWER_FLOW_FIELDS.values())) | {
+        "BusKVVolt",
+        "LineAmp",
+        "LineMaxPercent",
+        "LineMVA",
+    }
+
     # Class level property defining the columns used by the DataFrame
     FIELD_LIST_COLUMNS = [
         "key_field",
@@ -139,6 +186,61 @@ class SAW(object):
         "enterable",
     ]
 
+    # Bounds on the number of fields retrieved per SimAuto call when
+    # reading wide results such as LODFMult:<n>. See _iter_field_blocks.
+    FIELD_BATCH_MIN = 20
+    FIELD_BATCH_MAX = 2000
+
+    # Wide results larger than this many bytes are written to a
+    # memory-mapped file. See _fetch_field_matrix.
+    MEMMAP_BYTES = 2**31
+
+    # Memory budget, in bytes, for the blocks of post-contingency flows
+    # and bounds formed by contingency screening. See fast_n1_test,
+    # n1_fast and n2_fast.
+    SCREEN_BYTES = 2**28
+
+    # Fields which a power flow solution leaves unchanged. Cached
+    # GetParametersMultipleElement results made up of only these fields
+    # and key fields survive SolvePowerFlow. Fields which solution
+    # controls may change are left out, e.g. branch impedances (tap
+    # impedance correction), generator MVR limits (capability curves)
+    # and load setpoints.
+    STATIC_FIELDS = {
+        "AreaNum",
+        "BranchDeviceType",
+        "BusName",
+        "BusName_NomVolt",
+        "BusNomVolt",
+        "GenMWMax",
+        "GenMWMin",
+        "GICSubGroundOhms",
+        "Latitude",
+        "Latitude:1",
+        "LineC",
+        "LineG",
+        "LineLengthByParameters",
+        "LineLengthByParameters:2",
+        "LineLimMVA",
+        "LineStatus",
+        "Longitude",
+        "Longitude:1",
+        "SubName",
+        "SubNum",
+        "SubNum:1",
+        "ZoneNum",
+    }
+
+    # Script commands which do not change the case, and thus do not
+    # clear the cache. See RunScriptCommand.
+    READ_ONLY_SCRIPT_COMMANDS = {
+        "entermode",
+        "logadd",
+        "logclear",
+        "savejacobian",
+        "saveybusinmatlabformat",
+    }
+
     # SimAuto properties that we allow users to set via the
     # set_simauto_property method.
     SIMAUTO_PROPERTIES = {
@@ -156,6 +258,10 @@ class SAW(object):
         CreateIfNotFound: bool = False,
         UseDefinedNamesInVariables: bool = False,
         pw_order=False,
+        pwcom=None,
+        use_cache: bool = False,
+        metadata_cache_dir: Union[str, None] = None,
+        lazy: bool = False,
     ):
         """Initialize SimAuto wrapper. The case will be opened, and
         object fields given in object_field_lookup will be retrieved.
@@ -180,6 +286,28 @@ class SAW(object):
         :param pw_order: Set pw_order = True if you want to have exact
             same order as shown in PW Simulator. Default is False, which
             generally sorts the data in a bus ascending order.
+        :param pwcom: Optional object implementing the SimAuto COM
+            interface to bind to instead of dispatching
+            "pwrworld.SimulatorAuto", e.g. a
+            gridwb.fake_simauto.FakeSimAuto. Default is None. When
+            given, early_bind is ignored.
+        :param use_cache: Set use_cache = True to cache the results of
+            GetParametersMultipleElement by object type, fields and
+            filter. The cache is cleared by anything that changes the
+            case, except that results made up of only STATIC_FIELDS
+            (and key fields) survive a power flow solution. Default is
+            False.
+        :param metadata_cache_dir: Directory in which to persist the
+            field lists and key fields looked up for each object type,
+            keyed by Simulator version and build date. Later sessions
+            with the same Simulator load them from disk instead of
+            calling GetFieldList. Delete the files in the directory to
+            refresh them, e.g. after adding custom fields. Default is
+            None, which disables the on-disk cache.
+        :param lazy: Set lazy = True to defer the field lookups for
+            object_field_lookup, the version and build date query and
+            the empty auxiliary file until they are first needed.
+            Default is False.
 
         Note that
         `Microsoft recommends
@@ -199,10 +327,19 @@ class SAW(object):
         # Useful reference for early and late binding in pywin32:
         # https://youtu.be/xPtp8qFAHuA
         # Initialize the COM libraries for the calling thread
-        pythoncom.CoInitialize()
+        if use_pywin32:
+            pythoncom.CoInitialize()
 
         try:
-            if early_bind:
+            if pwcom is not None:
+                # Bind to the given SimAuto stand-in.
+                self._pwcom = pwcom
+            elif not use_pywin32:
+                raise ImportError(
+                    "pywin32 is required to launch SimAuto. Pass a SimAuto "
+                    "stand-in through the pwcom argument instead."
+                )
+            elif early_bind:
                 try:
                     # Use early binding.
                     self._pwcom = win32com.client.gencache.EnsureDispatch(
@@ -230,6 +367,16 @@ class SAW(object):
         # Initialize self.pwb_file_path. It will be set in the OpenCase
         # method.
         self.pwb_file_path = None
+        # Cache of GetParametersMultipleElement results.
+        self.use_cache = use_cache
+        self._cache = {}
+        # Buffered parameter changes by object type, see batch.
+        self._batch = None
+        # Filters defined by define_filter, by name, with the fields
+        # their conditions test.
+        self._filters = {}
+        # Row orders by BusNum, by object type and filter, see _row_order.
+        self._row_orders = {}
         # Set the CreateIfNotFound and UIVisible properties.
         self.set_simauto_property("CreateIfNotFound", CreateIfNotFound)
         self.set_simauto_property("UIVisible", UIVisible)
@@ -237,16 +384,18 @@ class SAW(object):
         self.pw_order = pw_order
 
         # Prepare an empty auxiliary file used for updating the UI.
-        self.ntf = tempfile.NamedTemporaryFile(mode="w", suffix=".axd", delete=False)
-        self.empty_aux = Path(self.ntf.name).as_posix()
-        self.ntf.close()
+        self._empty_aux = None
+        if not lazy:
+            self.empty_aux
 
         # Open the case.
         self.OpenCase(FileName=FileName)
 
         # Get the version number and the build date
-        version_string, self.build_date = self.get_version_and_builddate()
-        self.version = int(re.search(r"\d+", version_string)[0])
+        self._version = None
+        self._build_date = None
+        if not lazy:
+            self.version
 
         # Set the UseDefinedNamesInVariables property.
         if UseDefinedNamesInVariables:
@@ -266,8 +415,18 @@ class SAW(object):
         # object types in object_field_lookup.
         self._object_fields = {}
         self._object_key_fields = {}
-
-        for obj in object_field_lookup:
+        self._object_schemas = {}
+
+        # Load previously looked up fields from disk, if enabled. A lazy
+        # SAW loads them on the first lookup, as the file is named after
+        # the Simulator version.
+        self.metadata_cache_dir = metadata_cache_dir
+        self._metadata_cache_loaded = False
+        if not lazy:
+            self._ensure_metadata_cache()
+        n_cached = len(self._object_fields), len(self._object_key_fields)
+
+        for obj in () if lazy else object_field_lookup:
             # Always use lower case.
             o = obj.lower()
 
@@ -279,26 +438,168 @@ class SAW(object):
             # results in self._object_key_fields[o]
             self.get_key_fields_for_object_type(ObjectType=o)
 
+        # Persist what we've looked up. From now on, object types that
+        # are looked up later are persisted as they come.
+        self._metadata_cache_ready = True
+        if n_cached != (len(self._object_fields), len(self._object_key_fields)):
+            self._save_metadata_cache()
+
+    @property
+    def version(self) -> int:
+        """Major version of Simulator, e.g. 23."""
+        if self._version is None:
+            version_string, self._build_date = self.get_version_and_builddate()
+            self._version = int(re.search(r"\d+", version_string)[0])
+        return self._version
+
+    @property
+    def build_date(self):
+        """Build date of Simulator, as reported by
+        get_version_and_builddate."""
+        if self._version is None:
+            self.version
+        return self._build_date
+
+    @property
+    def empty_aux(self) -> str:
+        """Path to an empty auxiliary file used for updating the UI."""
+        if self._empty_aux is None:
+            ntf = tempfile.NamedTemporaryFile(mode="w", suffix=".axd", delete=False)
+            ntf.close()
+            self._empty_aux = Path(ntf.name).as_posix()
+        return self._empty_aux
+
     ####################################################################
     # Helper Functions
     ####################################################################
-    def exec_aux(self, aux: str, use_double_quotes: bool = False):
+    def exec_aux(
+        self, aux, use_double_quotes: bool = False, keep_cache: bool = False
+    ):
         """Helper function to execute auxiliary script directly. Skip the
         hassle to save the aux script to a file and then execute it.
 
         :param aux: Auxiliary script (including data section) to execute.
+            Either a string, or an iterable of strings (e.g. from
+            aux_data) which are streamed to the file one at a time.
         :param use_double_quotes: Whether to use double quotes or single
             quotes. Default is False. Change to True will replace all the
             single quotes with double quotes.
+        :param keep_cache: Set to True to keep the read cache, when the
+            script changes nothing that is read (e.g. it only defines
+            filters).
         """
-        if use_double_quotes:
-            aux = aux.replace("'", '"')
+        if isinstance(aux, str):
+            aux = (aux,)
         file = tempfile.NamedTemporaryFile(mode="wt", suffix=".aux", delete=False)
-        file.write(aux)
+        for chunk in aux:
+            file.write(chunk.replace("'", '"') if use_double_quotes else chunk)
         file.close()
-        self.ProcessAuxFile(file.name)
+        if keep_cache:
+            self._call_simauto("ProcessAuxFile", file.name)
+        else:
+            self.ProcessAuxFile(file.name)
         os.unlink(file.name)
 
+    def define_filter(
+        self, ObjectType: str, conditions, logic: str = "AND"
+    ) -> str:
+        """Define an advanced filter in the case, to pass as FilterName
+        to e.g. GetParametersMultipleElement, so objects are filtered
+        in Simulator. The filter is named after its definition,
+        "GWB_" and a hash, so it is only written to the case once (per
+        case opened).
+
+        The filter stays in the open case, and SaveCase saves it with
+        the case. Delete unwanted GWB_ filters from Simulator's list of
+        advanced filters.
+
+        :param ObjectType: The type of objects the filter applies to.
+        :param conditions: A condition, or a list of conditions. Each is
+            a tuple of (field, condition, value) or (field, condition,
+            value, other value), with a PowerWorld filter condition such
+            as "=", "<>", ">", "between" or "contains".
+        :param logic: How the conditions combine, "AND" or "OR".
+
+        :returns: The name of the filter.
+
+        :raises ValueError: if a condition does not have 3 or 4 parts.
+        """
+        if isinstance(conditions, tuple):
+            conditions = [conditions]
+        rows = []
+        for c in conditions:
+            if len(c) not in (3, 4):
+                raise ValueError(
+                    f"Filter condition {c} must be (field, condition, value"
+                    "[, other value])."
+                )
+            rows.append(tuple(str(v) for v in c) + ("",) * (4 - len(c)))
+        logic = logic.upper()
+        definition = repr((ObjectType.lower(), logic, rows)).encode()
+        name = "GWB_" + hashlib.sha1(definition).hexdigest()[:16]
+        if name in self._filters:
+            return name
+
+        aux = "\n".join(
+            [
+                "FILTER (ObjectType,FilterName,FilterLogic,FilterPre,Enabled)",
+                "{",
+                " ".join(_aux_value(v) for v in (ObjectType, name, logic, "NO", "YES")),
+                "<SUBDATA Condition>",
+                *(" ".join(_aux_value(v) for v in row) for row in rows),
+                "</SUBDATA>",
+                "}",
+            ]
+        )
+        self.exec_aux(aux + "\n", keep_cache=True)
+        self._filters[name] = {row[0] for row in rows}
+        return name
+
+    @contextmanager
+    def batch(self, aux: bool = False):
+        """Context manager which buffers parameter changes and writes
+        them when the block exits:
+
+        .. code:: python
+
+            with saw.batch():
+                saw.change_parameters_multiple_element_df("gen", gen_df)
+                saw.ChangeParametersSingleElement("load", fields, values)
+
+        Changes made through ChangeParametersSingleElement,
+        ChangeParametersMultipleElement(FlatInput) and
+        change_parameters_multiple_element_df are merged per object
+        type (later values win) and flushed inside a single
+        EnterMode(EDIT)/EnterMode(RUN) pair. Reads inside the block do
+        not see the buffered changes. If the block raises, the buffered
+        changes are discarded. Nested batches are merged into the
+        outermost one.
+
+        :param aux: Set to True to flush everything as one auxiliary
+            file, which creates objects that don't exist regardless of
+            CreateIfNotFound. Default is False, which calls
+            ChangeParametersMultipleElement once per object type and
+            set of fields.
+        """
+        if self._batch is not None:
+            yield self
+            return
+
+        self._batch = {}
+        try:
+            yield self
+        except BaseException:
+            self._batch = None
+            raise
+        buffered, self._batch = self._batch, None
+        self._flush_batch(buffered, aux)
+
+    @property
+    def batching(self) -> bool:
+        """Whether parameter changes are currently being buffered by
+        batch."""
+        return self._batch is not None
+
     def change_and_confirm_params_multiple_element(
         self, ObjectType: str, command_df: pd.DataFrame
     ) -> None:
@@ -329,6 +630,14 @@ class SAW(object):
             ObjectType=ObjectType, command_df=command_df
         )
 
+        # The change has to reach PowerWorld before it can be confirmed.
+        if self._batch is not None:
+            buffered, self._batch = self._batch, None
+            try:
+                self._flush_batch(buffered)
+            finally:
+                self._batch = {}
+
         # Now, query for the given parameters.
         df = self.GetParametersMultipleElement(
             ObjectType=ObjectType, ParamList=cleaned_df.columns.tolist()
@@ -379,8 +688,78 @@ class SAW(object):
             ObjectType=ObjectType, command_df=command_df
         )
 
+    def clear_cache(self, keep_static: bool = False) -> None:
+        """Clear the cache of GetParametersMultipleElement results. This
+        is done automatically by the SAW methods which change the case,
+        so it's only needed after changing the case through other
+        means (e.g. the PowerWorld UI).
+
+        :param keep_static: Set to True to keep results made up of only
+            STATIC_FIELDS and key fields, as after a power flow solve.
+        """
+        if not keep_static:
+            self._cache.clear()
+            return
+        for key in list(self._cache):
+            object_type, fields, filter_name = key[:3]
+            static = self.STATIC_FIELDS.union(self.get_key_field_list(object_type))
+            # Filtered results also depend on the fields the filter tests
+            if filter_name:
+                fields = (*fields, *self._filters.get(filter_name, [None]))
+            if not static.issuperset(fields):
+                del self._cache[key]
+
+    def compact_df(
+        self, df: pd.DataFrame, ObjectType: str, float32: bool = False
+    ) -> pd.DataFrame:
+        """Convert the columns of a cleaned DataFrame (see
+        clean_df_or_series) to compact dtypes, in place:
+
+        - String fields in COMPACT_CATEGORY_FIELDS, or with few distinct
+          values (see COMPACT_CATEGORY_RATIO), become categorical.
+        - Integer fields, e.g. BusNum, become nullable Int32 (Int64 if
+          their values don't fit).
+        - With float32, Real fields in COMPACT_FLOAT32_FIELDS become
+          float32.
+
+        Columns which can't be converted are left as they are.
+
+        :param df: DataFrame to convert. Its columns must be fields of
+            the ObjectType.
+        :param ObjectType: Object type the data in the DataFrame relates
+            to. E.g. 'gen'
+        :param float32: Set to True to store measured or solved values
+            as float32.
+
+        :returns: The DataFrame.
+        """
+        kinds = self._field_kinds(ObjectType=ObjectType, fields=df.columns)
+        int32 = np.iinfo(np.int32)
+        for field, kind in zip(df.columns, kinds):
+            column = df[field]
+            if kind == "O":
+                if column.dtype != object:
+                    continue
+                if field in self.COMPACT_CATEGORY_FIELDS or column.nunique() <= (
+                    self.COMPACT_CATEGORY_RATIO * len(column)
+                ):
+                    df[field] = column.astype("category")
+            elif kind == "i":
+                values = column.to_numpy(dtype=float, na_value=np.nan)
+                whole = values[~np.isnan(values)]
+                if not np.array_equal(whole, np.trunc(whole)):
+                    continue
+                fits = whole.size == 0 or (
+                    whole.min() >= int32.min and whole.max() <= int32.max
+                )
+                df[field] = column.astype("Int32" if fits else "Int64")
+            elif float32 and field in self.COMPACT_FLOAT32_FIELDS:
+                if column.dtype.kind == "f":
+                    df[field] = column.astype(np.float32)
+        return df
+
     def clean_df_or_series(
-        self, obj: Union[pd.DataFrame, pd.Series], ObjectType: str
+        self, obj: Union[pd.DataFrame, pd.Series], ObjectType: str, FilterName: str = ""
     ) -> Union[pd.DataFrame, pd.Series]:
         """Helper to cast data to the correct types, clean up strings,
         and sort DataFrame by BusNum (if applicable/present).
@@ -397,6 +776,8 @@ class SAW(object):
             GetFieldList for the given object type).
         :param ObjectType: Object type the data in the DataFrame relates
             to. E.g. 'gen'
+        :param FilterName: Filter the objects were read with, if any.
+            The BusNum order is cached per object type and filter.
 
         :raises ValueError: if the DataFrame (Series) columns (index)
             are not valid fields for the given object type.
@@ -416,51 +797,288 @@ class SAW(object):
 
         # Do not sort if pw_order = True
         if not self.pw_order:
-            self._clean_df(ObjectType, fields, obj, df_flag)
+            self._clean_df(ObjectType, fields, obj, df_flag, FilterName)
         return obj
 
-    def _clean_df(self, ObjectType, fields, obj, df_flag):
-        # Determine which types are numeric.
-        numeric = self.identify_numeric_fields(ObjectType=ObjectType, fields=fields)
-        numeric_fields = fields[numeric]
+    def _buffer_changes(self, ObjectType: str, changes, ParamList=None) -> None:
+        """Add changes to the batch buffer (see batch).
 
-        # Make the numeric fields, well, numeric.
-        obj[numeric_fields] = self._to_numeric(obj[numeric_fields])
+        :param ObjectType: The type of objects being changed.
+        :param changes: Cleaned DataFrame, or list of value lists
+            corresponding to ParamList.
+        :param ParamList: Fields of the value lists.
+        """
+        if ParamList is not None:
+            changes = self.clean_df_or_series(
+                pd.DataFrame(list(changes), columns=list(ParamList)), ObjectType
+            )
+        self._batch.setdefault(ObjectType.lower(), []).append(changes)
+
+    def _flush_batch(self, buffered: dict, aux: bool = False) -> None:
+        """Write buffered changes (see batch). Changes of each object
+        type are merged by key, keeping the last value given for each
+        field (NaN included), and written grouped by the set of fields
+        given."""
+        writes = []
+        for object_type, frames in buffered.items():
+            keys = self.get_key_field_list(object_type)
+            fields = list(dict.fromkeys(f for df in frames for f in df.columns))
+            merged = pd.concat(frames, ignore_index=True, sort=False)[fields]
+
+            # The fields each row gave, as concat pads the others with NaN
+            given = np.concatenate(
+                [np.tile(np.isin(fields, df.columns), (len(df), 1)) for df in frames]
+            )
 
-        # Now handle the non-numeric cols.
-        nn_cols = fields[~numeric]
+            # Cast the keys alike, as frames aren't cleaned with pw_order
+            kinds = self._field_kinds(ObjectType=object_type, fields=keys)
+            columns = self._convert_to_kinds(merged[keys].to_numpy(dtype=object), kinds)
+            for key, column in zip(keys, columns):
+                merged[key] = column
+
+            # Last row giving each field, per object
+            groups = merged.groupby(keys, sort=False, dropna=False).ngroup().to_numpy()
+            rows = np.where(given, np.arange(len(merged))[:, None], -1)
+            last = pd.DataFrame(rows).groupby(groups).max().to_numpy()
+            present = last >= 0
+            merged = pd.DataFrame(
+                {
+                    f: merged[f].to_numpy()[np.maximum(last[:, j], 0)]
+                    for j, f in enumerate(fields)
+                }
+            )
 
-        # Start by ensuring the non-numeric columns are indeed strings.
-        obj[nn_cols] = obj[nn_cols].astype(str)
+            # Objects with the same fields given go out together.
+            patterns, inverse = np.unique(present, axis=0, return_inverse=True)
+            for k, pattern in enumerate(patterns):
+                rows = merged.loc[inverse.ravel() == k, merged.columns[pattern]]
+                writes.append((object_type, rows))
 
-        # Here we'll strip off the white space.
-        obj[nn_cols] = (
-            obj[nn_cols].apply(lambda x: x.str.strip())
-            if df_flag
-            else obj[nn_cols].str.strip()
+        if not writes:
+            return
+
+        self.RunScriptCommand("EnterMode(EDIT);")
+        try:
+            if aux:
+                self.exec_aux(
+                    itertools.chain.from_iterable(aux_data(t, df) for t, df in writes)
+                )
+            else:
+                for object_type, df in writes:
+                    self.ChangeParametersMultipleElement(
+                        ObjectType=object_type,
+                        ParamList=df.columns.tolist(),
+                        ValueList=df.to_numpy().tolist(),
+                    )
+        finally:
+            self.RunScriptCommand("EnterMode(RUN);")
+
+    def _clear_cache_for_script(self, Statements: str) -> None:
+        """Clear the cache as needed before running script statements.
+        Read-only commands keep the cache, a power flow solution keeps
+        static results and anything else clears it.
+        """
+        if not self._cache:
+            return
+        commands = {
+            c.split("(")[0].strip().lower() for c in Statements.split(";") if c.strip()
+        }
+        commands -= self.READ_ONLY_SCRIPT_COMMANDS
+        if commands:
+            self.clear_cache(keep_static=commands == {"solvepowerflow"})
+
+    def _clean_df(self, ObjectType, fields, obj, df_flag, FilterName=""):
+        # Look up the kind of every field in the compiled schema.
+        kinds = self._field_kinds(ObjectType=ObjectType, fields=fields)
+
+        # Convert all fields at once. A Series is a single object, so
+        # treat it as a one row block.
+        values = obj.to_numpy(dtype=object)
+        columns = self._convert_to_kinds(
+            values if df_flag else values.reshape(1, -1), kinds
         )
 
-        # Sort by BusNum if present.
-        if df_flag:
+        if not df_flag:
+            obj[:] = [c[0] for c in columns]
+            return
+
+        # Sort by BusNum if present, taking every column in the cached
+        # order rather than sorting the DataFrame.
+        sort = "BusNum" in obj.columns
+        if sort:
+            bus = columns[list(fields).index("BusNum")]
+            order = self._row_order(ObjectType, bus, FilterName)
+            if order is not None:
+                columns = [column[order] for column in columns]
+
+        for field, column in zip(fields, columns):
+            obj[field] = column
+
+        if sort:
+            # Re-index with simple monotonically increasing values.
+            obj.index = np.arange(start=0, stop=obj.shape[0])
+
+    def _row_order(
+        self, ObjectType: str, bus_numbers, FilterName: str = ""
+    ) -> Union[np.ndarray, None]:
+        """Return the order which sorts objects by BusNum, or None if
+        they are already sorted. The sort is stable, so objects at the
+        same bus stay in PowerWorld's order and the order depends on the
+        BusNum column alone. It is cached per object type and filter,
+        and reused while the BusNum column (in PowerWorld's order) is
+        unchanged, which costs one comparison rather than a sort.
+
+        :param ObjectType: The type of the objects.
+        :param bus_numbers: BusNum of every object, in PowerWorld's
+            order.
+        :param FilterName: Filter the objects were read with, if any.
+        """
+        bus_numbers = np.asarray(bus_numbers)
+        key = (ObjectType.lower(), FilterName or "")
+        cached = self._row_orders.get(key)
+        if cached is not None and np.array_equal(cached[0], bus_numbers):
+            return cached[1]
+        order = np.argsort(bus_numbers, kind="mergesort")
+        if np.array_equal(order, np.arange(len(order))):
+            order = None
+        self._row_orders[key] = (bus_numbers.copy(), order)
+        return order
+
+    def _convert_to_kinds(self, values: np.ndarray, kinds: np.ndarray) -> list:
+        """Convert a two-dimensional array of SimAuto values, one column
+        per field, to typed columns.
+
+        Numeric columns are converted together in one vectorized cast,
+        honoring the locale's decimal delimiter. Blank values are
+        missing (NaN). Integer columns become int64 when all of their
+        values are whole numbers, and float64 otherwise (e.g. when
+        values are missing). Columns that can't be converted are left
+        as strings, stripped of white space like String columns.
+
+        :param values: Object array of shape (number of objects, number
+            of fields).
+        :param kinds: Array of "i", "f" or "O", one per field, as
+            returned by _field_kinds.
+
+        :returns: List of one-dimensional arrays, one per field.
+        """
+        columns = list(values.T)
+
+        numeric = np.flatnonzero(kinds != "O")
+        if numeric.size:
+            # One row per field, so every converted column is contiguous.
+            block = values[:, numeric].T
+            if self.decimal_delimiter != ".":
+                block = np.char.replace(
+                    block.astype(str), self.decimal_delimiter, "."
+                )
             try:
-                obj.sort_values(by="BusNum", axis=0, inplace=True)
-            except KeyError:
-                # If there's no BusNum don't sort the DataFrame.
-                pass
-            else:
-                # Re-index with simple monotonically increasing values.
-                obj.index = np.arange(start=0, stop=obj.shape[0])
+                block = list(block.astype(np.float64, order="C"))
+            except (ValueError, TypeError):
+                # Missing values, or at least one column has bad data.
+                # Fall back to converting column by column.
+                block = [_to_float_or_none(c) for c in _blank_to_nan(block)]
+
+            for idx, column in zip(numeric, block):
+                if column is None:
+                    columns[idx] = np.char.strip(
+                        columns[idx].astype(str)
+                    ).astype(object)
+                    continue
+                if kinds[idx] == "i" and np.array_equal(column, np.trunc(column)):
+                    column = column.astype(np.int64)
+                columns[idx] = column
+
+        strings = np.flatnonzero(kinds == "O")
+        if strings.size:
+            block = np.char.strip(values[:, strings].T.astype(str)).astype(object)
+            for idx, column in zip(strings, block):
+                columns[idx] = column
+
+        return columns
+
+    def _metadata_cache_path(self) -> Union[str, None]:
+        """Path of the on-disk field metadata cache for this Simulator
+        version and build date, or None if the cache is disabled."""
+        if self.metadata_cache_dir is None:
+            return None
+        tag = re.sub(r"[^0-9A-Za-z]+", "_", f"{self.version}_{self.build_date}")
+        return os.path.join(self.metadata_cache_dir, f"saw_fields_{tag.strip('_')}.pkl")
+
+    def _ensure_metadata_cache(self) -> None:
+        """Load the on-disk field metadata once, before the first field
+        lookup, see _load_metadata_cache."""
+        if self._metadata_cache_loaded:
+            return
+        self._metadata_cache_loaded = True
+        self._load_metadata_cache()
+
+    def _load_metadata_cache(self) -> None:
+        """Load field lists and key fields persisted by an earlier
+        session into self._object_fields and self._object_key_fields.
+        """
+        path = self._metadata_cache_path()
+        if path is None or not os.path.isfile(path):
+            return
+        try:
+            with open(path, "rb") as f:
+                object_fields, object_key_fields = pickle.load(f)
+        except Exception:
+            # A corrupt or incompatible file will simply be rewritten.
+            self.log.warning(f"Unable to load field metadata from {path}.")
+            return
+        self._object_fields.update(object_fields)
+        self._object_key_fields.update(object_key_fields)
+
+    def _save_metadata_cache(self) -> None:
+        """Persist the field lists and key fields looked up so far."""
+        path = self._metadata_cache_path()
+        if path is None or not getattr(self, "_metadata_cache_ready", False):
+            return
+        os.makedirs(self.metadata_cache_dir, exist_ok=True)
+        # Write to a temporary file first, so concurrent sessions never
+        # read a partially written file.
+        fd, tmp = tempfile.mkstemp(dir=self.metadata_cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((self._object_fields, self._object_key_fields), f)
+        os.replace(tmp, path)
+
+    def _decode_column(self, column, kind: str) -> np.ndarray:
+        """Decode one field of a SimAuto result, a sequence of strings,
+        into a numpy array of the given kind. See _convert_to_kinds for
+        the conversion rules.
+        """
+        if kind == "O":
+            return np.char.strip(np.array(column, dtype=str))
+
+        if self.decimal_delimiter != ".":
+            column = np.char.replace(
+                np.array(column, dtype=str), self.decimal_delimiter, "."
+            )
+        try:
+            array = np.array(column, dtype=np.float64)
+        except (ValueError, TypeError):
+            # Missing values or bad data. Bad data is left as strings.
+            array = _to_float_or_none(_blank_to_nan(column))
+            if array is None:
+                return np.char.strip(np.array(column, dtype=str))
+
+        if kind == "i" and np.array_equal(array, np.trunc(array)):
+            return array.astype(np.int64)
+        return array
 
     def exit(self):
         """Clean up for the PowerWorld COM object"""
         # Clean the empty aux file
-        os.unlink(self.ntf.name)
+        if self._empty_aux is not None:
+            os.unlink(self._empty_aux)
         # Close the case and delete the COM object
         self.CloseCase()
         del self._pwcom
         self._pwcom = None
         # Uninitialize the COM libraries to avoid the possible memory leak
-        pythoncom.CoUninitialize()
+        if use_pywin32:
+            pythoncom.CoUninitialize()
         return None
 
     def get_key_fields_for_object_type(self, ObjectType: str) -> pd.DataFrame:
@@ -483,6 +1101,7 @@ class SAW(object):
         """
         # Cast to lower case.
         obj_type = ObjectType.lower()
+        self._ensure_metadata_cache()
 
         # See if we've already looked up the key fields for this object.
         # If we have, just return the cached results.
@@ -550,6 +1169,7 @@ class SAW(object):
 
         # Track for later.
         self._object_key_fields[obj_type] = key_field_df
+        self._save_metadata_cache()
 
         return key_field_df
 
@@ -577,6 +1197,75 @@ class SAW(object):
         # Return a listing of the internal field name.
         return key_field_df["internal_field_name"].tolist()
 
+    def get_parameters_multiple_element_arrays(
+        self,
+        ObjectType: str,
+        ParamList: list,
+        FilterName: str = "",
+        flat: bool = False,
+    ) -> Union[dict, None]:
+        """Columnar alternative to GetParametersMultipleElement for
+        tight loops which only need typed vectors. The SimAuto result is
+        decoded field by field straight into numpy arrays, without an
+        intermediate object matrix and without pandas.
+
+        :param ObjectType: Type of object to get parameters for.
+        :param ParamList: List of variables to obtain for the given
+            object type. E.g. ['BusNum', 'GenID', 'GenMW'].
+        :param FilterName: Name of an advanced filter defined in the
+            load flow case.
+        :param flat: Set to True to retrieve the data through
+            GetParametersMultipleElementFlatOutput instead. Default is
+            False.
+
+        :returns: Dictionary mapping each field in ParamList to a
+            one-dimensional array: int64 for Integer fields (float64 if
+            values are missing), float64 for Real fields and stripped
+            strings for String fields. Like GetParametersMultipleElement,
+            the arrays are sorted by BusNum (if present) unless
+            pw_order is True. If the provided ObjectType is not present
+            in the case, None will be returned.
+
+        :raises PowerWorldError: if PowerWorld reports an error.
+        :raises ValueError: if any parameters given in the ParamList
+            are not valid for the given object type.
+        """
+        kinds = self._field_kinds(ObjectType=ObjectType, fields=ParamList)
+
+        if flat:
+            output = self.GetParametersMultipleElementFlatOutput(
+                ObjectType, ParamList, FilterName
+            )
+            if output is None:
+                return None
+            # The data follow the number of objects and fields, listed
+            # object by object, so every field is a strided slice.
+            m = int(output[1])
+            columns = [output[2 + j :: m] for j in range(m)]
+        else:
+            output = self._call_simauto(
+                "GetParametersMultipleElement",
+                ObjectType,
+                convert_list_to_variant(ParamList),
+                FilterName,
+            )
+            if output is None:
+                return None
+            columns = output
+
+        arrays = {
+            field: self._decode_column(column, kind)
+            for field, column, kind in zip(ParamList, columns, kinds)
+        }
+
+        # Sort by BusNum if present, as clean_df_or_series does.
+        if not self.pw_order and "BusNum" in arrays:
+            order = self._row_order(ObjectType, arrays["BusNum"], FilterName)
+            if order is not None:
+                arrays = {field: array[order] for field, array in arrays.items()}
+
+        return arrays
+
     def get_power_flow_results(
         self, ObjectType: str, additional_fields: Union[None, List[str]] = None
     ) -> Union[None, pd.DataFrame]:
@@ -636,45 +1325,59 @@ class SAW(object):
             fields are numeric. Going along with the example given for
             "fields": np.array([True, True, False, False])
         """
-        # Start by getting the field list for this ObjectType. Note
-        # that in most cases this will be cached and thus be quite
-        # fast. If it isn't cached now, it will be after calling this.
-        field_list = self.GetFieldList(ObjectType=ObjectType, copy=False)
+        return self._field_kinds(ObjectType=ObjectType, fields=fields) != "O"
 
-        # Rely on the fact that the field_list is already sorted by
-        # internal_field_name to get indices related to the given
-        # internal field names.
-        # fields = list(fields)
-        idx = field_list["internal_field_name"].to_numpy().searchsorted(fields)
-
-        # Ensure the columns are actually in the field_list. This is
-        # necessary because search sorted gives the index of where the
-        # given values would go, and doesn't guarantee the values are
-        # actually present. However, we want to use searchsorted for its
-        # speed and leverage the fact that our field_list DataFrame is
-        # already sorted.
+    def _get_field_schema(self, ObjectType: str) -> dict:
+        """Get the compiled schema for the given ObjectType, mapping
+        every internal field name to the kind its data are converted
+        to: "i" (Integer), "f" (Real) or "O" (String). The schema is
+        built once from GetFieldList and cached.
+
+        :param ObjectType: PowerWorld object type, e.g. 'gen'.
+        """
+        object_type = ObjectType.lower()
         try:
-            # ifn for "internal_field_name."
-            ifn = field_list["internal_field_name"].to_numpy()[idx]
+            return self._object_schemas[object_type]
+        except KeyError:
+            pass
 
-            # Ensure given fields are present in the field list.
-            if set(ifn) != set(fields):
-                raise ValueError(
-                    "The given object has fields which do not"
-                    " match a PowerWorld internal field name!"
-                )
-        except IndexError as e:
-            # An index error also indicates failure.
-            raise ValueError(
-                "The given object has fields which do not"
-                " match a PowerWorld internal field name!"
-            ) from e
+        # Note that in most cases the field list will be cached too.
+        field_list = self.GetFieldList(ObjectType=ObjectType, copy=False)
+        schema = {
+            name: FIELD_KINDS.get(data_type, "O")
+            for name, data_type in zip(
+                field_list["internal_field_name"].tolist(),
+                field_list["field_data_type"].tolist(),
+            )
+        }
+        self._object_schemas[object_type] = schema
+        return schema
 
-        # Now extract the corresponding data types.
-        data_types = field_list["field_data_type"].to_numpy()[idx]
+    def _field_kinds(
+        self, ObjectType: str, fields: Union[List, np.ndarray]
+    ) -> np.ndarray:
+        """Look up the kind ("i", "f" or "O") of the given fields in the
+        schema of the given ObjectType. Fields with a location which
+        aren't listed individually, e.g. 'LODFMult:12', take the kind
+        of their variable, e.g. 'LODFMult'.
 
-        # Determine which types are numeric and return.
-        return np.isin(data_types, NUMERIC_TYPES)
+        :raises ValueError: if any field isn't a PowerWorld internal
+            field name of the ObjectType.
+        """
+        schema = self._get_field_schema(ObjectType)
+        kinds = []
+        for field in fields:
+            try:
+                kinds.append(schema[field])
+            except KeyError:
+                try:
+                    kinds.append(schema[field.split(":")[0]])
+                except KeyError:
+                    raise ValueError(
+                        "The given object has fields which do not"
+                        " match a PowerWorld internal field name!"
+                    ) from None
+        return np.array(kinds, dtype=object)
 
     def set_simauto_property(
         self, property_name: str, property_value: Union[str, bool]
@@ -726,13 +1429,34 @@ class SAW(object):
                 raise e from None
 
     def get_ybus(
-        self, full: bool = False, file: Union[str, None] = None
+        self, full: bool = False, file: Union[str, None] = None, native: bool = False
     ) -> Union[np.ndarray, csr_matrix]:
         """Helper to obtain the YBus matrix from PowerWorld (in Matlab sparse
         matrix format) and then convert to scipy csr_matrix by default.
         :param full: Convert the csr_matrix to the numpy array (full matrix).
         :param file: Path to the external Ybus file.
+        :param native: Set to True to assemble the Ybus directly from the
+            branch and bus data instead of going through a file. Buses are
+            then in the order of GetParametersMultipleElement (BusNum order,
+            or PowerWorld's order if pw_order is True), while the file
+            follows PowerWorld's internal bus order. Open branches are
+            left out and taps and phase shifts are applied, as in
+            PowerWorld's Ybus. The model is simpler than PowerWorld's:
+
+            - Line shunts (the LineShunt objects at the branch ends)
+              are left out; only the branch's own LineG and LineC are
+              used, split evenly between its ends.
+            - Impedance correction tables are not applied; LineR and
+              LineX are taken as they are.
+            - Switched shunts enter at their actual Mvar (BusSS), which
+              depends on the voltage of the last solution.
+
+            Use the file (the default) where the Ybus must match
+            PowerWorld's.
         """
+        if native:
+            sparse_matrix = self._get_ybus_native()
+            return sparse_matrix.toarray() if full else sparse_matrix
         if file:
             _tempfile_path = file
         else:
@@ -743,103 +1467,30 @@ class SAW(object):
             _tempfile.close()
             cmd = f'SaveYbusInMatlabFormat("{_tempfile_path}", NO)'
             self.RunScriptCommand(cmd)
-        with open(_tempfile_path, "r") as f:
-            f.readline()
-            mat_str = f.read()
-        mat_str = re.sub(r"\s", "", mat_str)
-        lines = re.split(";", mat_str)
-        ie = r"[0-9]+"
-        fe = r"-*[0-9]+\.[0-9]+"
-        dr = re.compile(r"(?:Ybus)=(?:sparse\()({ie})".format(ie=ie))
-        exp = re.compile(
-            r"(?:Ybus\()({ie}),({ie})(?:\)=)({fe})(?:\+j\*)(?:\()({fe})".format(
-                ie=ie, fe=fe
-            )
-        )
-        # Get the dimension from the first line in lines
-        dim = dr.match(lines[0])[1]
-        n = int(dim)
-        row = []
-        col = []
-        data = []
-        for line in lines[1:]:
-            match = exp.match(line)
-            if match is None:
-                continue
-            idx1, idx2, real, imag = match.groups()
-            # Type conversion can be optimized to provide slightly
-            # improvement
-            admittance = float(real) + 1j * float(imag)
-            row.append(int(idx1))
-            col.append(int(idx2))
-            data.append(admittance)
-        # The row index is always in the ascending order in the mat file
-        sparse_matrix = csr_matrix(
-            (data, (np.asarray(row) - 1, np.asarray(col) - 1)),
-            shape=(n, n),
-            dtype=complex,
-        )
+        sparse_matrix = read_matlab_sparse(_tempfile_path, "Ybus", complex_values=True)
         return sparse_matrix.toarray() if full else sparse_matrix
 
     def get_branch_admittance(self):
         """Helper function to get the branch admittance matrix, usually known as
-        Yf and Yt.
+        Yf and Yt. Rows follow the branch order of GetParametersMultipleElement
+        and columns the bus order. Open branches carry no current.
         :returns: A Yf sparse matrix and a Yt sparse matrix
         """
-        key = self.get_key_field_list("bus")
-        df = self.GetParametersMultipleElement("bus", key)
-
-        branch = self.GetParametersMultipleElement(
-            "branch",
-            self.get_key_field_list("branch")
-            + ["LineR", "LineX", "LineC", "LineTap", "LinePhase"],
-        )
-        branch["LineR"] = branch["LineR"].astype(float)
-        branch["LineX"] = branch["LineX"].astype(float)
-        branch["LineC"] = branch["LineC"].astype(float)
-        branch["LineTap"] = branch["LineTap"].astype(float)
-        branch["LinePhase"] = branch["LinePhase"].astype(float)
-
-        nb = df.shape[0]
-        nl = branch.shape[0]
-
-        Ys = 1 / (
-            branch["LineR"].to_numpy() + 1j * branch["LineX"].to_numpy()
-        )  # series admittance
-        Bc = branch["LineC"].to_numpy()  # line charging susceptance
-        tap = branch["LineTap"].to_numpy()
-        shift = branch["LinePhase"].to_numpy()
-        tap = tap * np.exp(1j * np.pi / 180 * shift)
-        Ytt = Ys + 1j * Bc / 2
-        Yff = Ytt / (tap * np.conj(tap))
-        Yft = -Ys / np.conj(tap)
-        Ytf = -Ys / tap
-
-        # lookup table for formatting bus numbers
-        def loop_translate(a, d):
-            n = np.ndarray(a.shape, dtype=int)
-            for k in d:
-                n[a == k] = d[k]
-            return n
-
-        d = dict()
-        for index, value in df["BusNum"].items():
-            d[value] = index
-        f = branch["BusNum"].to_numpy(dtype=int).reshape(-1)
-        f = loop_translate(f, d)
-        t = branch["BusNum:1"].to_numpy(dtype=int).reshape(-1)
-        t = loop_translate(t, d)
-        # connection matrix for line & from buses
-        i = np.r_[range(nl), range(nl)]  # double set of row indices
-        Yf = csr_matrix(
-            (np.hstack([Yff.reshape(-1), Yft.reshape(-1)]), (i, np.hstack([f, t]))),
-            (nl, nb),
+        bus, branch = self._get_admittance_data()
+        f = bus_index(branch["BusNum"].to_numpy(), bus["BusNum"].to_numpy())
+        t = bus_index(branch["BusNum:1"].to_numpy(), bus["BusNum"].to_numpy())
+        return branch_admittance(
+            f,
+            t,
+            branch["LineR"].to_numpy(),
+            branch["LineX"].to_numpy(),
+            branch["LineC"].to_numpy(),
+            branch["LineTap"].to_numpy(),
+            branch["LinePhase"].to_numpy(),
+            n_bus=bus.shape[0],
+            closed=branch["LineStatus"].to_numpy() == "Closed",
+            g=branch["LineG"].to_numpy(),
         )
-        Yt = csr_matrix(
-            (np.hstack([Ytf.reshape(-1), Ytt.reshape(-1)]), (i, np.hstack([f, t]))),
-            (nl, nb),
-        )
-        return Yf, Yt
 
     def get_shunt_admittance(self):
         """Get shunt admittance Ysh.
@@ -857,6 +1508,39 @@ class SAW(object):
         df.fillna(0, inplace=True)
         return (df["BusSSMW"].to_numpy() + 1j * df["BusSS"].to_numpy()) / base
 
+    def _get_ybus_native(self) -> csr_matrix:
+        """Assemble Ybus from the case's branch and bus data, in the bus
+        order of GetParametersMultipleElement. See get_ybus."""
+        bus, branch = self._get_admittance_data()
+        buses = bus["BusNum"].to_numpy()
+        return bus_admittance(
+            bus_index(branch["BusNum"].to_numpy(), buses),
+            bus_index(branch["BusNum:1"].to_numpy(), buses),
+            branch["LineR"].to_numpy(),
+            branch["LineX"].to_numpy(),
+            branch["LineC"].to_numpy(),
+            branch["LineTap"].to_numpy(),
+            branch["LinePhase"].to_numpy(),
+            n_bus=len(buses),
+            closed=branch["LineStatus"].to_numpy() == "Closed",
+            ysh=self.get_shunt_admittance(),
+            g=branch["LineG"].to_numpy(),
+        )
+
+    def _get_admittance_data(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Get the bus numbers and branch parameters needed to build the
+        admittance matrices."""
+        bus = self.GetParametersMultipleElement("bus", ["BusNum"])
+        branch = self.GetParametersMultipleElement(
+            "branch",
+            self.get_key_field_list("branch")
+            + ["LineR", "LineX", "LineC", "LineG", "LineTap", "LinePhase", "LineStatus"],
+        )
+        for field in ["BusNum", "BusNum:1"]:
+            branch[field] = branch[field].astype(int)
+        bus["BusNum"] = bus["BusNum"].astype(int)
+        return bus, branch
+
     def get_jacobian(self, full=False):
         """Helper function to get the Jacobian matrix, by default return a
         scipy sparse matrix in the csr format
@@ -870,33 +1554,9 @@ class SAW(object):
         jidfile.close()
         cmd = f'SaveJacobian("{jacfile_path}","{jidfile_path}",M,R);'
         self.RunScriptCommand(cmd)
-        with open(jacfile_path, "r") as f:
-            mat_str = f.read()
+        sparse_matrix = read_matlab_sparse(jacfile_path, "Jac")
         os.unlink(jacfile.name)
         os.unlink(jidfile.name)
-        mat_str = re.sub(r"\s", "", mat_str)
-        lines = re.split(";", mat_str)
-        ie = r"[0-9]+"
-        fe = r"-*[0-9]+\.[0-9]+"
-        dr = re.compile(r"(?:Jac)=(?:sparse\()({ie})".format(ie=ie))
-        exp = re.compile(r"(?:Jac\()({ie}),({ie})(?:\)=)({fe})".format(ie=ie, fe=fe))
-        row = []
-        col = []
-        data = []
-        # Get the dimension from the first line in lines
-        dim = dr.match(lines[0])[1]
-        n = int(dim)
-        for line in lines[1:]:
-            match = exp.match(line)
-            if match is None:
-                continue
-            idx1, idx2, real = match.groups()
-            row.append(int(idx1))
-            col.append(int(idx2))
-            data.append(float(real))
-        sparse_matrix = csr_matrix(
-            (data, (np.asarray(row) - 1, np.asarray(col) - 1)), shape=(n, n)
-        )
         return sparse_matrix.toarray() if full else sparse_matrix
 
     def to_graph(
@@ -1152,35 +1812,28 @@ class SAW(object):
             )
         array = [f"LODFMult:{x}" for x in range(count)]
         if raw:
-            array = ["BusNum", "BusNum:1", "LineCircuit", "LineMW"] + array
-            container = []
-            for batch in partition_all(500, array):
-                df = self.GetParametersMultipleElement("branch", batch)
-                temp = df.apply(pd.to_numeric, errors="coerce")
-                container.append(temp)
-            self.lodf = pd.concat(container, axis=1, copy=False)
+            head = self.GetParametersMultipleElement(
+                "branch", ["BusNum", "BusNum:1", "LineCircuit", "LineMW"]
+            ).apply(pd.to_numeric, errors="coerce")
+            body = pd.DataFrame(self._fetch_field_matrix("branch", array), columns=array)
+            self.lodf = pd.concat([head, body], axis=1, copy=False)
             df_array = self.lodf.to_numpy(dtype=float) / 100
             self.isl = np.any(df_array >= 10, axis=1)
         else:
             if count <= 1000:
-                self._extracted_from_get_lodf_matrix_9(array, ignore_open_branch)
+                self._get_lodf_dense(array, ignore_open_branch)
             else:
-                self._extracted_from_get_lodf_matrix_16(
-                    array, precision, ignore_open_branch
-                )
+                self._get_lodf_sparse(array, precision, ignore_open_branch)
         self.pw_order = original
         return self.lodf, self.isl
 
-    # TODO Rename this here and in `get_lodf_matrix`
-    def _extracted_from_get_lodf_matrix_16(self, array, precision, ignore_open_branch):
+    def _get_lodf_sparse(self, array, precision, ignore_open_branch):
         container = []
         isl = None
-        for batch in partition_all(20, array):
-            df = self.GetParametersMultipleElement("branch", batch)
+        for _, temp in self._iter_field_blocks("branch", array):
             if ignore_open_branch:
-                df.dropna(axis=0, inplace=True)
-                df.reset_index(inplace=True, drop=True)
-            temp = df.to_numpy(dtype=float) / 100
+                temp = temp[~np.isnan(temp).any(axis=1)]
+            temp = temp / 100
             temp = temp.round(precision)
             isl = (
                 np.any(temp >= 10, axis=1)
@@ -1200,32 +1853,160 @@ class SAW(object):
         self.lodf = temp
         self.isl = isl
 
-    # TODO Rename this here and in `get_lodf_matrix`
-    def _extracted_from_get_lodf_matrix_9(self, array, ignore_open_branch):
-        df = self.GetParametersMultipleElement("branch", array)
+    def _get_lodf_dense(self, array, ignore_open_branch):
+        temp = self._fetch_field_matrix("branch", array)
         if ignore_open_branch:
-            df.dropna(axis=0, inplace=True)
-            df.reset_index(inplace=True, drop=True)
-        temp = df.to_numpy(dtype=float) / 100
+            temp = temp[~np.isnan(temp).any(axis=1)]
+        temp = temp / 100
         self.isl = np.any(temp >= 10, axis=1)
         temp[self.isl, :] = 0
         temp[self.isl, self.isl] = -1
         self.lodf = temp
 
-    def get_incidence_matrix(self):
+    def _iter_field_blocks(self, ObjectType: str, fields: list, FilterName: str = ""):
+        """Retrieve many numeric fields, e.g. LODFMult:<n>, in batches
+        and yield them as float blocks.
+
+        The number of fields per SimAuto call adapts to the measured
+        throughput: it doubles while the fields retrieved per second
+        keep improving, and halves once they fall off, within
+        FIELD_BATCH_MIN and FIELD_BATCH_MAX. Each batch is decoded on a
+        worker thread while the next one is being fetched.
+
+        :param ObjectType: Type of object to get parameters for.
+        :param fields: List of numeric fields to retrieve.
+        :param FilterName: Name of an advanced filter defined in the
+            load flow case.
+
+        :returns: Generator of (start, block) tuples, where block is a
+            float array of shape (number of objects, batch width) that
+            holds fields[start:start + batch width]. Missing values are
+            NaN.
         """
-        Obtain the incidence matrix.
+        width = self.FIELD_BATCH_MIN
+        best = 0.0
+        start = 0
+        pending = None
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            while start < len(fields):
+                batch = fields[start : start + width]
+                tic = time.perf_counter()
+                output = self._call_simauto(
+                    "GetParametersMultipleElement",
+                    ObjectType,
+                    convert_list_to_variant(batch),
+                    FilterName,
+                )
+                rate = len(batch) / max(time.perf_counter() - tic, 1e-9)
+
+                # Hand the previous batch over while this one decodes.
+                if pending is not None:
+                    yield pending.result()
+                pending = pool.submit(
+                    lambda s, o, w: (s, self._decode_field_block(o, w)),
+                    start,
+                    output,
+                    len(batch),
+                )
+                start += len(batch)
+
+                if rate >= best:
+                    best = rate
+                    width = min(2 * width, self.FIELD_BATCH_MAX)
+                elif rate < 0.75 * best:
+                    width = max(width // 2, self.FIELD_BATCH_MIN)
+            if pending is not None:
+                yield pending.result()
+
+    def _decode_field_block(self, output, width: int) -> np.ndarray:
+        """Decode the output of GetParametersMultipleElement for numeric
+        fields into a float array of shape (number of objects, width).
+        """
+        if output is None:
+            return np.empty((0, width))
+        block = np.array(output, dtype=object)
+        if self.decimal_delimiter != ".":
+            block = np.char.replace(block.astype(str), self.decimal_delimiter, ".")
+        try:
+            block = block.astype(np.float64)
+        except (ValueError, TypeError):
+            block = np.array(
+                [pd.to_numeric(pd.Series(b), errors="coerce") for b in block],
+                dtype=np.float64,
+            )
+        return block.T
+
+    def _fetch_field_matrix(
+        self, ObjectType: str, fields: list, FilterName: str = ""
+    ) -> np.ndarray:
+        """Retrieve many numeric fields into a single preallocated float
+        array, see _iter_field_blocks. Results larger than MEMMAP_BYTES
+        are written to a memory-mapped .npy file in the temporary
+        directory instead of being held in memory.
+
+        The returned memmap owns its file: the file is deleted once the
+        memmap and every view of it are garbage collected, or at exit.
+        Copy the data (or np.save it) to keep it.
+
+        :returns: Float array of shape (number of objects, len(fields)).
+        """
+        out = None
+        for start, block in self._iter_field_blocks(ObjectType, fields, FilterName):
+            if out is None:
+                shape = (block.shape[0], len(fields))
+                if block.shape[0] * len(fields) * 8 > self.MEMMAP_BYTES:
+                    fd, path = tempfile.mkstemp(suffix=".npy")
+                    os.close(fd)
+                    self.log.info(f"Writing {ObjectType} results to {path}.")
+                    out = np.lib.format.open_memmap(
+                        path, mode="w+", dtype=np.float64, shape=shape
+                    )
+                    # Windows can't delete a mapped file, so delete it once
+                    # the mmap shared by the memmap and its views is closed.
+                    weakref.finalize(out._mmap, _remove_file, path)
+                else:
+                    out = np.empty(shape)
+            out[:, start : start + block.shape[1]] = block
+        return np.empty((0, len(fields))) if out is None else out
+
+    def get_incidence_matrix(
+        self, full: bool = True, closed_only: bool = False, kind: str = None
+    ) -> Union[np.ndarray, csr_matrix]:
+        """
+        Obtain the incidence matrix. Rows are branches, with 1 at the from
+        bus and -1 at the to bus; columns follow the bus order of
+        ListOfDevices.
+
+        :param full: Return a dense int array. Set to False to get a
+            csr_matrix, which is needed for large cases.
+        :param closed_only: Set to True to leave out open branches.
+        :param kind: "line" or "transformer" to keep only that kind of
+            branch.
 
         :returns: Incidence matrix
         """
-        branch = self.ListOfDevices("branch")
+        fields = self.get_key_field_list("branch")
+        if closed_only:
+            fields = fields + ["LineStatus"]
+        if kind is not None:
+            fields = fields + ["BranchDeviceType"]
+        branch = self.GetParametersMultipleElement("branch", fields)
         bus = self.ListOfDevices("bus")
-        incidence = np.zeros([branch.shape[0], bus.shape[0]], dtype=int)
-
-        for i, row in branch.iterrows():
-            incidence[i, row["BusNum"] - 1] = 1
-            incidence[i, row["BusNum:1"] - 1] = -1
-        return incidence
+        buses = bus["BusNum"].to_numpy()
+        keep = branch_mask(
+            branch.get("LineStatus"),
+            branch.get("BranchDeviceType"),
+            closed_only=closed_only,
+            kind=kind,
+        )
+        A = incidence(
+            bus_index(branch["BusNum"].to_numpy(), buses),
+            bus_index(branch["BusNum:1"].to_numpy(), buses),
+            n_bus=len(buses),
+            keep=keep,
+            dtype=int,
+        )
+        return A.toarray() if full else A
 
     def get_shift_factor_matrix(self, method: str = "DC"):
         """
@@ -1252,24 +2033,23 @@ class SAW(object):
         isf_fields = ["MultBusTLRSens"]
         for i in range(1, num_branch):
             isf_fields += [f"MultBusTLRSens:{i}"]
-        container = []
-        for batch in partition_all(500, isf_fields):
-            df = self.GetParametersMultipleElement("Bus", batch)
-            temp = df.apply(pd.to_numeric, errors="coerce")
-            container.append(temp)
-        res = pd.concat(container, axis=1, copy=False)
+        res = self._fetch_field_matrix("Bus", isf_fields)
         self.pw_order = original
-        return res.to_numpy(dtype=float)
+        return res
 
-    def _prepare_sensitivity(self):
+    def _prepare_sensitivity(self, frames: bool = False):
         """
         Prepare the matrix for sensitivity analysis.
+
+        :param frames: Set to True to also return the bus and (closed)
+            branch DataFrames the matrices were built from.
         """
         temp = self.pw_order
         self.pw_order = True
         bus = self.GetParametersMultipleElement("bus", ["BusNum", "BusCat"])
         br = self.GetParametersMultipleElement(
-            "branch", ["BusNum", "BusNum:1", "LineX", "LineStatus"]
+            "branch",
+            self.get_key_field_list("branch") + ["LineX", "LineStatus"],
         )
         # remove the open branches
         br.drop(br.index[br["LineStatus"] == "Open"], inplace=True)
@@ -1287,7 +2067,7 @@ class SAW(object):
         Cft = csr_matrix((np.r_[np.ones(nl), -np.ones(nl)], (i, np.r_[f, t])), (nl, nb))
         x_val = br["LineX"].to_numpy(dtype=float)
         b = 1 / x_val
-        Bf = csr_matrix((np.r_[b, -b], (i, np.r_[f, t])))
+        Bf = csr_matrix((np.r_[b, -b], (i, np.r_[f, t])), (nl, nb))
         Bbus = Cft.T * Bf
 
         # change the values without breaking the sparsity
@@ -1299,8 +2079,36 @@ class SAW(object):
         Bbus.data[first_row_indexes] = 0  # change the slack row to 0
         diag_index = np.where(first_row_indexes == slack)[0]
         Bbus.data[first_row_indexes[diag_index]] = -1
+        if frames:
+            return Bbus, Bf, Cft, slack, noslack, bus, br.reset_index(drop=True)
         return Bbus, Bf, Cft, slack, noslack
 
+    def get_sensitivity(self, max_columns: int = None) -> DCSensitivity:
+        """
+        Factorize the DC network once and return a DCSensitivity, which
+        computes PTDF and LODF rows and columns on request. Use it instead
+        of the *_fast methods when only some branches or buses are of
+        interest, as the full matrices do not fit in memory for large
+        cases.
+
+        Buses and branches are indexed by position in PowerWorld's order,
+        with open branches left out. The bus numbers and branch keys are
+        attached to the result as .buses and .branches.
+
+        :param max_columns: Largest number of rows/columns kept in each of
+            the result's caches. None keeps them all.
+
+        :returns: A DCSensitivity.
+        """
+        Bbus, Bf, Cft, slack, _, bus, br = self._prepare_sensitivity(frames=True)
+        sens = DCSensitivity(Bbus, Bf, Cft, slack, max_columns=max_columns)
+        sens.buses = bus.index.to_numpy(dtype=int)
+        sens.branches = br[self.get_key_field_list("branch")].astype(
+            {"BusNum": int, "BusNum:1": int}
+        )
+        sens.branches["LineCircuit"] = sens.branches["LineCircuit"].str.strip()
+        return sens
+
     def get_shift_factor_matrix_fast(self):
         """
         Calculate the injection shift factor matrix directly using the incidence
@@ -1309,12 +2117,9 @@ class SAW(object):
 
         :returns: A dense float matrix in the numpy array format.
         """
-        Bbus, Bf, _, slack, _ = self._prepare_sensitivity()
-        Bbus[slack, slack] = -1
-        temp = Bf * scipy.sparse.linalg.inv(Bbus)
-        isf = temp.T.todense()
-        isf[slack, :] = 0
-        return isf
+        Bbus, Bf, Cft, slack, _ = self._prepare_sensitivity()
+        sens = DCSensitivity(Bbus, Bf, Cft, slack)
+        return np.asmatrix(sens.ptdf_columns(cache=False).T)
 
     def get_ptdf_matrix_fast(self):
         """
@@ -1323,19 +2128,9 @@ class SAW(object):
 
         :returns: A dense float matrix in the numpy array format.
         """
-        Bbus, Bf, _, slack, noslack = self._prepare_sensitivity()
-        n = Bbus.shape[0]
-        noref = noslack
-        dP = np.eye(n, n)
-
-        # solve for change in voltage angles
-        dTheta = np.zeros((n, n))
-        Bref = Bbus[noslack, :][:, noref].tocsc()
-        dtheta_ref = scipy.sparse.linalg.spsolve(Bref, dP[noslack, :])
-
-        dTheta[noref, :] = dtheta_ref
-
-        return Bf * dTheta
+        Bbus, Bf, Cft, slack, _ = self._prepare_sensitivity()
+        sens = DCSensitivity(Bbus, Bf, Cft, slack)
+        return sens.ptdf_columns(cache=False)
 
     def get_lodf_matrix_fast(self):
         """
@@ -1344,57 +2139,37 @@ class SAW(object):
 
         :returns: A dense float matrix in the numpy array format.
         """
-        Bbus, Bf, Cft, slack, noslack = self._prepare_sensitivity()
-        n = Bbus.shape[0]
-        dP = np.eye(n, n)
-
-        # solve for change in voltage angles
-        dTheta = np.zeros((n, n))
-        Bref = Bbus[noslack, :][:, noslack].tocsc()
-        dtheta_ref = scipy.sparse.linalg.spsolve(Bref, dP[noslack, :])
-
-        dTheta[noslack, :] = dtheta_ref
-        PTDF = Bf * dTheta
-
-        H = PTDF * Cft.T
-        numerical_zero = 1e-10
-
-        nl, nb = PTDF.shape
-        # this loop avoids the divisions by zero
-        # in those cases the LODF column should be zero
-        LODF = np.zeros((nl, nl))
-        div = 1 - H.diagonal()
-        islands = []
-        for j in range(H.shape[1]):
-            if abs(div[j]) > numerical_zero:
-                LODF[:, j] = H[:, j] / div[j]
-            else:
-                islands.append(j)
+        Bbus, Bf, Cft, slack, _ = self._prepare_sensitivity()
+        sens = DCSensitivity(Bbus, Bf, Cft, slack)
+        return sens.lodf(cache=False)
 
-        res = LODF - np.diag(np.diag(LODF)) - np.eye(nl, nl)
-        return res.T
-
-    def fast_n1_test(self):
+    def fast_n1_test(self, workers: int = 1):
         """
         A pure LODF-based fast N-1 contingency analysis implementation.
+        LODF rows are computed and screened in blocks of about
+        SCREEN_BYTES, so the full LODF matrix is never formed.
+
+        :param workers: Number of threads screening contingencies.
 
         :returns: A boolean value to indicate whether the system is N-1 secure.
         """
-        LODF = self.get_lodf_matrix_fast()
-        temp = LODF.copy()
-        np.fill_diagonal(temp, 0)
-        isl = np.invert(np.any(temp, axis=1))
+        sens = self.get_sensitivity()
+        isl = sens.islands(max_bytes=self.SCREEN_BYTES)
         print(f"There are {np.sum(isl)} branches that could cause islanding.")
         original = self.pw_order
         self.pw_order = True
-        br = self.GetParametersMultipleElement("branch", ["LineMW", "LineLimMVA"])
+        br = self.GetParametersMultipleElement(
+            "branch", ["LineMW", "LineLimMVA", "LineStatus"]
+        )
         self.pw_order = original
+        # match the branches of the sensitivities
+        br = br[br["LineStatus"] != "Open"]
         flows = br["LineMW"].to_numpy(dtype=float)
         limits = br["LineLimMVA"].to_numpy(dtype=float)
-        limits[limits == 0] = np.inf
-        post_flows = flows + LODF * flows
-        res = np.invert(np.any(post_flows > limits, axis=0))
-        secure = np.all(res)
+        violations = sens.screen_n1(
+            flows, limits, max_bytes=self.SCREEN_BYTES, workers=workers
+        )
+        secure = violations.empty
         print("---------- Omitting the islanding cases ----------")
         print(f"N-1 secure: {secure}")
         return secure
@@ -1569,6 +2344,10 @@ class SAW(object):
         "An entropy-based metric to quantify the robustness of power grids
         against cascading failures." Safety science 59 (2013): 126-134.
 
+        Branches are directed along their flow and parallel branches are
+        counted separately. To evaluate many operating points at once,
+        use gridwb._robustness.rcf directly.
+
         :returns: The RCF value.
         """
         warnings.warn("Please make sure the current system state is valid")
@@ -1580,82 +2359,20 @@ class SAW(object):
             "BranchDeviceType",
         ]
         branch_df = self.GetParametersMultipleElement("branch", kf)
-        if (branch_df["LineLimMVA"] == 0).all():
+        if (branch_df["LineLimMVA"].astype(float) == 0).all():
             warnings.warn("Line limits are missing or infinite")
-        for index, row in branch_df.iterrows():
-            linemw = row["LineMW"]
-            if linemw < 0:
-                original_from = row["BusNum"]
-                original_to = row["BusNum:1"]
-                branch_df.loc[index, "LineMW"] = abs(linemw)
-                branch_df.loc[index, "BusNum"] = original_to
-                branch_df.loc[index, "BusNum:1"] = original_from
-
-        graph = nx.from_pandas_edgelist(
-            branch_df,
-            "BusNum",
-            "BusNum:1",
-            create_using=nx.MultiDiGraph,
-            edge_key="LineCircuit",
-            edge_attr=["LineMW", "LineLimMVA", "LineMaxPercent", "BranchDeviceType"],
+        _, buses = np.unique(
+            branch_df[["BusNum", "BusNum:1"]].to_numpy(dtype=int), return_inverse=True
         )
-        for edge in graph.edges:
-            out_node = edge[0]
-            total = 0
-            for out_edge in graph.out_edges(out_node, data="LineMW"):
-                total += out_edge[2]
-            if total == 0:
-                total += 0.000001
-            for key in list(graph[edge[0]][edge[1]].keys()):
-                p = graph[edge[0]][edge[1]][key]["LineMW"] / float(
-                    total
-                )  # Assume no parallel lines
-                graph[edge[0]][edge[1]][key]["p"] = p
-                graph[edge[0]][edge[1]][key]["tolerance"] = 100 / (
-                    graph[edge[0]][edge[1]][key]["LineMaxPercent"] + 0.000001
-                )
-
-        output_nodes = [u for u, deg in graph.out_degree() if deg]
-        for node in output_nodes:
-            H = 0
-            nodal_robust = 0
-            out_edge_copy = (None, None, None)
-            for out_edge in graph.out_edges(node, data="p"):
-                p = out_edge[2]
-                if out_edge[0] == out_edge_copy[0] and out_edge[1] == out_edge_copy[1]:
-                    tolerance = graph[out_edge[0]][out_edge[1]]["2"][
-                        "tolerance"
-                    ]  # Assume no parallel lines
-                else:
-                    tolerance = graph[out_edge[0]][out_edge[1]]["1"][
-                        "tolerance"
-                    ]  # Assume no parallel lines
-                # Some p = 0, and assume the base is 10
-                H += p * math.log(p + 1e-6, 10)
-                nodal_robust += tolerance * p * math.log(p + 1e-6, 10)
-                out_edge_copy = out_edge
-            graph.nodes[node]["H"] = H
-            graph.nodes[node]["nodal_robust"] = -nodal_robust
-
-        total_distribution = 0
-        for node in output_nodes:
-            for out_edge in graph.out_edges(node, data="LineMW"):
-                total_distribution += out_edge[2]
-        for node in output_nodes:
-            node_dist = 0
-            for out_edge in graph.out_edges(node, data="LineMW"):
-                node_dist += out_edge[2]
-            node_significance = node_dist / total_distribution
-            graph.nodes[node]["node_significance"] = node_significance
-
-        rcf = 0
-        for node in output_nodes:
-            rcf += (
-                graph.nodes[node]["nodal_robust"]
-                * graph.nodes[node]["node_significance"]
+        buses = buses.reshape(-1, 2)
+        return float(
+            rcf(
+                buses[:, 0],
+                buses[:, 1],
+                branch_df["LineMW"].to_numpy(dtype=float),
+                branch_df["LineMaxPercent"].to_numpy(dtype=float),
             )
-
-        return rcf
+        )
 
     def run_ecological_analysis(self, target: str = "MW", split_generator: bool = True):
         """
@@ -1678,7 +2395,7 @@ class SAW(object):
 
         :results: it is a list of ecological metrics, including the Ecological Robustness (Reco),
             the Ascendancy (ASC), the Development Capacity (DC), the Cycled Throughflow (tstc), the Finn Cycling Index (CI)
-            and the Total System Overhead (TSO)
+            and the Total System Overhead (TSO), followed by the energy flow matrix as a csr_matrix
         """
         warnings.warn("Please make sure the current system state is valid")
 
@@ -1694,13 +2411,9 @@ class SAW(object):
             "LineLossMVR",
         ]
         branch_df = self.GetParametersMultipleElement("branch", kf)
-        # add a function to get LinelossMVA
-        LinelossMVA = np.zeros(len(branch_df))
-        for i in range(len(branch_df)):
-            realloss = branch_df["LineLossMW"][i]
-            reactiveloss = branch_df["LineLossMVR"][i]
-            LinelossMVA[i] = np.sqrt(pow(realloss, 2) + pow(reactiveloss, 2))
-        branch_df["LineLossMVA"] = LinelossMVA
+        branch_df["LineLossMVA"] = np.hypot(
+            branch_df["LineLossMW"].astype(float), branch_df["LineLossMVR"].astype(float)
+        )
         gen_keys = self.get_key_field_list("gen") + [
             "GenMW",
             "GenMVR",
@@ -1715,185 +2428,29 @@ class SAW(object):
         load = self.GetParametersMultipleElement("load", load_keys)
         bus_keys = self.get_key_field_list("bus")
         bus = self.GetParametersMultipleElement("bus", bus_keys)
-        bus.reset_index(inplace=True)
-        bus.set_index("BusNum", inplace=True)
-        f = branch_df["BusNum"].map(bus["index"]).to_numpy(dtype=int)
-        t = branch_df["BusNum:1"].map(bus["index"]).to_numpy(dtype=int)
-        branch_df["findex"] = f
-        branch_df["tindex"] = t
-        gen["gindex"] = gen["BusNum"].map(bus["index"])
-        load["loadindex"] = load["BusNum"].map(bus["index"])
+        buses = bus["BusNum"].to_numpy(dtype=int)
 
-        # main algorithm
-        num_bus = bus.shape[0]
-        num_load = load.shape[0]
-        num_branch = branch_df.shape[0]
-        if split_generator:
-            # Option 1  -- the previous way to study the overall robustness,
-            # It should be better since it captures the generators' robustness
-            # not aggregate gen
-            num_gen = gen.shape[0]
-            num_actor = num_gen + num_bus + 3
-            s = (num_actor, num_actor)
-            EFM = np.zeros(s)
-            # print(num_gen)
-            # print(num_bus)
-            # feed generator to first row
-            # for i in range(num_gen):
-            #     flow = gen.loc[i, f"Gen{target}"]
-            #     EFM[0][i+1] += flow  # [row][col]
-            EFM[0][1 : 1 + num_gen] = gen[f"Gen{target}"]
-
-            # feed generator to diagonal between Gen and Bus
-            for i in range(num_bus):
-                for j in range(num_gen):
-                    if i == gen.gindex[j]:
-                        EFM[j + 1][1 + num_gen + i] = EFM[0][j + 1]
-
-            # feed load to last second
-            for i in range(num_load):
-                for j in range(num_bus):
-                    if load.loadindex[i] == j:
-                        flow = load.loc[i, f"Load{target}"]
-                        EFM[1 + num_gen + i][1 + num_gen + num_bus] += flow
-
-            # feed line flow to EFM
-            for i in range(num_branch):
-                frombus = branch_df.loc[i, "findex"]
-                tobus = branch_df.loc[i, "tindex"]
-                flow = branch_df.loc[i, f"Line{target}"]
-                if flow > 0:
-                    EFM[1 + frombus + num_gen][1 + tobus + num_gen] += abs(flow)
-                else:
-                    EFM[1 + tobus + num_gen][1 + frombus + num_gen] += abs(flow)
-                losses = branch_df.loc[i, f"LineLoss{target}"]
-                # feed losses
-                EFM[1 + num_gen + frombus][2 + num_bus + num_gen] += abs(losses)
+        def index(df, field):
+            return bus_index(df[field].to_numpy(dtype=int), buses)
 
-        else:
-            # Option 2 #### Not considering generators' robustness
-            # aggregate gen
-            gen_unique = list(set(gen.BusNum))
-            num_gen = len(gen_unique)
-            num_actor = num_gen + num_bus + 3
-            s = (num_actor, num_actor)
-            EFM = np.zeros(s)
-
-            # feed generator to first row
-            for i in range(num_gen):
-                for j in range(len(gen)):
-                    if gen_unique[i] == gen.gindex[j]:
-                        flow = gen.loc[i, f"Gen{target}"]
-                        EFM[0][i + 1] += flow  # [row][col]
-
-            # feed generator to diagonal between Gen and Bus
-            for i in range(num_bus):
-                for j in range(num_gen):
-                    if i == gen_unique[j]:
-                        EFM[j + 1][1 + num_gen + i] = EFM[0][j + 1]
-
-            # feed load to last second
-            for i in range(num_load):
-                for j in range(num_bus):
-                    if load.BusNum[i] == j:
-                        flow = load.loc[i, f"Load{target}"]
-                        EFM[1 + num_gen + i][1 + num_gen + num_bus] += flow
-
-            # feed line flow to EFM
-            for i in range(num_branch):
-                frombus = branch_df.loc[i, "findex"]
-                tobus = branch_df.loc[i, "tindex"]
-                flow = branch_df.loc[i, f"Line{target}"]
-                if flow > 0:
-                    EFM[1 + frombus + num_gen][1 + tobus + num_gen] += abs(flow)
-                else:
-                    EFM[1 + tobus + num_gen][1 + frombus + num_gen] += abs(flow)
-                losses = branch_df.loc[i, f"LineLoss{target}"]
-                # feed losses
-                EFM[1 + num_gen + frombus][2 + num_bus + num_gen] += abs(losses)
+        # main algorithm
+        # split_generator=True captures each generator's robustness, while
+        # False aggregates the generators of each bus
+        EFM = energy_flow_matrix(
+            index(gen, "BusNum"),
+            gen[f"Gen{target}"].to_numpy(dtype=float),
+            index(load, "BusNum"),
+            load[f"Load{target}"].to_numpy(dtype=float),
+            index(branch_df, "BusNum"),
+            index(branch_df, "BusNum:1"),
+            branch_df[f"Line{target}"].to_numpy(dtype=float),
+            branch_df[f"LineLoss{target}"].to_numpy(dtype=float),
+            n_bus=len(buses),
+            split_generator=split_generator,
+        )
 
         # All ecological metrics
-        T = EFM
-        tstp = sum(T)
-
-        k = 1  # coefficient variable
-        P = T.transpose()
-        # P_rsum=sum(P,dims=2) sum over row
-        # P_csum=sum(P,dims=1) sum over columns
-
-        P_csum = P.sum(axis=0)  # sum over columns
-        P_rsum = P.sum(axis=1)  # sum over rows
-
-        k = 1
-        s = len(T)
-        Q = np.zeros((s, s))
-
-        tstp = T.sum()
-
-        for i in range(len(T)):
-            if P_rsum[i] > 0 and P_rsum[1] != 0:
-                Q[i] = P[i] / P_rsum[1]
-            else:
-                i = i + 1
-
-        # N = inv(eye(size(P,1))-Q);  % Leontief's Inverse
-        N = np.linalg.inv(np.eye(s) - Q)
-
-        inflow = T[0].sum()  # sum(T[1,:])
-
-        # sum(sum(T[2:(s-2),2:(s-2)]));
-        internal_flow = sum(sum(T[1 : s - 2][1 : s - 2]))
-
-        # total system throughflow (inflow + internal_flow)
-        tstf = inflow + internal_flow
-
-        mpl = tstf / inflow  # mean path length
-
-        d_N = N.diagonal()  # diagonal elements of the N matrix
-
-        # c_re = (d_N[2:(n_T-2)]-ones(size(d_N[2:(n_T-2)]))) ./ d_N[2:(n_T-2)];
-        temp = d_N[1 : s - 2]
-        temp1 = np.ones(s - 3)
-        c_re = (temp - temp1) / temp  # cycling efficiency vector
-
-        # tstc = c_re.transpose()*P_rsum[1:s-2]; # cycled throughflow
-        tstc = np.dot(c_re.transpose(), P_rsum[1 : s - 2])
-
-        ci = tstc / tstf  # Finn Cycling Index (CI)
-
-        AMI_ij = np.zeros((s, s))  # Average Mutual Information (AMI)
-        T_csum = T.sum(axis=0)  # sum over colums
-        T_rsum = T.sum(axis=1)  # sum over rows
-
-        # i=1;
-        for i in range(len(T)):
-            for j in range(len(T)):
-                den = T_rsum[i] * T_csum[j]
-                if den == 0:
-                    AMI_ij[i][j] = 0
-                else:
-                    value = (T[i][j] * tstp) / den
-                    if value > 0:
-                        AMI_ij[i][j] = (T[i][j] / tstp) * math.log(value, 2)
-                    else:
-                        AMI_ij[i][j] = 0
-
-        ami = sum(sum(AMI_ij))
-        asc = ami * tstp  # Ascendancy (ASC)
-
-        DC_ij = np.zeros((s, s))  # Development Capacity (DC)
-        for i in range(len(T)):
-            for j in range(len(T)):
-                value = T[i][j] / tstp
-                if value > 0:
-                    DC_ij[i][j] = T[i][j] * math.log(value, 2)
-                else:
-                    DC_ij[i][j] = 0
-        dc = -1 * sum(sum(DC_ij))
-
-        tso = dc - asc  # Total System Overhead (TSO)
-
-        reco = -1 * k * (asc / dc) * math.log(asc / dc)  # Robustness (R)
+        reco, asc, dc, tstc, ci, tso = ecological_metrics(EFM)
 
         # Here are all ecosystems' metrics can be calculated
         # tstc: cycled throughflow
@@ -1902,7 +2459,7 @@ class SAW(object):
         # asc: Ascendancy (ASC)
         # dc:  Development Capacity (DC)
         ## robustness: Reco
-        # EFM: energy flow matrix of corresponding power system, it is a matrix
+        # EFM: energy flow matrix of corresponding power system, it is a sparse matrix
         return [reco, asc, dc, tstc, ci, tso, EFM]
 
     def n1_fast(self, c1_isl, count, lodf, f, lim):
@@ -1919,16 +2476,19 @@ class SAW(object):
         ctg = np.zeros(count, dtype=int)
         violations = np.zeros(count, dtype=int)
         margins = np.zeros(count)
-        for i in range(count):
-            if c1_isl[i] == 0:
-                flows = f + lodf[i, :] * f[i]
-                qq = abs(flows) / lim
-                violating_lines = abs(flows) > lim
-                num_of_violations = np.sum(violating_lines)
-                margins = np.maximum(margins, qq)
-                if num_of_violations:
-                    ctg[i] = 1
-                    violations[np.ravel(violating_lines)] += 1
+        lodf = np.asarray(lodf)
+        f = np.asarray(f, dtype=float).ravel()
+        lim = np.asarray(lim, dtype=float).ravel()
+        # screen the contingencies in blocks of rows of the LODF matrix
+        candidates = np.flatnonzero(np.asarray(c1_isl).ravel() == 0)
+        size = max(1, self.SCREEN_BYTES // (8 * 3 * max(count, 1)))
+        for start in range(0, len(candidates), size):
+            rows = candidates[start : start + size]
+            flows = np.abs(f + lodf[rows, :] * f[rows, None])
+            margins = np.maximum(margins, (flows / lim).max(axis=0))
+            violating_lines = flows > lim
+            ctg[rows] = violating_lines.any(axis=1)
+            violations += violating_lines.sum(axis=0)
         print(f"The size of N-1 islanding set is {np.sum(c1_isl)}")
         print(
             f"Fast N-1 analysis was performed, {np.sum(ctg)} dangerous N-1 contigencies were found, "
@@ -1957,164 +2517,220 @@ class SAW(object):
         lim[lines > 0] = margins[lines > 0] * lim[lines > 0] / mm
         return lim
 
-    def n2_fast(self, c1_isl, count, lodf, f, lim):
-        """A modified fast N-2 method.
+    def n2_fast(
+        self, c1_isl, count, lodf, f, lim, tile: int = None, dtype=np.float64
+    ):
+        """A modified fast N-2 method. Both bounding phases work on tiles
+        of rows of the LODF matrix, so apart from the LODF matrix only
+        boolean count x count masks are kept.
 
         :param c1_isl: Array of islanding lines
         :param count: Number of lines
         :param lodf: LODF matrix
         :param f: Flow on the lines
         :param lim: Array of line limits
+        :param tile: Number of rows per tile. By default, tiles use about
+            SCREEN_BYTES.
+        :param dtype: Float type of the bounds. np.float32 halves the
+            memory per tile, at the cost of precision.
 
         :returns: A tuple of N-2 status (bool) and the N-2 result (if exist)
         """
         print("Start fast N-2 analysis")
-        c2_isl = np.zeros([count, count])
-        A0 = np.ones([count, count]) - np.eye(count)
-        B0 = np.ones([count, count])
-        A = np.zeros([count, count])
-        denominator = np.ones([count, count])
-        numerator = np.ones([count, count])
+        lodf = np.asarray(lodf)
+        f = np.asarray(f, dtype=float).ravel()
+        lim = np.asarray(lim, dtype=float).ravel()
+        c1 = np.asarray(c1_isl).ravel() == 1
         tr = 1e-8
-        A0[c1_isl == 1, :] = 0
-        A0[:, c1_isl == 1] = 0
-        A0[abs(f) < tr, :] = 0
-        A0[:, abs(f) < tr] = 0
-        qq = lodf * (lodf.conj().T)
-        A0[abs(qq - 1) <= tr] = 0
-        c2_isl[abs(qq - 1) <= tr] = 1
-        print("Size of C2_isl is", (np.sum(c2_isl.ravel()) - count) / 2)
-        denominator -= lodf * (lodf.conj().T)
-        numerator += multi_dot([np.diag(1 / f), lodf, np.diag(f)])
-        A[A0.nonzero()] = numerator[A0.nonzero()] / denominator[A0.nonzero()]
-        bp = multi_dot([np.diag(1 / (lim - f)), lodf, np.diag(f)])
-        bn = multi_dot([-np.diag(1 / (lim + f)), lodf, np.diag(f)])
-        bn -= np.diag(np.diag(bn))
-        bp -= np.diag(np.diag(bp))
-        B0 -= np.diag(np.diag(B0))
+        if tile is None:
+            itemsize = np.dtype(dtype).itemsize
+            tile = max(1, self.SCREEN_BYTES // (16 * itemsize * max(count, 1)))
+        tiles = [np.arange(i, min(i + tile, count)) for i in range(0, count, tile)]
+        fd = f.astype(dtype)
+        dp = (lim - f).astype(dtype)
+        dn = (lim + f).astype(dtype)
+
+        # A0: candidate pairs. B0: entries of bp and bn still in use.
+        valid = ~c1 & (abs(f) >= tr)
+        A0 = np.zeros((count, count), dtype=bool)
+        B0 = ~np.eye(count, dtype=bool)
+        c2_isl = 0
+        for rows in tiles:
+            isl = abs(lodf[rows, :] * lodf[:, rows].T - 1) <= tr
+            c2_isl += np.sum(isl)
+            A0[rows] = valid[rows, None] & valid & ~isl
+            A0[rows, rows] = False
+        print("Size of C2_isl is", (c2_isl - count) / 2)
+
+        def a_tiles(rows, mask):
+            # rows of A and of its transpose, zero outside mask
+            L = lodf[rows, :].astype(dtype)
+            LT = lodf[:, rows].T.astype(dtype)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                den = 1 - L * LT
+                A = (1 + L * fd / fd[rows, None]) / den
+                AT = (1 + LT * fd[rows, None] / fd) / den
+            return np.where(mask, A, 0), np.where(mask, AT, 0)
+
+        def b_tiles(rows):
+            # rows of bp and bn, zero outside B0
+            L = lodf[rows, :].astype(dtype)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                bp = L * fd / dp[rows, None]
+                bn = -L * fd / dn[rows, None]
+            bp[~B0[rows]] = 0
+            bn[~B0[rows]] = 0
+            return bp, bn
+
+        def extrema():
+            # running max and min along both axes of a matrix built by tiles
+            return {
+                "max0": np.full(count, -np.inf, dtype=dtype),
+                "min0": np.full(count, np.inf, dtype=dtype),
+                "max1": np.empty(count, dtype=dtype),
+                "min1": np.empty(count, dtype=dtype),
+            }
+
+        def update(ext, rows, M):
+            np.maximum(ext["max0"], M.max(0), out=ext["max0"])
+            np.minimum(ext["min0"], M.min(0), out=ext["min0"])
+            ext["max1"][rows] = M.max(1)
+            ext["min1"][rows] = M.min(1)
+
+        bp_ext, bn_ext = extrema(), extrema()
+        for rows in tiles:
+            bp, bn = b_tiles(rows)
+            update(bp_ext, rows, bp)
+            update(bn_ext, rows, bn)
+
         k = 0
         changing = 1
-        num_isl_ctg = (
-            np.sum(c1_isl.ravel()) * count
-            - np.sum(c1_isl.ravel())
-            + np.sum(c2_isl.ravel()) / 2
-        )
+        num_isl_ctg = np.sum(c1) * count - np.sum(c1) + c2_isl / 2
         kmax = 10
-        storage = {}
 
         while changing == 1 and k < kmax:
-            oldA = np.sum(A0.ravel())
-            oldB = np.sum(B0.ravel())
+            oldA = np.sum(A0)
+            oldB = np.sum(B0)
             print(
                 f"{k} iteration: number of potential contingencies::{oldA / 2: <10}, B::{oldB: <10}; Islanding "
                 f"contingencies: {num_isl_ctg: <10}"
             )
 
             # PHASE I
-            # Wbuf1 = np.maximum(np.diag(bp.max(0)) @ A, np.diag(bp.min(0)) @ A)
-            # Wbuf2 = np.maximum(np.diag(bn.max(0)) @ A, np.diag(bn.min(0)) @ A)
-            # W = np.maximum(Wbuf1 + Wbuf1.conj().T, Wbuf2 + Wbuf2.conj().T)
-            W, Wbuf1, Wbuf2 = initialize_bound(
-                bp.max(0), bp.min(0), bn.max(0), bn.min(0), A
-            )
-
-            storage[k + 1, 1] = A0
-            storage[k + 1, 2] = B0
-            storage[k + 1, 6] = W
-            storage[k + 1, 3] = A
-            storage[k + 1, 4] = bp
-            storage[k + 1, 5] = bn
-            A0[W <= 1] = 0
-            A[A0 == 0] = 0
+            # The bound is symmetric, so the new A0 is symmetric too and
+            # the tiles must all read the old A0.
+            A_ext = extrema()
+            A0_next = np.empty_like(A0)
+            for rows in tiles:
+                A, AT = a_tiles(rows, A0[rows])
+                W = initialize_bound_tile(
+                    bp_ext["max0"], bp_ext["min0"], bn_ext["max0"], bn_ext["min0"],
+                    A, AT, rows,
+                )
+                A0_next[rows] = A0[rows] & ~(W <= 1)
+                A[~A0_next[rows]] = 0
+                update(A_ext, rows, A)
+            A0 = A0_next
 
             # PHASE II
-            Amax0 = A.max(0)
-            Amin0 = A.min(0)
-            Amax1 = A.max(1)
-            Amin1 = A.min(1)
-            Wbuf1 = np.maximum(np.outer(bp.max(1), Amax0), np.outer(bp.min(1), Amin0))
-            Wbuf2 = np.maximum(np.outer(bn.max(1), Amax0), np.outer(bn.min(1), Amin0))
-            # Wb1 = np.maximum(bp @ np.diag(Amax1) + Wbuf1, bp @ np.diag(Amin1) + Wbuf1)
-            # Wb2 = np.maximum(bn @ np.diag(Amax1) + Wbuf2, bn @ np.diag(Amin1) + Wbuf2)
-            # W = np.maximum(Wb1, Wb2)  # bounding matrix for the set B
-            W = calculate_bound(bp, bn, Amax1, Amin1, Wbuf1, Wbuf2)
-            storage[k + 1, 7] = W
-            B0[W <= 1] = 0
-            bn[B0 == 0] = 0
-            bp[B0 == 0] = 0
+            bp_next, bn_next = extrema(), extrema()
+            for rows in tiles:
+                bp, bn = b_tiles(rows)
+                Wbuf1 = np.maximum(
+                    np.outer(bp_ext["max1"][rows], A_ext["max0"]),
+                    np.outer(bp_ext["min1"][rows], A_ext["min0"]),
+                )
+                Wbuf2 = np.maximum(
+                    np.outer(bn_ext["max1"][rows], A_ext["max0"]),
+                    np.outer(bn_ext["min1"][rows], A_ext["min0"]),
+                )
+                W = calculate_bound(
+                    bp, bn, A_ext["max1"], A_ext["min1"], Wbuf1, Wbuf2
+                )  # bounding matrix for the set B
+                B0[rows] &= ~(W <= 1)
+                bp[~B0[rows]] = 0
+                bn[~B0[rows]] = 0
+                update(bp_next, rows, bp)
+                update(bn_next, rows, bn)
+            bp_ext, bn_ext = bp_next, bn_next
             k = k + 1
-            if oldA == np.sum(A0.ravel()) and oldB == np.sum(B0.ravel()):
+            if oldA == np.sum(A0) and oldB == np.sum(B0):
                 changing = 0
         secure, result = self.n2_bruteforce(count, A0, lodf, lim, f)
         return secure, result
 
-    def n2_bruteforce(self, count, A0, lodf, lim, f):
-        """Bruteforce for fast N-2 method
+    def n2_bruteforce(
+        self, count, A0, lodf, lim, f, workers: int = None, chunk: int = 2**20
+    ):
+        """Bruteforce for fast N-2 method. Rows of the upper triangle of A0
+        are enumerated in parallel, with numba threads if numba is
+        available and otherwise with a thread pool.
 
         :param count: number of branches
         :param A0: filtered contingencies
         :param lodf: LODF matrix
         :param lim: branch limits
         :param f: branch flow
-
-        :returns: Security status and detailed results
+        :param workers: Number of threads used without numba. Defaults
+            to the number of CPUs.
+        :param chunk: Number of candidate pairs enumerated at once. Each
+            chunk gets its own result buffer, so memory is bounded by
+            the chunk and the violations found, not by all pairs.
+
+        :returns: Security status and detailed results, an array of
+            (branch, branch, number of violations) rows
         """
+        lodf = np.ascontiguousarray(lodf, dtype=float)
+        f = np.asarray(f, dtype=float).ravel()
+        lim = np.asarray(lim, dtype=float).ravel()
+        A0 = np.asarray(A0)
+
+        # Number of candidate pairs (i, j > i) of every row
+        cols = np.arange(count)
+        candidates = np.zeros(count, dtype=np.int64)
+        for start in range(0, count, 1024):
+            rows = cols[start : start + 1024]
+            candidates[rows] = np.count_nonzero(
+                A0[rows] & (cols > rows[:, None]), axis=1
+            )
+        rows = np.flatnonzero(candidates)
+        total = int(np.sum(candidates))
+        print(f"Bruteforce enumeration over {total} pairs")
+
+        if not use_numba:  # pragma: no cover
+            workers = workers or os.cpu_count() or 1
+            # Enough chunks to keep every thread busy
+            chunk = min(chunk, -(-total // (workers * 4)))
+        ends = np.cumsum(candidates[rows])
+        cuts = np.searchsorted(ends, np.arange(chunk, total, max(chunk, 1)), "right")
+        chunks = np.split(np.arange(len(rows)), np.unique(cuts))
+
+        def run(part):
+            # Violations of the rows in part, as (i, j, num) rows
+            r = rows[part]
+            sizes = candidates[r]
+            offsets = np.r_[0, np.cumsum(sizes)[:-1]].astype(np.int64)
+            out = np.zeros((int(np.sum(sizes)), 3))
+            counts = np.zeros(len(r), dtype=np.int64)
+            fake = np.zeros(len(r), dtype=np.int64)
+            n2_violations(lodf, f, lim, A0, r, offsets, out, counts, fake)
+            starts = np.cumsum(counts) - counts
+            keep = np.repeat(offsets - starts, counts) + np.arange(np.sum(counts))
+            return out[keep], int(np.sum(fake))
 
-        def _compute_violation(
-            lodf, f, c2, lim, i, count, A0, brute_cont, idx
-        ):  # pragma: no cover
-            for j in range(i + 1, count):
-                if A0[i, j]:
-                    temp1 = lodf[i, i] * lodf[j, j]
-                    temp2 = lodf[i, j] * lodf[j, i]
-                    det = temp1 - temp2
-                    if det == 0:
-                        c2[i, j] = 1
-                        c2[j, i] = 1
-                    else:
-                        length = len(f)
-                        num = 0
-                        f_new = np.zeros(length)
-                        temp3 = lodf[j, j] * f[i] - lodf[i, j] * f[j]
-                        temp4 = lodf[i, i] * f[j] - lodf[j, i] * f[i]
-                        xq_0 = temp3 / det
-                        xq_1 = temp4 / det
-                        for k in range(length):
-                            temp5 = lodf[k, i] * xq_0
-                            temp6 = lodf[k, j] * xq_1
-                            f_new[k] = f[k] - temp5 - temp6
-                            if abs(f_new[k]) > lim[k]:
-                                num = num + 1
-                        if f_new[i] > lim[i]:
-                            num = num - 1
-                        if f_new[j] > lim[j]:
-                            num = num - 1
-                        if num > 0:
-                            brute_cont[idx, 0] = i
-                            brute_cont[idx, 1] = j
-                            brute_cont[idx, 2] = num
-                            idx += 1
-            return idx
-
-        # JITify if possible
         if use_numba:  # pragma: no cover
-            print("Numba detected. JIT is used.")
-            compute_violation = nb.njit()(_compute_violation)
+            # numba runs the rows of every chunk in parallel
+            results = [run(part) for part in chunks]
         else:  # pragma: no cover
-            print("Numba is not found. Falling back to Python.")
-            compute_violation = _compute_violation
-
-        # Bruteforce the filtered contingencies
-        k = 0
-        brute_cont = np.zeros((len(f) ** 2, 3))
-        c2 = np.zeros([count, count])
-        print(f"Bruteforce enumeration over {int(np.sum(A0.ravel()) / 2)} pairs")
-        for i in trange(count - 1):
-            if np.sum(A0[i, :] > 0):
-                k = compute_violation(lodf, f, c2, lim, i, count, A0, brute_cont, k)
-        print(
-            f"Processed {100}% percent. Number of contingencies {k}; fake {np.sum(c2.flatten()) / 2}"
-        )
+            # The numpy kernel spends its time in array operations that
+            # release the GIL, so threads run in parallel and share lodf
+            with ThreadPoolExecutor(workers) as pool:
+                results = list(pool.map(run, chunks))
+
+        brute_cont = np.concatenate([out for out, _ in results] + [np.zeros((0, 3))])
+        fake = sum(n for _, n in results)
+        k = len(brute_cont)
+        print(f"Processed {100}% percent. Number of contingencies {k}; fake {fake}")
         if k:
             return False, brute_cont
         else:
@@ -2236,6 +2852,9 @@ class SAW(object):
         :param Values: List of values corresponding to the parameters in
             the ParamList.
         """
+        if self._batch is not None:
+            return self._buffer_changes(ObjectType, [Values], ParamList)
+        self.clear_cache()
         return self._call_simauto(
             "ChangeParametersSingleElement",
             ObjectType,
@@ -2267,6 +2886,10 @@ class SAW(object):
 
         :raises PowerWorldError: if PowerWorld reports an error.
         """
+        if self._batch is not None:
+            return self._buffer_changes(ObjectType, ValueList, ParamList)
+        self.clear_cache()
+
         # Call SimAuto and return the result (should just be None)
         return self._call_simauto(
             "ChangeParametersMultipleElement",
@@ -2315,6 +2938,10 @@ class SAW(object):
         # Call SimAuto and return the result (should just be None)
         if isinstance(ValueList[0], list):
             raise Error("The value list has to be a 1-D array")
+        if self._batch is not None:
+            rows = np.array(ValueList, dtype=object).reshape(NoOfObjects, -1)
+            return self._buffer_changes(ObjectType, rows.tolist(), ParamList)
+        self.clear_cache()
         return self._call_simauto(
             "ChangeParametersMultipleElementFlatInput",
             ObjectType,
@@ -2329,6 +2956,8 @@ class SAW(object):
         `PowerWorld documentation
         <https://www.powerworld.com/WebHelp/Content/MainDocumentation_HTML/CloseCase_Function.htm>`__
         """
+        self.clear_cache()
+        self._filters.clear()
         return self._call_simauto("CloseCase")
 
     def GetCaseHeader(self, filename: str = None) -> Tuple[str]:
@@ -2367,6 +2996,7 @@ class SAW(object):
         """
         # Get the ObjectType in lower case.
         object_type = ObjectType.lower()
+        self._ensure_metadata_cache()
 
         # Either look up stored DataFrame, or call SimAuto.
         try:
@@ -2421,6 +3051,7 @@ class SAW(object):
 
             # Store this for later.
             self._object_fields[object_type] = output
+            self._save_metadata_cache()
 
         # Either return a copy or not.
         return output.copy(deep=True) if copy else output
@@ -2473,7 +3104,11 @@ class SAW(object):
         return self.clean_df_or_series(obj=s, ObjectType=ObjectType)
 
     def GetParametersMultipleElement(
-        self, ObjectType: str, ParamList: list, FilterName: str = ""
+        self,
+        ObjectType: str,
+        ParamList: list,
+        FilterName: str = "",
+        compact: Union[bool, str] = False,
     ) -> Union[pd.DataFrame, None]:
         """Request values of specified fields for a set of objects in
         the load flow case.
@@ -2491,6 +3126,10 @@ class SAW(object):
             get_key_fields_for_object_type method.
         :param FilterName: Name of an advanced filter defined in the
             load flow case.
+        :param compact: Set to True to return compact dtypes, which use
+            much less memory for large cases (see compact_df), or to
+            "float32" to also store measured or solved values as
+            float32. Ignored if pw_order is True.
 
         :returns: Pandas DataFrame with columns matching the given
             ParamList. If the provided ObjectType is not present in the
@@ -2503,6 +3142,25 @@ class SAW(object):
         TODO: Should we cast None to NaN to be consistent with how
             Pandas/Numpy handle bad/missing data?
         """
+        # Hand out copies of cached results, so callers may modify them.
+        key = (ObjectType.lower(), tuple(ParamList), FilterName, self.pw_order)
+        if self.use_cache and key in self._cache:
+            df = self._cache[key]
+            df = None if df is None else df.copy()
+        else:
+            df = self._get_parameters_multiple_element(
+                ObjectType, ParamList, FilterName, key
+            )
+
+        if compact and df is not None and not self.pw_order:
+            df = self.compact_df(df, ObjectType, float32=compact == "float32")
+        return df
+
+    def _get_parameters_multiple_element(
+        self, ObjectType: str, ParamList: list, FilterName: str, key: tuple
+    ) -> Union[pd.DataFrame, None]:
+        """Call GetParametersMultipleElement and cache the cleaned
+        result under key, see GetParametersMultipleElement."""
         output = self._call_simauto(
             "GetParametersMultipleElement",
             ObjectType,
@@ -2511,13 +3169,17 @@ class SAW(object):
         )
         if output is None:
             # Given object isn't present.
-            return output
-
-        # Create DataFrame.
-        df = pd.DataFrame(np.array(output).transpose(), columns=ParamList)
+            df = None
+        else:
+            # Create and clean DataFrame.
+            df = pd.DataFrame(np.array(output).transpose(), columns=ParamList)
+            df = self.clean_df_or_series(
+                obj=df, ObjectType=ObjectType, FilterName=FilterName
+            )
 
-        # Clean DataFrame and return it.
-        return self.clean_df_or_series(obj=df, ObjectType=ObjectType)
+        if self.use_cache:
+            self._cache[key] = None if df is None else df.copy()
+        return df
 
     def GetParametersMultipleElementFlatOutput(
         self, ObjectType: str, ParamList: list, FilterName: str = ""
@@ -2832,6 +3494,7 @@ class SAW(object):
         `PowerWorld documentation
         <https://www.powerworld.com/WebHelp/#MainDocumentation_HTML/LoadState_Function.htm>`__
         """
+        self.clear_cache()
         return self._call_simauto("LoadState")
 
     def OpenCase(self, FileName: Union[str, None] = None) -> None:
@@ -2859,6 +3522,8 @@ class SAW(object):
             self.pwb_file_path = FileName
 
         # Open the case. PowerWorld should return None.
+        self.clear_cache()
+        self._filters.clear()
         return self._call_simauto("OpenCase", self.pwb_file_path)
 
     def OpenCaseType(
@@ -2892,6 +3557,8 @@ class SAW(object):
             options = Options
         else:
             options = ""
+        self.clear_cache()
+        self._filters.clear()
         return self._call_simauto("OpenCaseType", self.pwb_file_path, FileType, options)
 
     def ProcessAuxFile(self, FileName):
@@ -2907,6 +3574,7 @@ class SAW(object):
         `PowerWorld documentation
         <https://www.powerworld.com/WebHelp/Content/MainDocumentation_HTML/ProcessAuxFile_Function.htm>`__
         """
+        self.clear_cache()
         return self._call_simauto("ProcessAuxFile", FileName)
 
     def RunScriptCommand(self, Statements):
@@ -2919,6 +3587,7 @@ class SAW(object):
         `Auxiliary File Format
         <https://github.com/mzy2240/ESA/blob/master/docs/Auxiliary%20File%20Format.pdf>`__
         """
+        self._clear_cache_for_script(Statements)
         return self._call_simauto("RunScriptCommand", Statements)
 
     def RunScriptCommand2(self, Statements: str, StatusMessage: str):
@@ -2939,6 +3608,7 @@ class SAW(object):
         `Auxiliary File Format
         <https://github.com/mzy2240/ESA/blob/master/docs/Auxiliary%20File%20Format.pdf>`__
         """
+        self._clear_cache_for_script(Statements)
         return self._pwcom.RunScriptCommand2(Statements, StatusMessage)
 
     def SaveCase(self, FileName=None, FileType="PWB", Overwrite=True):
@@ -3460,6 +4130,10 @@ class SAW(object):
         # issues later (e.g. comparing ' 1 ' and '1').
         cleaned_df = self.clean_df_or_series(obj=command_df, ObjectType=ObjectType)
 
+        if self._batch is not None:
+            self._buffer_changes(ObjectType, cleaned_df.copy())
+            return cleaned_df
+
         # Convert columns and data to lists and call PowerWorld.
         # noinspection PyTypeChecker
         self.ChangeParametersMultipleElement(
@@ -3592,6 +4266,76 @@ class SAW(object):
             return data
 
 
+def read_matlab_sparse(path: str, name: str, complex_values: bool = False) -> csr_matrix:
+    """Read a sparse matrix saved by PowerWorld in Matlab format, e.g.
+    by SaveYbusInMatlabFormat or SaveJacobian::
+
+        Ybus = sparse(3);
+        Ybus(1,1) = 12.3 + j*(-45.6);
+
+    The file is read once and its numbers are extracted in bulk: the
+    entry text is reduced to whitespace separated numbers with
+    byte-level substitutions, split and converted in one numpy cast,
+    with no per-entry parsing in Python. If the result doesn't add up
+    (e.g. an unexpected statement in the file), the entries are parsed
+    with a regular expression instead.
+
+    :raises ValueError: If the matrix is not in the file, or if some of
+        its entries cannot be parsed.
+
+    :param path: Path to the file.
+    :param name: Name of the matrix variable, e.g. 'Ybus' or 'Jac'.
+    :param complex_values: Whether entries are complex (a + j*(b)).
+
+    :returns: The matrix in csr format.
+    """
+    name = name.encode()
+    with open(path, "rb") as f:
+        text = f.read()
+    dim = re.search(rb"%s\s*=\s*sparse\(\s*(\d+)" % name, text)
+    if dim is None:
+        raise ValueError(f"No sparse matrix {name.decode()} found in {path}.")
+    n = int(dim[1])
+    body = text[text.find(b";", dim.end()) + 1 :]
+    del text
+
+    width = 4 if complex_values else 3
+    count = body.count(name + b"(")
+    if complex_values:
+        # "a + j*(b)" becomes "a +   b", then "a     b". An exponent sign
+        # is never followed by a space.
+        text = body.translate(_MATLAB_SEPARATORS, name + b"j").replace(b"+ ", b"  ")
+    else:
+        text = body.translate(_MATLAB_SEPARATORS, name)
+    try:
+        values = np.array(text.split(), dtype=np.float64)
+    except ValueError:
+        values = np.empty(0)
+    if values.size != count * width:
+        # Fall back to matching the entries one by one.
+        fe = rb"([-+]?[0-9.]+(?:[eE][-+]?[0-9]+)?)"
+        entry = rb"%s\(\s*(\d+)\s*,\s*(\d+)\s*\)\s*=\s*%s" % (name, fe)
+        if complex_values:
+            entry += rb"\s*\+\s*j\s*\*\s*\(\s*%s" % fe
+        entries = re.findall(entry, body)
+        if len(entries) != count:
+            raise ValueError(
+                f"Could only parse {len(entries)} of the {count} entries of "
+                f"{name.decode()} in {path}."
+            )
+        values = np.array(entries, dtype=float).ravel()
+    values = values.reshape(-1, width)
+
+    data = values[:, 2] + 1j * values[:, 3] if complex_values else values[:, 2]
+    rows = values[:, 0].astype(np.int64) - 1
+    cols = values[:, 1].astype(np.int64) - 1
+    return coo_matrix((data, (rows, cols)), shape=(n, n)).tocsr()
+
+
+# Punctuation between the numbers of a Matlab sparse matrix entry.
+_MATLAB_SEPARATORS = bytes.maketrans(b"(),=;*", b"      ")
+
+
 def df_to_aux(fp, df, object_name: str):
     """Convert a dataframe to PW aux/axd data section.
 
@@ -3599,9 +4343,52 @@ def df_to_aux(fp, df, object_name: str):
     :param df: dataframe
     :param object_name: object type
     """
-    # write the header
-    fields = ",".join(df.columns.tolist())
-    header = f"DATA ({object_name}, [{fields}])"
+    for chunk in aux_data(object_name, df):
+        fp.write(chunk)
+
+
+def aux_data(
+    object_name: str,
+    data: Union[pd.DataFrame, np.ndarray],
+    fields: Union[List[str], None] = None,
+    chunk_size: int = 10000,
+):
+    """Format a block of data as a PW aux/axd data section, in chunks
+    of rows so large blocks can be streamed to disk (see
+    SAW.exec_aux). Values are formatted a column at a time, as JSON
+    values (see _format_aux_column): strings are double quoted and
+    escaped, and numbers are written in their shortest round-trip
+    representation.
+
+    :param object_name: object type
+    :param data: DataFrame, or two-dimensional array with one column
+        per field.
+    :param fields: Fields of the columns of data. Defaults to the
+        DataFrame's columns.
+    :param chunk_size: Number of rows per chunk.
+
+    :returns: Generator of strings which together make up the data
+        section.
+    """
+    if fields is None:
+        fields = data.columns.tolist()
+    if isinstance(data, pd.DataFrame):
+        columns = [data.iloc[:, j].to_numpy() for j in range(data.shape[1])]
+    else:
+        data = np.asarray(data)
+        columns = list(data.reshape(len(data), -1).T)
+
+    yield "\n".join(_aux_header(object_name, fields) + ["{"]) + "\n"
+    n = len(columns[0]) if columns else 0
+    for start in range(0, n, chunk_size):
+        block = [_format_aux_column(c[start : start + chunk_size]) for c in columns]
+        yield "".join(" ".join(row) + "\n" for row in zip(*block))
+    yield "}\r\n"
+
+
+def _aux_header(object_name: str, fields: List[str]) -> List[str]:
+    """Lines of a data section header, wrapped at 86 characters."""
+    header = f"DATA ({object_name}, [{','.join(fields)}])"
     header_chunks = header.split(",")
     i = 0
     line_width = 0
@@ -3622,17 +4409,64 @@ def df_to_aux(fp, df, object_name: str):
                 container.append(",".join(working_line))
             break
     container = [ls + "," for ls in container[:-1]] + [container[-1]]
-    container = [container[0]] + [
-        "    " + ls for ls in container[1:]
-    ]  # add tab to each line
+    return [container[0]] + ["    " + ls for ls in container[1:]]  # add tab to each line
+
+
+def _format_aux_column(values: np.ndarray) -> list:
+    """Format one column of values for an aux data section, as JSON
+    values: strings are double quoted with quotes and backslashes
+    escaped, booleans are true/false and missing numbers are NaN.
+    Numeric columns are converted at once."""
+    kind = values.dtype.kind
+    if kind == "b":
+        return np.where(values, "true", "false").tolist()
+    if kind in "iu":
+        return values.astype(str).tolist()
+    if kind == "f":
+        values = values.astype(np.float64)
+        text = values.astype(str).astype(object)
+        if not np.isfinite(values).all():
+            text[np.isnan(values)] = "NaN"
+            text[np.isposinf(values)] = "Infinity"
+            text[np.isneginf(values)] = "-Infinity"
+        return text.tolist()
+    return [_aux_value(v) for v in values.tolist()]
+
+
+def _aux_value(value) -> str:
+    """Format a single value for an aux data section, see
+    _format_aux_column."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    elif value is pd.NA:
+        value = np.nan
+    return json.dumps(value)
+
+
+def _remove_file(path: str) -> None:
+    """Delete a temporary file, if it's still there. Warns if it can't
+    be deleted, e.g. when it's still mapped at exit on Windows."""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        warnings.warn(f"Could not delete the temporary file {path}: {e}")
+
 
-    # write the remaining part
-    container.append("{")
-    container.extend(
-        json.dumps(row, separators=(" ", ": "))[1:-1] for row in df.values.tolist()
-    )
-    container.append("}\r\n")
-    fp.write("\n".join(container))
+def _blank_to_nan(values: np.ndarray) -> np.ndarray:
+    """Strip string values, and replace blank ones with 'nan' so they
+    cast to NaN."""
+    values = np.char.strip(np.asarray(values).astype(str))
+    return np.where(values == "", "nan", values)
+
+
+def _to_float_or_none(values: np.ndarray) -> Union[np.ndarray, None]:
+    """Cast values to float64, or return None if that isn't possible."""
+    try:
+        return values.astype(np.float64)
+    except (ValueError, TypeError):
+        return None
 
 
 def convert_to_windows_path(p):
@@ -3645,6 +4479,9 @@ def convert_list_to_variant(list_in: list) -> VARIANT:
 
     :param list_in: Simple one-dimensional Python list, e.g. [1, 'a', 7]
     """
+    # Without pywin32 there is no COM marshalling, so pass lists along.
+    if not use_pywin32:
+        return list_in
     # noinspection PyUnresolvedReferences
     return VARIANT(pythoncom.VT_VARIANT | pythoncom.VT_ARRAY, list_in)
 
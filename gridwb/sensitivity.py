@@ -0,0 +1,267 @@
+"""DC power flow sensitivities (PTDF, ISF and LODF) computed on demand
+from one sparse LU factorization of the reduced Bbus.
+
+Dense PTDF and LODF matrices grow with the square of the case size, while
+studies usually monitor a small set of branches. DCSensitivity only
+computes the rows and columns asked for, and caches them.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csc_matrix
+from scipy.sparse.linalg import LinearOperator, splu
+
+# Outages with 1 - H[k, k] below this split the network.
+ISLAND_TOL = 1e-10
+
+
+class DCSensitivity:
+    """DC sensitivities of a network.
+
+    Branches are indexed by their row in Bf and Cft, buses by their
+    column. The slack bus picks up every injection, so its PTDF column
+    is zero.
+
+    :param Bbus: Bus susceptance matrix, (buses x buses).
+    :param Bf: Branch susceptance matrix, (branches x buses).
+    :param Cft: Branch incidence matrix, 1 at the from bus and -1 at the
+        to bus, (branches x buses).
+    :param slack: Position of the slack bus.
+    :param max_columns: Largest number of vectors kept in each cache.
+        None keeps them all.
+    """
+
+    def __init__(self, Bbus, Bf, Cft, slack: int, max_columns: int = None):
+        self.Bf = Bf.tocsr()
+        self.Cft = Cft.tocsr()
+        self.n_branch, self.n_bus = self.Bf.shape
+        self.slack = slack
+        self.noslack = np.delete(np.arange(self.n_bus), slack)
+        self.max_columns = max_columns
+        Bbus = csc_matrix(Bbus)
+        self._lu = splu(Bbus[self.noslack, :][:, self.noslack].tocsc())
+        self._ptdf_cols = OrderedDict()
+        self._ptdf_rows = OrderedDict()
+        self._h_cols = OrderedDict()
+
+    def clear_cache(self) -> None:
+        """Drop every cached row and column."""
+        self._ptdf_cols.clear()
+        self._ptdf_rows.clear()
+        self._h_cols.clear()
+
+    def _solve(self, rhs: np.ndarray, trans: str = "N") -> np.ndarray:
+        """Solve Bbus x = rhs for bus angles, with the slack angle at 0.
+        rhs is (buses x k)."""
+        x = np.zeros((self.n_bus, rhs.shape[1]))
+        if rhs.shape[1]:
+            x[self.noslack] = self._lu.solve(
+                np.ascontiguousarray(rhs[self.noslack]), trans=trans
+            )
+        return x
+
+    def _cached(self, cache: OrderedDict, keys, size: int, compute, cache_result: bool):
+        """Return the vectors (of length size) for keys, as columns,
+        computing the missing ones with compute(missing_keys) in one call."""
+        keys = [int(k) for k in np.atleast_1d(keys)]
+        missing = list(dict.fromkeys(k for k in keys if k not in cache))
+        new = {}
+        if missing:
+            block = compute(np.array(missing))
+            new = {k: block[:, i] for i, k in enumerate(missing)}
+        out = np.empty((size, len(keys)))
+        for i, k in enumerate(keys):
+            if k in new:
+                out[:, i] = new[k]
+            else:
+                out[:, i] = cache[k]
+                cache.move_to_end(k)
+        if cache_result:
+            cache.update(new)
+            while self.max_columns is not None and len(cache) > self.max_columns:
+                cache.popitem(last=False)
+        return out
+
+    def ptdf_columns(self, buses=None, cache: bool = True) -> np.ndarray:
+        """PTDF columns: the change of every branch flow per unit injection
+        at each of buses, withdrawn at the slack.
+
+        :param buses: Bus positions. None for all buses.
+        :param cache: Set to False to not keep the result, e.g. when
+            computing the full matrix.
+
+        :returns: A (branches x len(buses)) array.
+        """
+        if buses is None:
+            buses = np.arange(self.n_bus)
+
+        def compute(missing):
+            rhs = np.zeros((self.n_bus, len(missing)))
+            rhs[missing, np.arange(len(missing))] = 1
+            return self.Bf @ self._solve(rhs)
+
+        return self._cached(self._ptdf_cols, buses, self.n_branch, compute, cache)
+
+    def ptdf_rows(self, branches=None, cache: bool = True) -> np.ndarray:
+        """PTDF rows: the change of the flow on each of branches per unit
+        injection at every bus.
+
+        :param branches: Branch positions. None for all branches.
+        :param cache: Set to False to not keep the result.
+
+        :returns: A (len(branches) x buses) array.
+        """
+        if branches is None:
+            branches = np.arange(self.n_branch)
+
+        def compute(missing):
+            rhs = self.Bf[missing].T.toarray()
+            return self._solve(rhs, trans="T")
+
+        return self._cached(self._ptdf_rows, branches, self.n_bus, compute, cache).T
+
+    def _h_columns(self, outages, cache: bool = True) -> np.ndarray:
+        """Columns of H = PTDF Cft^T: the change of every branch flow per
+        unit transfer from the from bus to the to bus of each outage."""
+
+        def compute(missing):
+            rhs = self.Cft[missing].T.toarray()
+            return self.Bf @ self._solve(rhs)
+
+        return self._cached(self._h_cols, outages, self.n_branch, compute, cache)
+
+    def lodf(self, outages=None, monitored=None, cache: bool = True) -> np.ndarray:
+        """LODF: the share of each outaged branch's pre-outage flow that
+        moves to each monitored branch. The diagonal is -1. Outages which
+        split the network have zero rows (but for the diagonal).
+
+        :param outages: Outaged branch positions. None for all branches.
+        :param monitored: Monitored branch positions. None for all
+            branches.
+        :param cache: Set to False to not keep the result.
+
+        :returns: A (len(outages) x len(monitored)) array.
+        """
+        if outages is None:
+            outages = np.arange(self.n_branch)
+        outages = np.atleast_1d(outages).astype(int)
+        return self._lodf_block(outages, monitored, cache)[0]
+
+    def _lodf_block(self, outages: np.ndarray, monitored, cache: bool):
+        """Return the LODF rows of outages and which of them split the
+        network."""
+        H = self._h_columns(outages, cache)
+        div = 1 - H[outages, np.arange(len(outages))]
+        islands = np.abs(div) <= ISLAND_TOL
+        div[islands] = np.inf
+        H /= div
+        if monitored is not None:
+            monitored = np.atleast_1d(monitored).astype(int)
+            H = H[monitored]
+            same = monitored[:, None] == outages[None, :]
+        else:
+            same = np.zeros(H.shape, dtype=bool)
+            same[outages, np.arange(len(outages))] = True
+        H[same] = -1
+        return H.T, islands
+
+    def screen_n1(
+        self,
+        flows,
+        limits,
+        outages=None,
+        monitored=None,
+        threshold: float = 1.0,
+        max_bytes: int = 2**28,
+        workers: int = 1,
+    ) -> pd.DataFrame:
+        """N-1 screening: find the monitored branches loaded above
+        threshold after each single branch outage. LODF rows are computed
+        in blocks, sized so that each worker uses about max_bytes / workers,
+        and never stored whole. Outages which split the network are
+        skipped; see islands().
+
+        :param flows: Pre-contingency flow of every branch.
+        :param limits: Limit of every branch. Zero means no limit.
+        :param outages: Branch positions to outage. None for all.
+        :param monitored: Branch positions to monitor. None for all.
+        :param threshold: Loading (post-contingency flow over limit)
+            above which a branch is reported.
+        :param max_bytes: Memory budget for the LODF blocks.
+        :param workers: Number of threads screening blocks concurrently.
+
+        :returns: A DataFrame of violations, with the columns Contingency
+            and Branch (branch positions) and Loading.
+        """
+        flows = np.asarray(flows, dtype=float)
+        limits = np.asarray(limits, dtype=float).copy()
+        limits[limits == 0] = np.inf
+        if outages is None:
+            outages = np.arange(self.n_branch)
+        if monitored is None:
+            monitored = np.arange(self.n_branch)
+        outages = np.atleast_1d(outages).astype(int)
+        monitored = np.atleast_1d(monitored).astype(int)
+        f_mon = flows[monitored]
+        lim_mon = limits[monitored]
+
+        size = self._block_size(len(monitored), max_bytes, workers)
+
+        def screen(block):
+            L, islands = self._lodf_block(block, monitored, cache=False)
+            loading = np.abs(f_mon + L * flows[block, None]) / lim_mon
+            loading[islands] = 0
+            i, j = np.nonzero(loading > threshold)
+            return block[i], monitored[j], loading[i, j]
+
+        blocks = [outages[i : i + size] for i in range(0, len(outages), size)]
+        if workers > 1:
+            with ThreadPoolExecutor(workers) as pool:
+                results = list(pool.map(screen, blocks))
+        else:
+            results = [screen(block) for block in blocks]
+        if not results:
+            results = [(np.empty(0, int), np.empty(0, int), np.empty(0))]
+        ctg, branch, loading = (np.concatenate(parts) for parts in zip(*results))
+        return pd.DataFrame({"Contingency": ctg, "Branch": branch, "Loading": loading})
+
+    def islands(self, outages=None, max_bytes: int = 2**28) -> np.ndarray:
+        """Return a boolean array, True for each of outages which splits
+        the network. Outages are handled in blocks of about max_bytes."""
+        if outages is None:
+            outages = np.arange(self.n_branch)
+        outages = np.atleast_1d(outages).astype(int)
+        out = np.empty(len(outages), dtype=bool)
+        size = self._block_size(0, max_bytes)
+        for i in range(0, len(outages), size):
+            block = outages[i : i + size]
+            H = self._h_columns(block, cache=False)
+            out[i : i + size] = (
+                np.abs(1 - H[block, np.arange(len(block))]) <= ISLAND_TOL
+            )
+        return out
+
+    def _block_size(self, n_monitored: int, max_bytes: int, workers: int = 1) -> int:
+        """Number of outages per block so that blocks use about max_bytes
+        in total. Per outage, a block holds the rhs and angles, the full
+        H column, and the LODF, flow and loading rows of the monitored
+        branches."""
+        per_outage = 8 * (2 * self.n_bus + self.n_branch + 3 * n_monitored)
+        return max(1, max_bytes // (per_outage * max(workers, 1)))
+
+    def ptdf_operator(self) -> LinearOperator:
+        """PTDF as a (branches x buses) LinearOperator, which maps bus
+        injections to branch flows with one solve per product."""
+        return LinearOperator(
+            (self.n_branch, self.n_bus),
+            matvec=lambda p: self.Bf @ self._solve(p.reshape(-1, 1)).ravel(),
+            matmat=lambda P: self.Bf @ self._solve(P),
+            rmatvec=lambda f: self._solve(
+                (self.Bf.T @ f).reshape(-1, 1), trans="T"
+            ).ravel(),
+            rmatmat=lambda F: self._solve(self.Bf.T @ F, trans="T"),
+            dtype=float,
+        )
@@ -454,10 +454,9 @@ class GIC(PWApp):
         obj = GICInputVoltObject.TYPE
         fields = ['WhoAmI'] + [f'GICObjectInputDCVolt:{i+1}' for i in range(csv.columns.size-1)]
 
-        # Send Field Data
-        for row in csv.to_records(False):
-            cmd = fcmd(obj, fields, list(row)).replace("'", "")
-            self.io.esa.RunScriptCommand(cmd)
+        # Send Field Data in one AUX DATA section (quotes stripped as in SetData)
+        csv[0] = csv[0].astype(str).str.replace("'", "")
+        self.io.setdata(obj, csv, fields)
 
         print("GIC Time Varying Data Uploaded")
     
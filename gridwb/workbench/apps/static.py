@@ -24,9 +24,7 @@ class Statics(PWApp):
     def __init__(self, context: Context) -> None:
         super().__init__(context)
 
-        gens = self.io[Gen, :]
-        buses = self.io[Bus, :]
-        loads = self.io[Load, :]
+        gens, buses = self.io.fetch((Gen, ['GenMVRMax', 'GenMVRMin', 'GenMWMax', 'GenMWMin']), (Bus, 'BusName_NomVolt'))
 
         zipfields = ['LoadSMW', 'LoadSMVR','LoadIMW', 'LoadIMVR','LoadZMW', 'LoadZMVR']
         
@@ -244,7 +242,7 @@ class Statics(PWApp):
                 self.io.pflow() 
 
                 # Fail if slack is at max
-                qall = self.io[Gen, ['GenMVR','GenStatus']]
+                qall = self.io[Gen, ['GenMVR','GenStatus','GenMW']]
                 qclosed = qall['GenStatus']=='Closed'
 
                 # Check Max Reactive Output
@@ -254,7 +252,7 @@ class Statics(PWApp):
                 
                 # Check Max Power Output (Rarer but happens)
                 # Need to be enabled by user because they might not care about slack
-                if plimtol is not None and self.gensAbovePMax(None, qclosed, tol=plimtol):
+                if plimtol is not None and self.gensAbovePMax(qall['GenMW'], qclosed, tol=plimtol):
                     log(' P+ ', end=' ')
                     raise GeneratorLimitException
                 
@@ -453,6 +451,7 @@ class Statics(PWApp):
         This serves as a functional and fast way to apply 'deltas' to base case bus loads.
         Load ID 99 is used so that it does not interfere with existing loads.
         This is a TEMPORARY load. Functions in GWB can and will override any Load ID 99.
+        Only the buses and fields whose values changed are written (see PowerWorldIO.__setitem__).
         params:
         SP: Constant Active Power
         SQ: Constant Reactive Power
@@ -5,10 +5,11 @@ from .powerworld import PowerWorldIO
 class Context:
     '''A Context Object that is passed between applications or instances that carry the live data of GWB'''
 
-    def __init__(self, fname: str) -> None:
-        '''Context of a workbench session. Holds IO Connection and Common Data Maintainer'''
+    def __init__(self, fname: str, use_cache: bool = False) -> None:
+        '''Context of a workbench session. Holds IO Connection and Common Data Maintainer.
+        use_cache: Cache reads until the case changes, see PowerWorldIO'''
         
-        self.io = PowerWorldIO(fname) 
+        self.io = PowerWorldIO(fname, use_cache=use_cache) 
         self.io.open()
 
     def getIO(self) -> PowerWorldIO:
@@ -1,12 +1,15 @@
 from typing import Type
-from pandas import DataFrame
+from contextlib import contextmanager
+from pandas import DataFrame, Index
 from os import path
+import numpy as np
 from numpy import unique
 
 from ..grid.components import *
+from ..grid.snapshot import NetworkSnapshot
 from ..utils.decorators import timing
 from ..io.model import IModelIO
-from ...saw import SAW, CommandNotRespectedError # NOTE Should be the only file importing SAW
+from ...saw import SAW, COMError, CommandNotRespectedError, PowerWorldError, aux_data # NOTE Should be the only file importing SAW
 
 
 # Helper Function to parse Python Syntax/Field Syntax outliers
@@ -16,13 +19,51 @@ fexcept = lambda t: "3" + t[5:] if t[:5] == "Three" else t
 # Power World Read/Write
 class PowerWorldIO(IModelIO):
     esa: SAW
+    ts_ready: bool | None = False
+    ts_error: PowerWorldError | COMError | None = None
+
+    # PowerWorld names its transient stability fields with this prefix
+    # (TSGenDelta, TSBusRad, TSGenMachineState:1, TSCTGName ...)
+    TS_PREFIX = "TS"
+
+    def __init__(self, fname: str = None, use_cache: bool = False):
+        '''
+        Parameters:
+        fname: Path of the case
+        use_cache: Cache reads until the case changes (see SAW use_cache).
+            Only use it when the case is changed through this object alone.
+        '''
+        super().__init__(fname)
+        self.use_cache = use_cache
+
+        # Last whole frame written per object type, see __setitem__
+        self._sent = {}
+        self._network = None
 
     def TSInit(self):
-        ''' Initialize Transient Stability Parameters '''
+        ''' Initialize Transient Stability Parameters
+        On failure ts_ready is None and the error is kept in ts_error, so
+        ensure_ts does not try again. Call TSInit() to retry. '''
         try:
             self.esa.RunScriptCommand("TSInitialize()")
-        except:
-            print("Failed to Initialize TS Values")
+            self.ts_ready, self.ts_error = True, None
+        except (PowerWorldError, COMError) as e:
+            self.ts_ready, self.ts_error = None, e
+            print(f"Failed to Initialize TS Values: {e}")
+
+    def ensure_ts(self, fields=None):
+        '''
+        Initialize TS on first use of the transient API, so power flow only
+        jobs never pay for it. If fields are given, only initialize when
+        a transient field is among them, i.e. a field whose name starts
+        with TS_PREFIX. A field that merely shares the prefix only costs
+        an early TSInitialize. Nothing is done once TSInit has run,
+        whether or not it succeeded.
+        '''
+        if self.ts_ready is not False:
+            return
+        if fields is None or any(f.startswith(self.TS_PREFIX) for f in fields):
+            self.TSInit()
 
     @timing
     def open(self):
@@ -30,11 +71,34 @@ class PowerWorldIO(IModelIO):
         if not path.isabs(self.fname):
             self.fname = path.abspath(self.fname)
 
-        # ESA Object & Transient Sim
-        self.esa = SAW(self.fname, CreateIfNotFound=True, early_bind=True)
+        # ESA Object. Defer start-up work until needed.
+        self.esa = SAW(
+            self.fname, CreateIfNotFound=True, early_bind=True, use_cache=self.use_cache, lazy=True
+        )
 
-        # Attempt and Initialize TS so we get initial values
-        self.TSInit()
+        # TS is initialized on first use (see ensure_ts) to get initial values
+        self.ts_ready, self.ts_error = False, None
+        self._sent.clear()
+        self.refresh_network()
+
+    # Object types whose data a NetworkSnapshot is built from
+    NETWORK_TYPES = {'bus', 'branch', 'gen', 'load'}
+
+    @property
+    def network(self) -> NetworkSnapshot:
+        '''Snapshot of the bus and branch data used by the matrix functions.
+        Captured on first use and again after this object writes Bus, Branch,
+        Gen or Load data, opens the case or restores a state. Call
+        refresh_network() after changing the case by other means.'''
+        if self._network is None:
+            self._network = NetworkSnapshot(self)
+        return self._network
+
+    def refresh_network(self, objtype: str = None):
+        '''Capture the network snapshot again on next use.
+        objtype: Only if data of this object type was changed'''
+        if objtype is None or objtype.lower() in self.NETWORK_TYPES:
+            self._network = None
     
     def __getitem__(self, index) -> DataFrame | None:
         '''Retrieve Data frome Power world with Indexor Notation
@@ -45,40 +109,151 @@ class PowerWorldIO(IModelIO):
         wb.pw[Bus, 'BusPUVolt'] # Get Voltage Magnitudes
         wb.pw[Bus, ['SubNum', 'BusPUVolt']] # Get Two Fields
         wb.pw[Bus, :] # Get all fields
+
+        Use read() to filter objects in Power World.
         '''
         
         # Type checking is an anti-pattern but this is accepted within community as a necessary part of the magic function
-        # >1 Argument - Objecet Type & Fields(s)
+        # 2 Arguments - Objecet Type & Fields(s)
         if isinstance(index, tuple): 
             gtype, fields = index
-            if isinstance(fields, str): fields = fields,
-            elif isinstance(fields, slice): fields = gtype.fields
         # 1 Argument - Object Type: retrieve only key fields
         else: 
             gtype, fields = index, ()
 
+        return self.read(gtype, fields)
+
+    def read(self, gtype, fields=(), where=None) -> DataFrame | None:
+        '''Retrieve the key fields and fields of objects, as __getitem__, keeping
+        only the objects passing a filter. Power World applies the filter, so
+        only their data is sent.
+
+        Parameters:
+        gtype: Object type
+        fields: Field name, list of names, or : (slice(None)) for all fields
+        where: A condition (field, condition, value[, other value]), a list of
+            conditions which must all hold, or the name of an advanced filter
+            defined in the case. See SAW.define_filter for the conditions, and
+            the filters it adds to the case.
+
+        Example:
+        wb.io.read(Branch, 'LineMVA', where=('BranchDeviceType', '=', 'Transformer'))
+        '''
+
         # Keys and then Fields
-        key_fields = gtype.keys
-        data_fields = [f for f in fields if f not in key_fields]
-        unique_fields = [*key_fields, *data_fields]
+        unique_fields = self._fields(gtype, fields)
 
         # If no fields (I.e. there were no keys and no data field passed)
         if len(unique_fields) < 1:
             return None
 
         # Retrieve data from unique list of fields
-        df = self.esa.GetParametersMultipleElement(gtype.TYPE, unique_fields)
+        self.ensure_ts(unique_fields)
+        df = self.esa.GetParametersMultipleElement(
+            gtype.TYPE, unique_fields, self.filter(gtype, where)
+        )
 
         # Set Index of DF if key field exists and DF valid
         #if df is not None and len(key_fields)>0:
             #df.set_index(key_fields, inplace=True) # NOTE I might want to rethink indexing these. It is useful to me but might be confusing.
         
         return df
+
+    def filter(self, gtype, where=None) -> str:
+        '''
+        Name of the Power World advanced filter for the where argument of read,
+        defining it in the case if needed. Returns "" (no filter) for None.
+        '''
+        if where is None:
+            return ""
+        if isinstance(where, str):
+            return where
+        return self.esa.define_filter(gtype.TYPE, where)
+
+    @staticmethod
+    def _fields(gtype, fields=()):
+        '''Key fields of gtype followed by the requested fields, without repeats.
+        fields may be a field name, a list of names, or : for all fields.'''
+        if fields is None: fields = ()
+        elif isinstance(fields, str): fields = fields,
+        elif isinstance(fields, slice): fields = gtype.fields
+        return list(dict.fromkeys([*gtype.keys, *fields]))
+
+    def fetch(self, *requests) -> list[DataFrame | None]:
+        '''
+        Retrieve several requests of (Type, Field(s)) with one call per object type.
+        Requests for the same type are merged and key fields retrieved once, so
+        the results of one type share the same rows in the same order. A request
+        may add a filter, (Type, Field(s), where), as in read; requests of a
+        type with different filters are retrieved separately.
+
+        Returns one DataFrame (keys, then requested fields) per request, in order,
+        or None where Power World has no objects of the type.
+
+        Example:
+        gens, buses = wb.io.fetch((Gen, ['GenMW', 'GenStatus']), (Bus, 'BusPUVolt'))
+        '''
+        requests = [
+            (r[0], r[1], self.filter(r[0], r[2] if len(r) > 2 else None))
+            if isinstance(r, tuple) else (r, (), "")
+            for r in requests
+        ]
+
+        # Merge the fields of each type and filter, in request order
+        plan = {}
+        for gtype, fields, where in requests:
+            merged = plan.setdefault((gtype, where), [])
+            merged.extend(f for f in self._fields(gtype, fields) if f not in merged)
+
+        # One call per type and filter
+        data = {}
+        for (gtype, where), fields in plan.items():
+            if not fields:
+                data[gtype, where] = None
+                continue
+            self.ensure_ts(fields)
+            data[gtype, where] = self.esa.GetParametersMultipleElement(gtype.TYPE, fields, where)
+
+        # Split back into requests
+        results = []
+        for gtype, fields, where in requests:
+            df, fields = data[gtype, where], self._fields(gtype, fields)
+            results.append(None if df is None or not fields else df[fields].copy())
+        return results
+
+    @staticmethod
+    def lookup(keys, table: DataFrame, on: str, fields=None) -> DataFrame:
+        '''
+        Join the rows of table onto keys by index: row i of the result holds the
+        fields of the row of table whose 'on' value equals keys[i] (NaN if none).
+        Rows stay aligned with keys, unlike a merge.
+
+        Example: substation coordinates of every bus
+        buses, subs = wb.io.fetch((Bus, 'SubNum'), (Substation, ['Longitude', 'Latitude']))
+        wb.io.lookup(buses['SubNum'], subs, 'SubNum', ['Longitude', 'Latitude'])
+        '''
+        if fields is None:
+            fields = [f for f in table.columns if f != on]
+        if isinstance(fields, str):
+            fields = [fields]
+        pos = Index(table[on]).get_indexer(np.asarray(keys))
+        if len(table) == 0:
+            return DataFrame(np.nan, index=range(len(pos)), columns=fields)
+        out = table[fields].iloc[np.where(pos < 0, 0, pos)].reset_index(drop=True)
+        out.loc[pos < 0, :] = np.nan
+        return out
     
     def __setitem__(self, args, value) -> None:
         '''Set grid data using indexors directly to Power World
         Must be atleast 2 args: Type & Field
 
+        Only the rows and fields which differ are sent. With fields given, values
+        are compared against a read of the keys and target fields. A whole frame
+        is compared against the last frame of the type sent by this object, if it
+        has the same keys and fields, so no read is made; the first frame is sent
+        in full. Nothing is sent if no value changes. Inside a batch, writes are
+        buffered whole.
+
         Examples:
         wb.pw[Bus, 'BusPUVolt'] = 1
         wb.pw[Bus, v<1, 'BusPUVolt'] = arr
@@ -88,8 +263,9 @@ class PowerWorldIO(IModelIO):
         # Type checking is an anti-pattern but this is accepted within community as a necessary part of the magic function
         # Extract Arguments depending on Index Method
 
-        # Ensure Edit Mode
-        self.edit_mode()
+        # Later writes in a batch may undo earlier ones, so diff outside batches only
+        batching = self.esa.batching
+        diff = not batching and not self.esa.pw_order
 
         # PARSE ARGUMENT FORMAT OPTIONS
 
@@ -108,22 +284,101 @@ class PowerWorldIO(IModelIO):
             if isinstance(fields, str): 
                 fields = fields,
             
-            # Retrieve active power world records with keys only
-            base = self[gtype,:]
+            # Retrieve active power world records of the keys and target fields
+            known = self[gtype, fields]
+            if known is None:
+                return
+            base = known.copy()
 
             # Assign Values based on index
             if where is not None: base.loc[where, fields] = value
             else: base.loc[:,fields] = value
 
+            # Rows of base and known line up
+            changes = self._changes(gtype, base, known) if diff else base
+
+            # The last frame sent (see below) no longer matches the case
+            self._sent.pop(gtype.TYPE, None)
+            sent = None
+
         # [Type] -> Try and Create New (Requires properly formatted df)
         else: 
             gtype, base = args, value
+            changes = base
+
+            # Compare against the last frame of this type sent, if it has the same rows
+            last = self._sent.pop(gtype.TYPE, None)
+            if diff and self._same_rows(gtype, base, last):
+                changes = self._changes(gtype, base, last.set_axis(base.index))
+            sent = base.copy() if diff else None
+
+        if changes is None:
+            self._sent[gtype.TYPE] = sent
+            return
+
+        # Ensure Edit Mode (a batch toggles modes once when it flushes)
+        if not batching:
+            self.edit_mode()
             
         # Send to Power World
-        self.esa.change_parameters_multiple_element_df(gtype.TYPE, base)
+        self.esa.change_parameters_multiple_element_df(gtype.TYPE, changes)
+        self.refresh_network(gtype.TYPE)
+        if sent is not None:
+            self._sent[gtype.TYPE] = sent
 
         # Enter back into run mode
-        self.run_mode()
+        if not batching:
+            self.run_mode()
+
+    def _changes(self, gtype, new: DataFrame, old: DataFrame):
+        '''
+        Rows and fields of new which differ from old, with the key fields.
+        Returns None if nothing changed.
+
+        Parameters:
+        new, old: Frames with the same index and columns
+        '''
+        keys = [k for k in gtype.keys if k in new.columns]
+        fields = [f for f in new.columns if f not in keys]
+        a, b = new[fields], old[fields]
+        same = np.array((a == b) | (a.isna() & b.isna()), dtype=bool)
+
+        rows = ~same.all(axis=1)
+        if not rows.any():
+            return None
+        cols = [f for f, c in zip(fields, ~same[rows].all(axis=0)) if c]
+        return new.loc[rows, [*keys, *cols]]
+
+    @staticmethod
+    def _same_rows(gtype, new: DataFrame, old: DataFrame | None) -> bool:
+        '''True if old has the columns of new and the same keys, row for row.'''
+        keys = list(gtype.keys)
+        if old is None or not keys or list(new.columns) != list(old.columns):
+            return False
+        if not set(keys).issubset(new.columns) or len(new) != len(old):
+            return False
+        return bool((new[keys].to_numpy() == old[keys].to_numpy()).all())
+
+    @contextmanager
+    def batch(self, aux=True):
+        '''
+        Buffer all writes made in the block (e.g. wb.pw[Bus, 'BusPUVolt'] = 1) and
+        send them to PowerWorld at once on exit, merged per object type, with a
+        single EnterMode(EDIT)/EnterMode(RUN) pair. Reads inside the block do not
+        see the buffered writes.
+
+        Example:
+        with wb.pw.batch():
+            wb.pw[Gen, 'GenMW'] = gmw
+            wb.pw[Load, 'LoadMW'] = lmw
+
+        aux: Flush as one AUX file (default) rather than one ChangeParametersMultipleElement per type.
+        '''
+        try:
+            with self.esa.batch(aux=aux):
+                yield self
+        finally:
+            self.refresh_network()
 
 
     def save(self):
@@ -139,13 +394,15 @@ class PowerWorldIO(IModelIO):
     def run_mode(self):
         self.esa.RunScriptCommand("EnterMode(RUN);")
 
-    def get(self, gtype: Type[GObject], keysonly=False):
+    def get(self, gtype: Type[GObject], keysonly=False, compact=False):
         '''
         Get all Objects of specified type from PowerWorld.
         
         Parameters:
         gtype: Object type to retrieve data,
         keysonly: Specifiy if GWB should retrieve just key data or ALL data of object type.
+        compact: True for memory-compact dtypes (categorical strings, nullable Int32 keys),
+            or 'float32' to also store measured values as float32. See SAW.compact_df.
         '''
 
         # Option Handling (.fields includes keys)
@@ -155,10 +412,11 @@ class PowerWorldIO(IModelIO):
             fields = [fexcept(f) for f in gtype.fields]
 
         # Get Data from SimAuto
+        self.ensure_ts(fields)
         df = None
         try:
             # Successful retrieval of data and requested fields as DataFrame
-            df = self.esa.GetParametersMultipleElement(gtype.TYPE, fields)
+            df = self.esa.GetParametersMultipleElement(gtype.TYPE, fields, compact=compact)
         except:
             # Failure. Create empty dataframe with expected indecies.
             print(f"Failed to read {gtype.TYPE} data.")
@@ -197,6 +455,7 @@ class PowerWorldIO(IModelIO):
                 request.append(fn)
 
         # Get Data from Power World 
+        self.ensure_ts(request)
         df = None
         try:
             df = self.esa.GetParametersMultipleElement(gtype.TYPE, request)
@@ -225,6 +484,19 @@ class PowerWorldIO(IModelIO):
         '''
         self.esa.RunScriptCommand("ResetToFlatStart()")
 
+    def setdata(self, objtype: str, data, fields=None):
+        '''
+        Write a block of data to PowerWorld with a single AUX DATA section.
+        Use for bulk data; the AUX file is formatted column-wise and streamed to disk.
+        Parameters:
+        objtype: PowerWorld object type (e.g. 'PLAYINSIGNAL')
+        data: DataFrame, or 2D array with one column per field
+        fields: Field names of the columns. Defaults to the DataFrame columns.
+        '''
+        self._sent.pop(objtype, None)
+        self.esa.exec_aux(aux_data(objtype, data, fields))
+        self.refresh_network(objtype)
+
     ''' Playin Signal Section'''
 
     def clearsignals(self):
@@ -240,29 +512,15 @@ class PowerWorldIO(IModelIO):
         signals: N x M where M is number of Signals
         Power World blocks signal data from being written for some reason so we must set through AUX command.'''
 
-        # Format Data Header
-        cmd = 'DATA (PLAYINSIGNAL, [TSName, TSTime'
-
-        for idx in range(signals.shape[1]):
-
-            cmd += ', TSSignal'
-
-            if idx > 0:
-                cmd += ':'+ str(idx)
-        
-        cmd += ']){\n' 
-
-        # Format each time record
-        for t, row in zip(times, signals):
-            cmd += f'"{name}"\t{t:.6f}'
-            for d in row:
-                cmd += f'\t{d:.6f}'
-            cmd += '\n'
-
-        cmd += '}\n'
+        # One signal column per signal, then name and time first
+        signals = np.asarray(signals).reshape(len(times), -1)
+        fields = ['TSSignal'] + [f'TSSignal:{idx}' for idx in range(1, signals.shape[1])]
+        data = DataFrame(signals, columns=fields)
+        data.insert(0, 'TSTime', np.asarray(times, dtype=float))
+        data.insert(0, 'TSName', name)
 
         # Execute
-        self.esa.exec_aux(cmd)
+        self.setdata('PLAYINSIGNAL', data)
 
     '''
     Depricated until .upload removed
@@ -278,9 +536,11 @@ class PowerWorldIO(IModelIO):
         
     # Execute Dynamic Simulation for Non-Skipped Contingencies
     def TSSolveAll(self):
+        self.ensure_ts()
         self.esa.RunScriptCommand("TSSolveAll()")
 
     def clearram(self):
+        self.ensure_ts()
         # Disable RAM storage & Delete Existing Data in RAM
         self.esa.RunScriptCommand("TSResultStorageSetAll(ALL, NO)")
         self.esa.RunScriptCommand("TSClearResultsFromRAM(ALL,YES,YES,YES,YES,YES)")
@@ -304,6 +564,7 @@ class PowerWorldIO(IModelIO):
         '''
         Save Specified Fields for TS
         '''
+        self.ensure_ts()
 
         # Get Respective Data
         savefields = []
@@ -359,6 +620,8 @@ class PowerWorldIO(IModelIO):
         '''
         self.run_mode()
         self.esa.RunScriptCommand(f'RestoreState(USER,{statename});')
+        self._sent.clear()
+        self.refresh_network()
 
     def delete_state(self, statename="GWB"):
         '''
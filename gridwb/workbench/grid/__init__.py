@@ -1,2 +1,3 @@
 from .components import *
-from .common import *
\ No newline at end of file
+from .common import *
+from .snapshot import NetworkSnapshot
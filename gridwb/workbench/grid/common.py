@@ -3,6 +3,7 @@ from numpy.linalg import inv
 from cmath import rect
 from pandas import DataFrame
 from .components import Gen, Load, Bus
+from ..._network import incidence
 
 # TODO improve because this is a critical component
 class InjectionVector:
@@ -121,23 +122,19 @@ def double_cmplx_ybus(Y):
 
     return YC.real
 
-def arc_incidence(fromto):
+def arc_incidence(fromto, sparse=False):
     '''Returns Arc-Node Incidence Matrix.
 
     Given a list of line objects and bus objects,
     return incidence matrix. Column/Row Position is determined
-    by order of objects in the list'''
+    by order of objects in the list.
+    Set sparse to True to get a csr_matrix instead of an array.'''
 
-    node_cnt = max(fromto)+1
-    edge_cnt = len(fromto)
-    A = zeros((edge_cnt, node_cnt))
+    fromto = array(fromto, dtype=int).reshape(-1, 2)
+    node_cnt = fromto.max()+1 if len(fromto) else 0
+    A = incidence(fromto[:, 0], fromto[:, 1], node_cnt)
 
-    # Create Incidence Matrix
-    for i, buses in enumerate(fromto):
-        A[i, buses[0]] = 1
-        A[i, buses[1]] = -1
-
-    return A
+    return A if sparse else A.toarray()
 
 def rlc_bus(buses, loads, gens):
     '''
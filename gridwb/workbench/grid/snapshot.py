@@ -0,0 +1,126 @@
+from functools import wraps
+
+import numpy as np
+from pandas import Series
+from scipy.sparse import diags
+
+from .components import Bus, Branch
+from ..._network import bus_index, branch_mask, incidence
+
+# Branch fields captured by a snapshot
+BRANCH_FIELDS = [
+    'BusNum', 'BusNum:1', 'LineStatus', 'BranchDeviceType',
+    'LineR', 'LineX', 'LineG', 'LineC', 'LineR:2', 'LineX:2',
+    'LineLengthByParameters:2',
+]
+
+
+def memoized(f):
+    '''Cache the result of a NetworkSnapshot method per set of arguments,
+    until the snapshot is invalidated.'''
+    @wraps(f)
+    def wrap(self, *args, **kw):
+        key = (f.__name__, args, tuple(sorted(kw.items())))
+        if key not in self._memo:
+            self._memo[key] = f(self, *args, **kw)
+        return self._memo[key]
+    return wrap
+
+
+class NetworkSnapshot:
+
+    def __init__(self, io) -> None:
+        '''Bus and branch data of a case, captured once, with the matrices
+        and weights derived from them memoized.
+
+        Memoized results are shared between calls, so copy them before
+        modifying them in place.
+
+        The snapshot does not follow changes to the case by itself.
+        PowerWorldIO.network replaces it when the case changes through the
+        IO. Call invalidate() after editing the data held here, or refresh()
+        to capture it again.
+        params:
+        - io: PowerWorldIO of the case
+        '''
+        self.io = io
+        self.refresh()
+
+    def refresh(self):
+        '''Capture the bus and branch data again and drop memoized results'''
+        self.bus = self.io[Bus]
+        self.branch = self.io[Branch, BRANCH_FIELDS]
+
+        # Matrix positions of buses and branch ends
+        buses = self.bus['BusNum'].to_numpy()
+        self.busmap = Series(self.bus.index, self.bus['BusNum'])
+        self.fromBus = bus_index(self.branch['BusNum'].to_numpy(), buses)
+        self.toBus = bus_index(self.branch['BusNum:1'].to_numpy(), buses)
+
+        self.invalidate()
+
+    def invalidate(self):
+        '''Drop memoized results, e.g. after editing self.branch'''
+        self._memo = {}
+
+    @property
+    def nbus(self):
+        return len(self.bus)
+
+    @property
+    def nbranch(self):
+        return len(self.branch)
+
+    @memoized
+    def incidence(self, closed_only=False, kind=None):
+        '''Sparse Incidence Matrix (Branches x Buses). See GridWorkBench.incidence'''
+        keep = branch_mask(
+            self.branch['LineStatus'],
+            self.branch['BranchDeviceType'],
+            closed_only=closed_only,
+            kind=kind,
+        )
+        return incidence(self.fromBus, self.toBus, self.nbus, keep=keep, sign=-1)
+
+    @memoized
+    def ybranch(self):
+        '''Admittance of Branches in Complex Form'''
+        Z = self.branch['LineR:2'] + 1j*self.branch['LineX:2']
+        return 1/Z
+
+    @memoized
+    def lengths(self):
+        '''Branch lengths in kilometers, transformers assumed 1 meter long'''
+        ell = self.branch['LineLengthByParameters:2'].copy()
+        ell.loc[ell==0] = 0.001
+        return ell
+
+    @memoized
+    def lineprop(self):
+        '''Approximate propagation constant of each branch'''
+
+        # Series and Shunt Parameters
+        Z = self.branch['LineR'] + 1j*self.branch['LineX']
+        Y = self.branch['LineG'] + 1j*self.branch['LineC']
+
+        # Correct Zero-Values
+        Z[Z==0] = 0.000446+ 0.002878j
+        Y[Y==0] = 0.000463j
+
+        # Propagation Parameter by Length
+        ell = self.lengths()
+        return np.sqrt((Y/ell)*(Z/ell))
+
+    @memoized
+    def length_laplacian(self):
+        '''Distance-based Laplacian, weighted by 1/length^2 (km^-2)'''
+        A = self.incidence()
+        W = diags(1/self.lengths()**2)
+        return (A.T@W@A).tocsr()
+
+    @memoized
+    def proplap(self):
+        '''Propagation Laplacian, weighted by (1/length^2 - gamma^2) (m^-2)'''
+        A = self.incidence()
+        W = diags(1/self.lengths()**2 - self.lineprop()**2)/1e6
+        return (A.T@W@A).tocsr()
@@ -5,21 +5,27 @@
 
 # Imports
 import numpy as np
-from pandas import DataFrame, Series
-from scipy.sparse import lil_matrix, diags
+from pandas import DataFrame
 
 from .grid.components import *
 from .apps import GIC, Statics
 from .grid.common import arc_incidence, InjectionVector
+from .grid.snapshot import NetworkSnapshot
 from .core import *
 
 class GridWorkBench:
-    def __init__(self, fname=None):
+    def __init__(self, fname=None, use_cache=False):
+        '''
+        fname: Path of the case
+        use_cache: Cache reads until the case changes. Static data is then read once
+            per analysis rather than on every call. Only use it when the case is
+            changed through the workbench alone.
+        '''
 
         if fname is None:
             return
 
-        self.context = Context(fname)
+        self.context = Context(fname, use_cache=use_cache)
         self.io = self.context.getIO()
 
         # Temp disable - my IO getter is more reliable
@@ -31,6 +37,17 @@ class GridWorkBench:
         self.statics = Statics(self.context)
         self.gic = GIC(self.context)
 
+    @property
+    def network(self) -> NetworkSnapshot:
+        '''Snapshot of the bus and branch data used by the matrix functions.
+        See PowerWorldIO.network'''
+        return self.io.network
+
+    def refresh_network(self):
+        '''Capture the network snapshot again on next use. Writes through the
+        IO do this already; call it after changing the case by other means.'''
+        self.io.refresh_network()
+
     def __getitem__(self, arg):
         '''Local Indexing of retrieval'''
         return self.io[arg]
@@ -55,12 +72,12 @@ class GridWorkBench:
 
         # Request Voltages if needed
         if getvolts:
-            vpu = self.io.get_quick(Bus, 'BusPUVolt')
-            rad = self.io.get_quick(Bus, 'BusAngle')['BusAngle']*np.pi/180
+            v = self.io[Bus, ['BusPUVolt', 'BusAngle']]
+            rad = v.pop('BusAngle')*np.pi/180
 
-            vpu['BusPUVolt'] *= np.exp(1j*rad)
-            vpu.columns = ['Bus Number', 'Voltage']
-            return vpu
+            v['BusPUVolt'] *= np.exp(1j*rad)
+            v.columns = ['Bus Number', 'Voltage']
+            return v
         
     ''' LOCATION FUNCTIONS '''
 
@@ -72,14 +89,14 @@ class GridWorkBench:
         Example usage:
         branches['BusNum'].map(busmap)
         '''
-        busNums = self.io[Bus]
-        return Series(busNums.index, busNums['BusNum'])
+        return self.network.busmap.copy()
     
     
     def buscoords(self, astuple=True):
-        '''Retrive dataframe of bus latitude and longitude coordinates based on substation data'''
-        A, S = self.io[Bus, 'SubNum'],  self.io[Substation, ['Longitude', 'Latitude']]
-        LL = A.merge(S, on='SubNum') 
+        '''Retrive dataframe of bus latitude and longitude coordinates based on substation data.
+        Rows are in bus order.'''
+        A, S = self.io.fetch((Bus, 'SubNum'), (Substation, ['Longitude', 'Latitude']))
+        LL = A.join(self.io.lookup(A['SubNum'], S, 'SubNum', ['Longitude', 'Latitude']))
         if astuple:
             return LL['Longitude'], LL['Latitude']
         return LL
@@ -92,34 +109,21 @@ class GridWorkBench:
         Retrieves and returns all transmission line data. Convenience function.
         '''
 
-        # Get Data
-        branches = self.io[Branch, :]
-
-        # Return requested Records
-        return branches.loc[branches['BranchDeviceType']=='Line']
+        # Filtered in Power World
+        return self.io.read(Branch, Branch.fields, where=('BranchDeviceType', '=', 'Line'))
     
     def xfmrs(self):
         '''
         Retrieves and returns all transformer data. Convenience function.
         '''
 
-        # Get Data
-        branches = self.io[Branch, :]
-
-        # Return requested Records
-        return branches.loc[ branches['BranchDeviceType']=='Transformer']
+        # Filtered in Power World
+        return self.io.read(Branch, Branch.fields, where=('BranchDeviceType', '=', 'Transformer'))
     
 
     def ybranch(self):
         '''Return Admittance of Lines in Complex Form'''
-
-        branches = self[Branch, ['LineR:2', 'LineX:2']]
-        R = branches['LineR:2']
-        X = branches['LineX:2']
-        Z = R + 1j*X 
-        Y = 1/Z
-
-        return Y
+        return self.network.ybranch().copy()
     
         
     def lengths(self):
@@ -127,46 +131,30 @@ class GridWorkBench:
         Returns lengths of each branch in kilometers.
         Transformer lengths are assumed to be 1 meter.
         '''
+        return self.network.lengths().copy()
 
-        # This is distance in kilometers
-        field = 'LineLengthByParameters:2'
-        ell = self.io[Branch,field][field]
-
-        # Assume XFMR 1 meter long
-        ell.loc[ell==0] = 0.001
 
-        return ell
-
-
-    def incidence(self):
+    def incidence(self, closed_only=False, kind=None):
         '''
+        Parameters:
+        closed_only: Set to True to leave out open branches
+        kind: 'line' or 'transformer' to keep only that kind of branch
+
         Returns:
         Sparse Incidence Matrix of the branch network of the grid.
 
         Dimensions: (Number of Branches)x(Number of Buses)
         '''
-
-        # Retrieve
-        branches = self.io[Branch,['BusNum', 'BusNum:1']]
-
-        # Column Positions 
-        bmap = self.busmap()
-        fromBus = branches['BusNum'].map(bmap).to_numpy()
-        toBus = branches['BusNum:1'].map(bmap).to_numpy()
-
-        # Sparse Arc-Incidence Matrix
-        nbranches = len(branches)
-        A = lil_matrix((nbranches,len(bmap)))
-        A[np.arange(nbranches), fromBus] = -1
-        A[np.arange(nbranches), toBus] = 1
-
-        return A
+        return self.network.incidence(closed_only, kind)
     
     ''' LAPLACIAN FUNCTIONS '''
         
-    def ybus(self, dense=False):
-        '''Returns the sparse Y-Bus Matrix'''
-        return self.io.esa.get_ybus(dense)
+    def ybus(self, dense=False, native=False):
+        '''Returns the sparse Y-Bus Matrix
+        native: Set to True to build it from the branch and bus data instead of
+            PowerWorld's Ybus file. Buses are then in the order of the bus data
+            returned by the IO. See SAW.get_ybus for what the model leaves out.'''
+        return self.io.esa.get_ybus(dense, native=native)
     
     def length_laplacian(self, dense=False):
         '''
@@ -179,55 +167,18 @@ class GridWorkBench:
         Returns:
             nd
         '''
-
-        # Get branch legnths
-        ell = self.lengths()
-
-        # Branch Weight (km^-2)
-        W = diags(1/ell**2)
-
-        # Line Only Incidence
-        A = self.incidence()
-
-        # Laplacian
-        Lap = A.T@W@A
+        Lap = self.network.length_laplacian()
 
         # Type handling
         if dense:
-            return np.asarray(Lap)
+            return Lap.toarray()
         else:
             return Lap
 
     
     def lineprop(self):
         '''Returns approximation of propagation constants for each branch'''
-
-        branches = self.io[Branch,['LineR','LineG', 'LineC', 'LineX']]
-
-        # Length (Set Xfmr to 1 meter)
-        ell = self.lengths()
-
-        # Series Parameters
-        R = branches['LineR']
-        X = branches['LineX']
-        Z = R + 1j*X
-
-        # Shunt Parameters
-        G = branches['LineG']
-        B = branches['LineC']
-        Y = G + 1j*B
-
-
-        # Correct Zero-Values
-        Z[Z==0] = 0.000446+ 0.002878j
-        Y[Y==0] = 0.000463j
-
-        # By Length
-        Y /= ell 
-        Z /= ell
-
-        # Propagation Parameter
-        return  np.sqrt(Y*Z)
+        return self.network.lineprop().copy()
     
 
     def proplap(self):
@@ -236,17 +187,6 @@ class GridWorkBench:
         of the telgeraphers equations near synchronous frequnecy
         Branch Weights are (1/length^2 - gamma^2)
         '''
-
-        ell = self.lengths()
-        GAM = self.lineprop()
-
-        # Branch Weight m^-2
-        W = diags(1/ell**2 - GAM**2)/1e6 
-
-        # Line Only Incidence
-        A = self.incidence()
-
-        # Laplacian
-        return A.T@W@A
+        return self.network.proplap()
     
 
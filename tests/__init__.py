@@ -0,0 +1,64 @@
+"""Tests of gridwb, run against FakeSimAuto so they need neither
+Windows nor PowerWorld:
+
+.. code:: bash
+
+    python -m pytest tests
+"""
+
+from gridwb.saw import SAW
+from gridwb.fake_simauto import FakeSimAuto, synthetic_case
+
+
+def fake_saw(n_bus: int = 30, seed: int = 0, **kwargs) -> SAW:
+    """Return a SAW connected to a FakeSimAuto serving a synthetic case
+    of n_bus buses. Keyword arguments are passed to SAW."""
+    pwcom = FakeSimAuto(synthetic_case(n_bus, seed=seed, extra_fields=0))
+    return SAW("fake.pwb", pwcom=pwcom, **kwargs)
+
+
+def set_strings(saw: SAW, ObjectType: str, field: str, values) -> None:
+    """Make the fake return the given raw strings for a field, e.g. to
+    inject blank or malformed values."""
+    table = saw._pwcom.case.table(ObjectType)
+    table._strings[field] = tuple(values)
+
+
+def workbench_components():
+    """Return gridwb.workbench.grid.components. Where the generated module
+    is missing, a stand-in is installed first, so the workbench imports:
+    it defines GObject, and an object class per table of a synthetic
+    case (any other class name gives an empty GObject subclass)."""
+    import os
+    import sys
+    import types
+    import gridwb
+
+    name = "gridwb.workbench.grid.components"
+    path = os.path.join(os.path.dirname(gridwb.__file__), "workbench", "grid", "components.py")
+    if name not in sys.modules and not os.path.isfile(path):
+        tables = synthetic_case(4, extra_fields=0).tables
+
+        class GObject:
+            TYPE = ""
+            keys = []
+            fields = []
+
+        def object_class(attr):
+            if attr.startswith("__"):
+                raise AttributeError(attr)
+            table = tables.get(attr.lower())
+            body = {"TYPE": attr}
+            if table is not None:
+                body.update(keys=list(table.keys), fields=[f for _, f, _ in table.fields])
+            cls = type(attr, (GObject,), body)
+            setattr(module, attr, cls)
+            return cls
+
+        module = types.ModuleType(name)
+        module.GObject = GObject
+        module.__getattr__ = object_class
+        sys.modules[name] = module
+
+    import importlib
+    return importlib.import_module(name)
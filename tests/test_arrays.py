@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+
+from . import fake_saw, set_strings
+
+
+class ArraysTestCase(unittest.TestCase):
+    """get_parameters_multiple_element_arrays against the DataFrame read."""
+
+    def setUp(self):
+        self.saw = fake_saw()
+        self.fields = ["BusNum", "BusNum:1", "LineCircuit", "LineR", "LineStatus"]
+
+    def check(self, ObjectType, fields, **kw):
+        df = self.saw.GetParametersMultipleElement(ObjectType, fields, **kw)
+        for flat in (False, True):
+            arrays = self.saw.get_parameters_multiple_element_arrays(
+                ObjectType, fields, flat=flat, **kw
+            )
+            self.assertEqual(list(arrays), fields)
+            for field in fields:
+                kind = "U" if df[field].dtype == object else df[field].dtype.kind
+                self.assertEqual(arrays[field].dtype.kind, kind)
+                self.assertEqual(arrays[field].tolist(), df[field].tolist())
+        return arrays
+
+    def test_dtypes(self):
+        arrays = self.check("branch", self.fields)
+        self.assertEqual(arrays["BusNum"].dtype, np.int64)
+        self.assertEqual(arrays["LineR"].dtype, np.float64)
+        self.assertTrue(np.all(np.diff(arrays["BusNum"]) >= 0))
+
+    def test_pw_order(self):
+        self.saw.pw_order = True
+        arrays = self.saw.get_parameters_multiple_element_arrays("gen", ["BusNum", "GenID"])
+        table = self.saw._pwcom.case.table("gen")
+        self.assertEqual(arrays["BusNum"].tolist(), [int(b) for b in table.strings("BusNum")])
+
+    def test_stable_order_at_same_bus(self):
+        # Branches at the same from bus keep PowerWorld's order in both reads
+        branches = self.saw.GetParametersMultipleElement("branch", ["BusNum"])
+        self.assertTrue(branches["BusNum"].duplicated().any())
+        self.check("branch", ["BusNum", "BusNum:1", "LineCircuit", "LineX"])
+
+    def test_filter(self):
+        name = self.saw.define_filter("branch", ("LineStatus", "=", "Closed"))
+        arrays = self.check("branch", self.fields, FilterName=name)
+        self.assertTrue((arrays["LineStatus"] == "Closed").all())
+
+    def test_missing_values_and_padding(self):
+        n = len(self.saw._pwcom.case.table("bus"))
+        set_strings(self.saw, "bus", "SubNum", [" "] + ["4"] * (n - 1))
+        set_strings(self.saw, "bus", "BusName", [" padded "] * n)
+        arrays = self.saw.get_parameters_multiple_element_arrays(
+            "bus", ["BusNum", "SubNum", "BusName"]
+        )
+        self.assertEqual(arrays["SubNum"].dtype, np.float64)
+        self.assertEqual(np.isnan(arrays["SubNum"]).sum(), 1)
+        self.assertTrue((arrays["BusName"] == "padded").all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import io
+import json
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from gridwb.saw import aux_data, df_to_aux
+
+from . import fake_saw
+
+
+def df_to_aux_reference(fp, df, object_name: str):
+    """df_to_aux as it was before aux_data, one json.dumps per row."""
+    fields = ",".join(df.columns.tolist())
+    header = f"DATA ({object_name}, [{fields}])"
+    header_chunks = header.split(",")
+    i = 0
+    line_width = 0
+    max_width = 86
+    working_line = []
+    container = []
+    while True:
+        if line_width + len(header_chunks[i]) <= max_width:
+            working_line.append(header_chunks[i])
+            line_width += len(header_chunks[i])
+            i += 1
+        else:
+            container.append(",".join(working_line))
+            working_line = []
+            line_width = 0
+        if i == len(header_chunks):
+            if len(working_line):
+                container.append(",".join(working_line))
+            break
+    container = [ls + "," for ls in container[:-1]] + [container[-1]]
+    container = [container[0]] + ["    " + ls for ls in container[1:]]
+    container.append("{")
+    container.extend(
+        json.dumps(row, separators=(" ", ": "))[1:-1] for row in df.values.tolist()
+    )
+    container.append("}\r\n")
+    fp.write("\n".join(container))
+
+
+def write(writer, df, object_name="Gen"):
+    fp = io.StringIO()
+    writer(fp, df, object_name)
+    return fp.getvalue()
+
+
+class AuxTextTestCase(unittest.TestCase):
+    """Text of the DATA sections written by aux_data and df_to_aux."""
+
+    def setUp(self):
+        self.df = pd.DataFrame(
+            {
+                "BusNum": [1, 2, 3, 4],
+                "GenID": ["1", 'a "q"', "back\\slash", "é"],
+                "GenMW": [1.5, np.nan, 1e-7, 123456789012.0],
+                "GenMVR": [np.inf, -np.inf, 0.1, -2.0],
+                "GenAGCAble": [True, False, True, False],
+                "GenVoltSet": np.array([0.1, 1.0, 1.05, 0.95], dtype=np.float32),
+                "GenUnitType": ["x", None, 1.5, 2],
+            }
+        )
+
+    def test_matches_reference(self):
+        self.assertEqual(write(df_to_aux, self.df), write(df_to_aux_reference, self.df))
+
+    def test_matches_reference_per_dtype(self):
+        # GenID keeps the frame mixed, so df.values does not upcast ints.
+        for field in self.df.columns:
+            df = self.df[["GenID", field]] if field != "GenID" else self.df[[field]]
+            self.assertEqual(write(df_to_aux, df), write(df_to_aux_reference, df))
+
+    def test_long_header_and_empty(self):
+        wide = pd.DataFrame(
+            np.arange(60.0).reshape(2, 30), columns=[f"CustomFloat:{i}" for i in range(30)]
+        )
+        self.assertEqual(write(df_to_aux, wide), write(df_to_aux_reference, wide))
+        empty = self.df.iloc[:0]
+        self.assertEqual(write(df_to_aux, empty), write(df_to_aux_reference, empty))
+
+    def test_chunks(self):
+        text = "".join(aux_data("Gen", self.df, chunk_size=3))
+        self.assertEqual(text, write(df_to_aux_reference, self.df))
+
+    def test_array(self):
+        data = np.array([[1.0, 2.0], [np.nan, 4.0]])
+        text = "".join(aux_data("Bus", data, ["BusNum", "BusPUVolt"]))
+        self.assertEqual(
+            text, write(df_to_aux_reference, pd.DataFrame(data, columns=["BusNum", "BusPUVolt"]), "Bus")
+        )
+
+    def test_exec_aux_writes_case(self):
+        saw = fake_saw()
+        gens = saw.GetParametersMultipleElement("gen", ["BusNum", "GenID", "GenMW"])
+        gens["GenMW"] = np.arange(len(gens)) + 0.5
+        saw.exec_aux(aux_data("Gen", gens))
+        again = saw.GetParametersMultipleElement("gen", ["BusNum", "GenID", "GenMW"])
+        np.testing.assert_array_equal(again["GenMW"], gens["GenMW"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from . import fake_saw
+
+
+class BatchTestCase(unittest.TestCase):
+    """Merging of the changes buffered by SAW.batch."""
+
+    def setUp(self):
+        self.saw = fake_saw()
+        self.gens = self.saw.GetParametersMultipleElement(
+            "gen", ["BusNum", "GenID", "GenMW", "GenMVR"]
+        )
+        self.writes = []
+        pwcom = self.saw._pwcom
+        change = pwcom.ChangeParametersMultipleElement
+
+        def counted(ObjectType, ParamList, ValueList):
+            self.writes.append((list(ParamList), len(ValueList)))
+            return change(ObjectType, ParamList, ValueList)
+
+        pwcom.ChangeParametersMultipleElement = counted
+
+    def change(self, df):
+        self.saw.change_parameters_multiple_element_df("gen", df)
+
+    def read(self):
+        return self.saw.GetParametersMultipleElement(
+            "gen", ["BusNum", "GenID", "GenMW", "GenMVR"]
+        )
+
+    def test_last_value_wins(self):
+        first = self.gens.iloc[:2][["BusNum", "GenID", "GenMW"]].copy()
+        second = first.copy()
+        first["GenMW"] = [10.0, 20.0]
+        second["GenMW"] = [11.0, np.nan]
+        with self.saw.batch():
+            self.change(first)
+            self.change(second)
+        gens = self.read()
+        self.assertEqual(gens.loc[0, "GenMW"], 11.0)
+        self.assertTrue(np.isnan(gens.loc[1, "GenMW"]))
+        self.assertEqual(self.writes, [(["BusNum", "GenID", "GenMW"], 2)])
+
+    def test_nan_written(self):
+        df = self.gens.iloc[:1][["BusNum", "GenID", "GenMW", "GenMVR"]].copy()
+        df["GenMW"] = np.nan
+        with self.saw.batch():
+            self.change(df)
+        gens = self.read()
+        self.assertTrue(np.isnan(gens.loc[0, "GenMW"]))
+        self.assertEqual(gens.loc[0, "GenMVR"], self.gens.loc[0, "GenMVR"])
+
+    def test_fields_merge(self):
+        mw = self.gens.iloc[:3][["BusNum", "GenID", "GenMW"]].copy()
+        mvr = self.gens.iloc[1:2][["BusNum", "GenID", "GenMVR"]].copy()
+        mw["GenMW"] = [1.0, 2.0, 3.0]
+        mvr["GenMVR"] = [-4.0]
+        with self.saw.batch():
+            self.change(mw)
+            self.change(mvr)
+        gens = self.read()
+        self.assertEqual(gens["GenMW"].iloc[:3].tolist(), [1.0, 2.0, 3.0])
+        self.assertEqual(gens.loc[1, "GenMVR"], -4.0)
+        self.assertEqual(gens.loc[0, "GenMVR"], self.gens.loc[0, "GenMVR"])
+        self.assertEqual(
+            sorted(self.writes),
+            [(["BusNum", "GenID", "GenMW"], 2), (["BusNum", "GenID", "GenMW", "GenMVR"], 1)],
+        )
+
+    def test_keys_cast_with_pw_order(self):
+        self.saw.pw_order = True
+        gen = self.gens.iloc[:1][["BusNum", "GenID"]]
+        first = gen.assign(GenMW=5.0)
+        second = pd.DataFrame(
+            {"BusNum": gen["BusNum"].astype(str) + " ", "GenID": gen["GenID"], "GenMW": 6.0}
+        )
+        with self.saw.batch():
+            self.change(first)
+            self.change(second)
+        self.assertEqual(self.writes, [(["BusNum", "GenID", "GenMW"], 1)])
+        self.saw.pw_order = False
+        gens = self.read()
+        self.assertEqual(gens.loc[0, "GenMW"], 6.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
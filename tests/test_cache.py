@@ -0,0 +1,69 @@
+import unittest
+
+from . import fake_saw
+
+
+class ReadCacheTestCase(unittest.TestCase):
+    """The read cache of GetParametersMultipleElement (use_cache=True)."""
+
+    def setUp(self):
+        self.saw = fake_saw(use_cache=True)
+        self.calls = 0
+        pwcom = self.saw._pwcom
+        read = pwcom.GetParametersMultipleElement
+
+        def counted(*args):
+            self.calls += 1
+            return read(*args)
+
+        pwcom.GetParametersMultipleElement = counted
+
+    def read(self, ObjectType, fields):
+        before = self.calls
+        df = self.saw.GetParametersMultipleElement(ObjectType, fields)
+        return df, self.calls - before
+
+    def test_hit_returns_copy(self):
+        df, n = self.read("bus", ["BusNum", "BusPUVolt"])
+        self.assertEqual(n, 1)
+        df.loc[0, "BusPUVolt"] = -1
+        again, n = self.read("bus", ["BusNum", "BusPUVolt"])
+        self.assertEqual(n, 0)
+        self.assertNotEqual(again.loc[0, "BusPUVolt"], -1)
+
+    def test_disabled_by_default(self):
+        saw = fake_saw()
+        self.assertFalse(saw.use_cache)
+        saw.GetParametersMultipleElement("bus", ["BusNum"])
+        self.assertEqual(saw._cache, {})
+
+    def test_change_clears(self):
+        df, _ = self.read("gen", ["BusNum", "GenID", "GenMW"])
+        df["GenMW"] += 1
+        self.saw.change_parameters_multiple_element_df("gen", df)
+        again, n = self.read("gen", ["BusNum", "GenID", "GenMW"])
+        self.assertEqual(n, 1)
+        self.assertTrue((again["GenMW"] == df["GenMW"]).all())
+
+    def test_solve_keeps_static_fields(self):
+        self.read("bus", ["BusNum", "BusNomVolt"])
+        self.read("bus", ["BusNum", "BusPUVolt"])
+        self.read("branch", ["BusNum", "BusNum:1", "LineCircuit", "LineR"])
+        self.saw.SolvePowerFlow()
+        self.assertEqual(self.read("bus", ["BusNum", "BusNomVolt"])[1], 0)
+        self.assertEqual(self.read("bus", ["BusNum", "BusPUVolt"])[1], 1)
+        # Impedance correction may change branch impedances.
+        self.assertEqual(
+            self.read("branch", ["BusNum", "BusNum:1", "LineCircuit", "LineR"])[1], 1
+        )
+
+    def test_scripts(self):
+        self.read("bus", ["BusNum", "BusPUVolt"])
+        self.saw.RunScriptCommand("EnterMode(RUN);")
+        self.assertEqual(self.read("bus", ["BusNum", "BusPUVolt"])[1], 0)
+        self.saw.RunScriptCommand("ResetToFlatStart();")
+        self.assertEqual(self.read("bus", ["BusNum", "BusPUVolt"])[1], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from . import fake_saw, set_strings
+
+
+class CleanTestCase(unittest.TestCase):
+    """Conversion of SimAuto strings through the field schema."""
+
+    def setUp(self):
+        self.saw = fake_saw()
+
+    def test_dtypes(self):
+        df = self.saw.GetParametersMultipleElement(
+            "branch", ["BusNum", "BusNum:1", "LineCircuit", "LineR", "LineStatus"]
+        )
+        self.assertEqual(df["BusNum"].dtype, np.int64)
+        self.assertEqual(df["LineR"].dtype, np.float64)
+        self.assertEqual(df["LineCircuit"].dtype, object)
+        # Strings are stripped, and rows sorted by BusNum.
+        self.assertFalse(df["LineCircuit"].str.endswith(" ").any())
+        self.assertTrue(df["BusNum"].is_monotonic_increasing)
+
+    def test_blank_integer_is_missing(self):
+        n = len(self.saw._pwcom.case.table("bus"))
+        set_strings(self.saw, "bus", "SubNum", [""] + ["  7 "] * (n - 1))
+        df = self.saw.GetParametersMultipleElement("bus", ["BusNum", "SubNum"])
+        self.assertEqual(df["SubNum"].dtype, np.float64)
+        self.assertEqual(df["SubNum"].isna().sum(), 1)
+        self.assertTrue((df["SubNum"].dropna() == 7).all())
+
+        arrays = self.saw.get_parameters_multiple_element_arrays(
+            "bus", ["BusNum", "SubNum"]
+        )
+        np.testing.assert_array_equal(arrays["SubNum"], df["SubNum"].to_numpy())
+
+    def test_bad_numbers_left_as_stripped_strings(self):
+        n = len(self.saw._pwcom.case.table("bus"))
+        set_strings(self.saw, "bus", "BusPUVolt", [" bad "] + [" 1.0 "] * (n - 1))
+        df = self.saw.GetParametersMultipleElement("bus", ["BusNum", "BusPUVolt"])
+        self.assertEqual(df["BusPUVolt"].dtype, object)
+        self.assertIn("bad", df["BusPUVolt"].tolist())
+        self.assertFalse(df["BusPUVolt"].str.contains(" ").any())
+
+        arrays = self.saw.get_parameters_multiple_element_arrays(
+            "bus", ["BusNum", "BusPUVolt"]
+        )
+        self.assertIn("bad", arrays["BusPUVolt"].tolist())
+
+
+class RowOrderTestCase(unittest.TestCase):
+    """The BusNum order is cached per object type and filter."""
+
+    def setUp(self):
+        self.saw = fake_saw()
+        self.low = self.saw.define_filter("bus", ("BusNum", "<=", 15))
+        self.high = self.saw.define_filter("bus", ("BusNum", ">", 15))
+
+    def read(self, name):
+        return self.saw.GetParametersMultipleElement("bus", ["BusNum", "BusName"], name)
+
+    def test_filters_of_same_size(self):
+        low, high = self.read(self.low), self.read(self.high)
+        self.assertEqual(len(low), len(high))
+        self.assertEqual(low["BusNum"].tolist(), list(range(1, 16)))
+        self.assertEqual(high["BusNum"].tolist(), list(range(16, 31)))
+
+        with mock.patch("numpy.argsort", wraps=np.argsort) as argsort:
+            for _ in range(2):
+                self.assertTrue(self.read(self.low).equals(low))
+                self.assertTrue(self.read(self.high).equals(high))
+                arrays = self.saw.get_parameters_multiple_element_arrays(
+                    "bus", ["BusNum"], self.high
+                )
+                np.testing.assert_array_equal(arrays["BusNum"], high["BusNum"])
+        argsort.assert_not_called()
+
+    def test_changed_buses(self):
+        first = self.saw.GetParametersMultipleElement("bus", ["BusNum"])
+        table = self.saw._pwcom.case.table("bus")
+        set_strings(self.saw, "bus", "BusNum", reversed(table.strings("BusNum")))
+        with mock.patch("numpy.argsort", wraps=np.argsort) as argsort:
+            df = self.saw.GetParametersMultipleElement("bus", ["BusNum"])
+        self.assertEqual(argsort.call_count, 1)
+        self.assertTrue(df.equals(first))
+
+if __name__ == "__main__":
+    unittest.main()
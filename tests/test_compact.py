@@ -0,0 +1,84 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from . import fake_saw, set_strings
+
+
+class CompactTestCase(unittest.TestCase):
+    """Compact dtypes from GetParametersMultipleElement(compact=...)."""
+
+    def setUp(self):
+        self.saw = fake_saw()
+        self.fields = ["BusNum", "BusName", "BusCat", "SubNum", "BusPUVolt", "BusNomVolt"]
+
+    def read(self, compact=False, ObjectType="bus", fields=None):
+        return self.saw.GetParametersMultipleElement(
+            ObjectType, fields or self.fields, compact=compact
+        )
+
+    def assert_same_values(self, compact, standard):
+        self.assertEqual(compact.columns.tolist(), standard.columns.tolist())
+        for field in standard.columns:
+            expected = standard[field].to_numpy()
+            if expected.dtype.kind == "f":
+                actual = compact[field].to_numpy(dtype=float, na_value=np.nan)
+                np.testing.assert_allclose(actual, expected, rtol=1e-6)
+            else:
+                self.assertEqual(compact[field].tolist(), standard[field].tolist())
+
+    def test_dtypes(self):
+        df = self.read(compact=True)
+        self.assertEqual(df["BusNum"].dtype, pd.Int32Dtype())
+        self.assertEqual(df["SubNum"].dtype, pd.Int32Dtype())
+        self.assertIsInstance(df["BusCat"].dtype, pd.CategoricalDtype)
+        # Names are mostly distinct and stay strings
+        self.assertEqual(df["BusName"].dtype, object)
+        self.assertEqual(df["BusPUVolt"].dtype, np.float64)
+
+        df = self.read(compact="float32")
+        self.assertEqual(df["BusPUVolt"].dtype, np.float32)
+        # Parameters keep float64
+        self.assertEqual(df["BusNomVolt"].dtype, np.float64)
+
+        branch = self.read(True, "branch", ["BusNum", "BusNum:1", "LineCircuit", "LineStatus"])
+        self.assertIsInstance(branch["LineCircuit"].dtype, pd.CategoricalDtype)
+        self.assertIsInstance(branch["LineStatus"].dtype, pd.CategoricalDtype)
+
+    def test_same_values(self):
+        standard = self.read()
+        self.assert_same_values(self.read(compact=True), standard)
+        self.assert_same_values(self.read(compact="float32"), standard)
+
+    def test_integer_range_and_blanks(self):
+        n = len(self.saw._pwcom.case.table("bus"))
+        set_strings(self.saw, "bus", "SubNum", ["", "3000000000"] + ["7"] * (n - 2))
+        set_strings(self.saw, "bus", "AreaNum", [""] + ["2"] * (n - 1))
+        df = self.read(True, fields=["BusNum", "SubNum", "AreaNum"])
+        standard = self.read(fields=["BusNum", "SubNum", "AreaNum"])
+        self.assertEqual(df["SubNum"].dtype, pd.Int64Dtype())
+        self.assertEqual(df["AreaNum"].dtype, pd.Int32Dtype())
+        self.assertEqual(df["AreaNum"].isna().sum(), 1)
+        self.assert_same_values(df, standard)
+
+    def test_round_trip(self):
+        standard = self.read(fields=["BusNum", "BusCat", "BusPUVolt"])
+        df = self.read(True, fields=["BusNum", "BusCat", "BusPUVolt"])
+        df["BusPUVolt"] = df["BusPUVolt"] + 0.01
+        self.saw.change_parameters_multiple_element_df("bus", df)
+        after = self.read(fields=["BusNum", "BusCat", "BusPUVolt"])
+        np.testing.assert_allclose(after["BusPUVolt"], standard["BusPUVolt"] + 0.01)
+        self.assertEqual(after["BusCat"].tolist(), standard["BusCat"].tolist())
+        self.assertEqual(after["BusNum"].dtype, np.int64)
+
+    def test_cache_keeps_standard_frames(self):
+        self.saw.use_cache = True
+        self.read(compact="float32")
+        df = self.read()
+        self.assertEqual(df["BusNum"].dtype, np.int64)
+        self.assertEqual(df["BusPUVolt"].dtype, np.float64)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+
+import numpy as np
+from pandas import DataFrame
+
+from . import fake_saw, workbench_components
+
+components = workbench_components()
+Bus, Gen, Branch = components.Bus, components.Gen, components.Branch
+from gridwb.workbench.core.powerworld import PowerWorldIO
+
+
+class FetchTestCase(unittest.TestCase):
+    """PowerWorldIO.fetch makes one call per object type and filter."""
+
+    def setUp(self):
+        self.io = PowerWorldIO("fake.pwb")
+        self.io.esa = fake_saw()
+        self.calls = []
+        get = self.io.esa.GetParametersMultipleElement
+
+        def counted(ObjectType, ParamList, FilterName=""):
+            self.calls.append((ObjectType, list(ParamList), FilterName))
+            return get(ObjectType, ParamList, FilterName)
+
+        self.io.esa.GetParametersMultipleElement = counted
+
+    def test_merged_calls(self):
+        gens, buses, mvr, keys = self.io.fetch(
+            (Gen, ["GenMW", "GenStatus"]), (Bus, "BusPUVolt"), (Gen, "GenMVR"), Gen
+        )
+        self.assertEqual(
+            self.calls,
+            [
+                ("Gen", ["BusNum", "GenID", "GenMW", "GenStatus", "GenMVR"], ""),
+                ("Bus", ["BusNum", "BusPUVolt"], ""),
+            ],
+        )
+        self.assertEqual(gens.columns.tolist(), ["BusNum", "GenID", "GenMW", "GenStatus"])
+        self.assertEqual(mvr.columns.tolist(), ["BusNum", "GenID", "GenMVR"])
+        self.assertEqual(keys.columns.tolist(), ["BusNum", "GenID"])
+        self.assertTrue(gens[["BusNum", "GenID"]].equals(mvr[["BusNum", "GenID"]]))
+
+        self.assertTrue(gens.equals(self.io[Gen, ["GenMW", "GenStatus"]]))
+        self.assertTrue(buses.equals(self.io[Bus, "BusPUVolt"]))
+
+    def test_results_are_copies(self):
+        first, second = self.io.fetch((Gen, "GenMW"), (Gen, "GenMW"))
+        first["GenMW"] = 0.0
+        self.assertFalse((second["GenMW"] == 0).all())
+
+    def test_filters(self):
+        where = ("BranchDeviceType", "=", "Transformer")
+        every, xfmrs, again = self.io.fetch(
+            (Branch, "LineR"), (Branch, "BranchDeviceType", where), (Branch, "LineX", where)
+        )
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.calls[0][2], "")
+        self.assertTrue(self.calls[1][2].startswith("GWB_"))
+        self.assertEqual(len(xfmrs), len(again))
+        self.assertTrue((xfmrs["BranchDeviceType"] == "Transformer").all())
+        self.assertLess(len(xfmrs), len(every))
+
+
+class LookupTestCase(unittest.TestCase):
+    """PowerWorldIO.lookup keeps the rows in the order of the keys."""
+
+    def setUp(self):
+        self.table = DataFrame(
+            {"SubNum": [5, 2, 9], "Longitude": [1.0, 2.0, 3.0], "Latitude": [4.0, 5.0, 6.0]}
+        )
+
+    def test_lookup(self):
+        out = PowerWorldIO.lookup([9, 5, 9, 7], self.table, "SubNum")
+        self.assertEqual(out.columns.tolist(), ["Longitude", "Latitude"])
+        np.testing.assert_array_equal(out["Longitude"], [3.0, 1.0, 3.0, np.nan])
+        np.testing.assert_array_equal(out["Latitude"], [6.0, 4.0, 6.0, np.nan])
+
+    def test_fields_and_empty_table(self):
+        out = PowerWorldIO.lookup([2], self.table, "SubNum", "Latitude")
+        self.assertEqual(out["Latitude"].tolist(), [5.0])
+        empty = PowerWorldIO.lookup([2, 3], self.table.iloc[:0], "SubNum", ["Latitude"])
+        self.assertEqual(empty.shape, (2, 1))
+        self.assertTrue(empty["Latitude"].isna().all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import gc
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from gridwb.saw import _remove_file as remove_file
+from . import fake_saw
+
+
+class FieldMatrixTestCase(unittest.TestCase):
+    """Wide numeric reads through _iter_field_blocks/_fetch_field_matrix."""
+
+    def setUp(self):
+        self.saw = fake_saw(60)
+        self.fields = [f"LODFMult:{i}" for i in range(50)]
+        case = self.saw._pwcom.case
+        self.expected = np.column_stack(
+            [np.array(case.column("branch", f), dtype=float) for f in self.fields]
+        )
+
+    def test_blocks_match_fields(self):
+        self.saw.FIELD_BATCH_MIN = 7
+        out = self.saw._fetch_field_matrix("branch", self.fields)
+        self.assertIsInstance(out, np.ndarray)
+        np.testing.assert_array_equal(out, self.expected)
+
+    def test_memmap_file_removed(self):
+        self.saw.MEMMAP_BYTES = 0
+        out = self.saw._fetch_field_matrix("branch", self.fields)
+        self.assertIsInstance(out, np.memmap)
+        np.testing.assert_array_equal(out, self.expected)
+        path = out.filename
+        self.assertTrue(os.path.exists(path))
+
+        # Views keep the file alive.
+        view = out[:, :5]
+        del out
+        gc.collect()
+        self.assertTrue(os.path.exists(path))
+        del view
+        gc.collect()
+        self.assertFalse(os.path.exists(path))
+
+    def test_memmap_closed_before_removal(self):
+        # The file must be unmapped when it's deleted, as Windows can't
+        # delete a mapped file. Linux lists mapped files in /proc/self/maps.
+        if not os.path.exists("/proc/self/maps"):
+            self.skipTest("needs /proc/self/maps")
+        mapped = []
+
+        def remove(path):
+            with open("/proc/self/maps") as f:
+                mapped.append(path in f.read())
+            remove_file(path)
+
+        self.saw.MEMMAP_BYTES = 0
+        with mock.patch("gridwb.saw._remove_file", remove):
+            out = self.saw._fetch_field_matrix("branch", self.fields)
+        path = out.filename
+        del out
+        gc.collect()
+        self.assertEqual(mapped, [False])
+        self.assertFalse(os.path.exists(path))
+
+    def test_failed_removal_warns(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            with mock.patch("os.unlink", side_effect=PermissionError("in use")):
+                with self.assertWarns(UserWarning):
+                    remove_file(path)
+        finally:
+            os.unlink(path)
+        remove_file(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+
+import numpy as np
+
+from . import fake_saw, workbench_components
+
+Branch = workbench_components().Branch
+from gridwb.workbench.core.powerworld import PowerWorldIO
+
+
+class DefineFilterTestCase(unittest.TestCase):
+    """Advanced filters from SAW.define_filter, applied by FakeSimAuto."""
+
+    def setUp(self):
+        self.saw = fake_saw()
+        self.fields = ["BusNum", "BusNum:1", "LineCircuit", "BranchDeviceType", "LineR"]
+        self.branches = self.saw.GetParametersMultipleElement("branch", self.fields)
+
+    def read(self, conditions, logic="AND"):
+        name = self.saw.define_filter("branch", conditions, logic)
+        return self.saw.GetParametersMultipleElement("branch", self.fields, name)
+
+    def expect(self, mask):
+        return self.branches.loc[np.asarray(mask)].reset_index(drop=True)
+
+    def test_string_condition(self):
+        df = self.read(("BranchDeviceType", "=", "Transformer"))
+        expected = self.expect(self.branches["BranchDeviceType"] == "Transformer")
+        self.assertGreater(len(expected), 0)
+        self.assertTrue(df.reset_index(drop=True).equals(expected))
+
+    def test_conditions_combine(self):
+        r = self.branches["LineR"]
+        lo, hi = r.quantile(0.25), r.quantile(0.75)
+        df = self.read(
+            [("LineR", "between", lo, hi), ("BranchDeviceType", "=", "Line")]
+        )
+        mask = r.between(lo, hi) & (self.branches["BranchDeviceType"] == "Line")
+        self.assertTrue(df.reset_index(drop=True).equals(self.expect(mask)))
+
+        df = self.read([("LineR", "<", lo), ("LineR", ">", hi)], logic="OR")
+        self.assertTrue(df.reset_index(drop=True).equals(self.expect((r < lo) | (r > hi))))
+
+    def test_defined_once(self):
+        calls = []
+        exec_aux = self.saw.exec_aux
+        self.saw.exec_aux = lambda *args, **kw: calls.append(args) or exec_aux(*args, **kw)
+        first = self.saw.define_filter("branch", ("BranchDeviceType", "=", "Line"))
+        second = self.saw.define_filter("branch", [("BranchDeviceType", "=", "Line")])
+        self.assertEqual(first, second)
+        self.assertTrue(first.startswith("GWB_"))
+        self.assertEqual(len(calls), 1)
+
+    def test_quoted_value(self):
+        bus = self.saw.GetParametersMultipleElement("bus", ["BusNum"])["BusNum"].iloc[3]
+        name = 'Say "hi" \\ bye'
+        self.saw.ChangeParametersSingleElement("bus", ["BusNum", "BusName"], [bus, name])
+        filter_name = self.saw.define_filter("bus", ("BusName", "=", name))
+        df = self.saw.GetParametersMultipleElement("bus", ["BusNum", "BusName"], filter_name)
+        self.assertEqual(df["BusNum"].tolist(), [bus])
+        self.assertEqual(df["BusName"].tolist(), [name])
+
+    def test_aux_output(self):
+        written = []
+        self.saw.exec_aux = lambda aux, **kw: written.append(aux)
+        name = self.saw.define_filter(
+            "Branch", [("LineR", "between", 0.01, 0.1), ("BusName", "=", 'A "b"')], "or"
+        )
+        self.assertEqual(
+            written,
+            [
+                "FILTER (ObjectType,FilterName,FilterLogic,FilterPre,Enabled)\n"
+                "{\n"
+                f'"Branch" "{name}" "OR" "NO" "YES"\n'
+                "<SUBDATA Condition>\n"
+                '"LineR" "between" "0.01" "0.1"\n'
+                '"BusName" "=" "A \\"b\\"" ""\n'
+                "</SUBDATA>\n"
+                "}\n"
+            ],
+        )
+
+    def test_bad_condition(self):
+        with self.assertRaises(ValueError):
+            self.saw.define_filter("branch", ("LineR", ">"))
+
+
+class ReadWhereTestCase(unittest.TestCase):
+    """PowerWorldIO.read passes its where conditions to Simulator as a
+    filter instead of filtering the rows in Python."""
+
+    def setUp(self):
+        self.io = PowerWorldIO("fake.pwb")
+        self.io.esa = fake_saw()
+        self.calls = []
+        get = self.io.esa.GetParametersMultipleElement
+
+        def counted(ObjectType, ParamList, FilterName="", **kw):
+            self.calls.append(FilterName)
+            return get(ObjectType, ParamList, FilterName, **kw)
+
+        self.io.esa.GetParametersMultipleElement = counted
+
+    def test_where(self):
+        every = self.io.read(Branch, ["BranchDeviceType", "LineR"])
+        df = self.io.read(Branch, "LineR", where=("BranchDeviceType", "=", "Transformer"))
+        mask = every["BranchDeviceType"] == "Transformer"
+        self.assertGreater(mask.sum(), 0)
+        self.assertEqual(df.columns.tolist(), [*Branch.keys, "LineR"])
+        expected = every.loc[mask, [*Branch.keys, "LineR"]].reset_index(drop=True)
+        self.assertTrue(df.reset_index(drop=True).equals(expected))
+        self.assertEqual(self.calls[0], "")
+        self.assertTrue(self.calls[1].startswith("GWB_"))
+
+    def test_named_filter(self):
+        name = self.io.esa.define_filter("branch", ("LineR", ">", 0))
+        self.io.read(Branch, "LineR", where=name)
+        self.assertEqual(self.calls, [name])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from gridwb._network import bus_index, branch_mask, incidence
+from . import fake_saw, workbench_components
+
+workbench_components()
+from gridwb.workbench.grid.common import arc_incidence
+
+
+def dense_incidence(from_bus, to_bus, buses):
+    """Incidence matrix filled entry by entry: 1 at the from bus and -1
+    at the to bus."""
+    pos = {b: i for i, b in enumerate(buses)}
+    A = np.zeros((len(from_bus), len(buses)), dtype=int)
+    for k, (f, t) in enumerate(zip(from_bus, to_bus)):
+        A[k, pos[f]] = 1
+        A[k, pos[t]] = -1
+    return A
+
+
+class NetworkBuildersTestCase(unittest.TestCase):
+    """The shared builders in gridwb._network."""
+
+    def test_bus_index(self):
+        buses = np.array([40, 7, 1001, 3])
+        np.testing.assert_array_equal(bus_index([3, 40, 1001, 3], buses), [3, 0, 2, 3])
+        with self.assertRaises(KeyError):
+            bus_index([7, 8], buses)
+        with self.assertRaises(KeyError):
+            bus_index([2000], buses)
+        self.assertEqual(len(bus_index([], buses)), 0)
+
+    def test_branch_mask(self):
+        status = np.array(["Closed", "Open", "Closed", "Closed"])
+        kind = np.array(["Line", "Line", "Transformer", "Line"])
+        self.assertIsNone(branch_mask(status, kind))
+        self.assertEqual(branch_mask(status, kind, closed_only=True).tolist(), [1, 0, 1, 1])
+        self.assertEqual(branch_mask(status, kind, kind="line").tolist(), [1, 1, 0, 1])
+        self.assertEqual(
+            branch_mask(status, kind, closed_only=True, kind="transformer").tolist(), [0, 0, 1, 0]
+        )
+        with self.assertRaises(ValueError):
+            branch_mask(status, kind, kind="shunt")
+
+    def test_incidence(self):
+        f, t = np.array([0, 1, 2, 0]), np.array([1, 2, 3, 3])
+        A = incidence(f, t, 5)
+        self.assertIsInstance(A, csr_matrix)
+        np.testing.assert_array_equal(A.toarray(), dense_incidence(f, t, range(5)))
+        keep = np.array([True, False, True, True])
+        B = incidence(f, t, 5, keep=keep, sign=-1, fmt="csc", dtype=int)
+        self.assertEqual(B.format, "csc")
+        self.assertEqual(B.dtype, int)
+        np.testing.assert_array_equal(B.toarray(), -A.toarray()[keep])
+        np.testing.assert_array_equal(arc_incidence(np.c_[f, t]), A.toarray()[:, :4])
+
+
+class IncidenceMatrixTestCase(unittest.TestCase):
+    """SAW.get_incidence_matrix against a dense build."""
+
+    def setUp(self):
+        self.saw = fake_saw()
+        self.branch = self.saw.GetParametersMultipleElement(
+            "branch", ["BusNum", "BusNum:1", "LineCircuit", "LineStatus", "BranchDeviceType"]
+        )
+        key = ["BusNum", "BusNum:1", "LineCircuit"]
+        self.saw.change_parameters_multiple_element_df(
+            "branch", self.branch.iloc[[0, 4]][key].assign(LineStatus="Open")
+        )
+        self.branch.loc[[0, 4], "LineStatus"] = "Open"
+        self.buses = self.saw.ListOfDevices("bus")["BusNum"].to_numpy()
+
+    def expected(self, mask=None):
+        b = self.branch if mask is None else self.branch[mask]
+        return dense_incidence(b["BusNum"], b["BusNum:1"], self.buses)
+
+    def test_full(self):
+        A = self.saw.get_incidence_matrix()
+        self.assertIsInstance(A, np.ndarray)
+        np.testing.assert_array_equal(A, self.expected())
+        sparse = self.saw.get_incidence_matrix(full=False)
+        self.assertIsInstance(sparse, csr_matrix)
+        np.testing.assert_array_equal(sparse.toarray(), A)
+
+    def test_selection(self):
+        closed = self.branch["LineStatus"] == "Closed"
+        line = self.branch["BranchDeviceType"] == "Line"
+        self.assertGreater((~line).sum(), 0)
+        np.testing.assert_array_equal(
+            self.saw.get_incidence_matrix(closed_only=True), self.expected(closed)
+        )
+        np.testing.assert_array_equal(
+            self.saw.get_incidence_matrix(kind="transformer"), self.expected(~line)
+        )
+        np.testing.assert_array_equal(
+            self.saw.get_incidence_matrix(closed_only=True, kind="line"),
+            self.expected(closed & line),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import contextlib
+import io
+import os
+import unittest
+
+from gridwb.saw import SAW, COMError, PowerWorldError
+from gridwb.fake_simauto import FakeSimAuto, synthetic_case
+from . import fake_saw, workbench_components
+
+workbench_components()
+from gridwb.workbench.core.powerworld import PowerWorldIO
+
+
+class LazySAWTestCase(unittest.TestCase):
+    """SAW(lazy=True) defers the start-up queries until they are used."""
+
+    def saw(self, **kwargs):
+        pwcom = FakeSimAuto(synthetic_case(30, extra_fields=0))
+        self.calls = []
+        for name in ("GetFieldList", "GetParametersSingleElement"):
+            method = getattr(pwcom, name)
+
+            def counted(*args, name=name, method=method):
+                self.calls.append((name, args[0]))
+                return method(*args)
+
+            setattr(pwcom, name, counted)
+        saw = SAW("fake.pwb", pwcom=pwcom, **kwargs)
+        self.addCleanup(lambda: saw._empty_aux and os.unlink(saw._empty_aux))
+        return saw
+
+    def test_eager(self):
+        saw = self.saw()
+        self.assertIn(("GetParametersSingleElement", "PowerWorldSession"), self.calls)
+        self.assertIn(("GetFieldList", "branch"), self.calls)
+        self.assertIsNotNone(saw._empty_aux)
+
+    def test_nothing_at_start(self):
+        saw = self.saw(lazy=True)
+        self.assertEqual(self.calls, [])
+        self.assertIsNone(saw._empty_aux)
+
+    def test_version_on_first_use(self):
+        saw = self.saw(lazy=True)
+        version, build_date = saw.version, saw.build_date
+        self.assertEqual(self.calls, [("GetParametersSingleElement", "PowerWorldSession")])
+        eager = self.saw()
+        self.assertEqual((version, build_date), (eager.version, eager.build_date))
+
+    def test_empty_aux_on_first_use(self):
+        saw = self.saw(lazy=True)
+        path = saw.empty_aux
+        self.assertTrue(os.path.isfile(path))
+        self.assertEqual(saw.empty_aux, path)
+
+    def test_fields_on_first_use(self):
+        saw = self.saw(lazy=True)
+        df = saw.GetParametersMultipleElement("gen", ["BusNum", "GenID", "GenMW"])
+        lookups = [c for c in self.calls if c[0] == "GetFieldList"]
+        self.assertEqual(lookups, [("GetFieldList", "gen")])
+        eager = self.saw()
+        expected = eager.GetParametersMultipleElement("gen", ["BusNum", "GenID", "GenMW"])
+        self.assertTrue(df.equals(expected))
+
+
+class TSInitTestCase(unittest.TestCase):
+    """PowerWorldIO runs TSInitialize on first use of a transient field,
+    and only tries once."""
+
+    def setUp(self):
+        self.io = PowerWorldIO("fake.pwb")
+        self.io.esa = fake_saw()
+        self.scripts = []
+        pwcom = self.io.esa._pwcom
+        run = pwcom.RunScriptCommand
+
+        def counted(Statements):
+            self.scripts.append(Statements)
+            return run(Statements)
+
+        pwcom.RunScriptCommand = counted
+
+    def ensure_ts(self, fields=None):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.io.ensure_ts(fields)
+
+    def test_transient_fields_only(self):
+        self.ensure_ts(["BusNum", "BusPUVolt"])
+        self.assertEqual(self.scripts, [])
+        self.assertIs(self.io.ts_ready, False)
+        self.ensure_ts(["BusNum", "TSBusRad"])
+        self.ensure_ts(["TSGenDelta"])
+        self.ensure_ts()
+        self.assertEqual(self.scripts, ["TSInitialize()"])
+        self.assertIs(self.io.ts_ready, True)
+
+    def check_failure(self, error, result):
+        self.io.esa._pwcom.RunScriptCommand = error
+        self.ensure_ts()
+        self.ensure_ts(["TSBusRad"])
+        self.assertIsNone(self.io.ts_ready)
+        self.assertIsInstance(self.io.ts_error, result)
+
+    def test_powerworld_error(self):
+        self.check_failure(lambda Statements: ("Error: no transient models",), PowerWorldError)
+
+    def test_com_error(self):
+        calls = []
+
+        def error(Statements):
+            calls.append(Statements)
+            raise RuntimeError("RPC server unavailable")
+
+        self.check_failure(error, COMError)
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from scipy.sparse import csr_matrix, bmat
+
+from gridwb.saw import read_matlab_sparse
+from gridwb.fake_simauto import synthetic_case, write_ybus, write_jacobian
+
+
+class ReadMatlabSparseTestCase(unittest.TestCase):
+    """read_matlab_sparse on files written like SaveYbusInMatlabFormat and
+    SaveJacobian."""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "matrix.m")
+        self.ybus = synthetic_case(40, extra_fields=0).ybus()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_ybus(self):
+        write_ybus(self.path, self.ybus)
+        y = read_matlab_sparse(self.path, "Ybus", complex_values=True)
+        self.assertEqual(y.shape, self.ybus.shape)
+        self.assertTrue(np.allclose(y.toarray(), self.ybus.toarray(), atol=1e-6))
+
+    def test_jacobian(self):
+        write_jacobian(self.path, self.ybus)
+        g, b = csr_matrix(self.ybus.real), csr_matrix(self.ybus.imag)
+        expected = bmat([[-b, g], [-g, -b]]).toarray()
+        jac = read_matlab_sparse(self.path, "Jac")
+        self.assertTrue(np.allclose(jac.toarray(), expected, atol=1e-6))
+
+    def test_unexpected_statement(self):
+        write_ybus(self.path, self.ybus)
+        with open(self.path, "a") as f:
+            f.write("disp(Ybus);\n")
+        y = read_matlab_sparse(self.path, "Ybus", complex_values=True)
+        self.assertTrue(np.allclose(y.toarray(), self.ybus.toarray(), atol=1e-6))
+
+    def test_malformed_entry(self):
+        write_ybus(self.path, self.ybus)
+        with open(self.path, "a") as f:
+            f.write("Ybus(1,2) = --1.0 + j*(2.0);\n")
+        with self.assertRaises(ValueError):
+            read_matlab_sparse(self.path, "Ybus", complex_values=True)
+
+    def test_missing_matrix(self):
+        open(self.path, "w").close()
+        with self.assertRaises(ValueError):
+            read_matlab_sparse(self.path, "Ybus")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import tempfile
+import unittest
+
+from gridwb.saw import SAW
+from gridwb.fake_simauto import FakeSimAuto, synthetic_case
+
+
+class CountingSimAuto(FakeSimAuto):
+    """FakeSimAuto which counts the calls of every function."""
+
+    def __init__(self, case=None):
+        super().__init__(case)
+        self.calls = {}
+
+    def __getattribute__(self, name):
+        attr = super().__getattribute__(name)
+        if name[0].isupper() and callable(attr):
+            calls = super().__getattribute__("calls")
+            calls[name] = calls.get(name, 0) + 1
+        return attr
+
+
+class MetadataCacheTestCase(unittest.TestCase):
+    """On-disk field metadata (metadata_cache_dir) and lazy start-up."""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.case = synthetic_case(20, extra_fields=0)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def saw(self, **kwargs):
+        pwcom = CountingSimAuto(self.case)
+        return SAW("fake.pwb", pwcom=pwcom, metadata_cache_dir=self.dir.name, **kwargs)
+
+    def test_second_session_reads_from_disk(self):
+        first = self.saw()
+        self.assertGreater(first._pwcom.calls.get("GetFieldList", 0), 0)
+        second = self.saw()
+        self.assertEqual(second._pwcom.calls.get("GetFieldList", 0), 0)
+        df = second.GetParametersMultipleElement("bus", ["BusNum", "BusPUVolt"])
+        self.assertEqual(len(df), 20)
+
+    def test_lazy_start_makes_no_lookups(self):
+        self.saw()
+        saw = self.saw(lazy=True)
+        calls = saw._pwcom.calls
+        self.assertEqual(calls.get("GetParametersSingleElement", 0), 0)
+        self.assertEqual(calls.get("GetFieldList", 0), 0)
+
+        # The first lookup loads the file written by the first session.
+        saw.GetParametersMultipleElement("bus", ["BusNum", "BusPUVolt"])
+        self.assertEqual(calls.get("GetParametersSingleElement", 0), 1)
+        self.assertEqual(calls.get("GetFieldList", 0), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+import contextlib
+import io
+import unittest
+
+import numpy as np
+
+from gridwb._performance import initialize_bound, calculate_bound
+from gridwb._performance_jit import n2_violations
+from . import fake_saw
+
+
+def dense_n2_fast(c1_isl, count, lodf, f, lim):
+    """The dense N-2 bounding of SAW.n2_fast before it worked on tiles,
+    kept as a reference. Returns the final candidate pairs A0."""
+    A0 = np.ones([count, count]) - np.eye(count)
+    B0 = np.ones([count, count])
+    A = np.zeros([count, count])
+    denominator = np.ones([count, count])
+    numerator = np.ones([count, count])
+    tr = 1e-8
+    A0[c1_isl == 1, :] = 0
+    A0[:, c1_isl == 1] = 0
+    A0[abs(f) < tr, :] = 0
+    A0[:, abs(f) < tr] = 0
+    qq = lodf * (lodf.conj().T)
+    A0[abs(qq - 1) <= tr] = 0
+    denominator -= lodf * (lodf.conj().T)
+    numerator += np.diag(1 / f) @ lodf @ np.diag(f)
+    A[A0.nonzero()] = numerator[A0.nonzero()] / denominator[A0.nonzero()]
+    bp = np.diag(1 / (lim - f)) @ lodf @ np.diag(f)
+    bn = -np.diag(1 / (lim + f)) @ lodf @ np.diag(f)
+    bn -= np.diag(np.diag(bn))
+    bp -= np.diag(np.diag(bp))
+    B0 -= np.diag(np.diag(B0))
+    k, changing = 0, 1
+    while changing == 1 and k < 10:
+        oldA, oldB = np.sum(A0), np.sum(B0)
+        W, _, _ = initialize_bound(bp.max(0), bp.min(0), bn.max(0), bn.min(0), A)
+        A0[W <= 1] = 0
+        A[A0 == 0] = 0
+        Amax0, Amin0, Amax1, Amin1 = A.max(0), A.min(0), A.max(1), A.min(1)
+        Wbuf1 = np.maximum(np.outer(bp.max(1), Amax0), np.outer(bp.min(1), Amin0))
+        Wbuf2 = np.maximum(np.outer(bn.max(1), Amax0), np.outer(bn.min(1), Amin0))
+        W = calculate_bound(bp, bn, Amax1, Amin1, Wbuf1, Wbuf2)
+        B0[W <= 1] = 0
+        bn[B0 == 0] = 0
+        bp[B0 == 0] = 0
+        k += 1
+        if oldA == np.sum(A0) and oldB == np.sum(B0):
+            changing = 0
+    return A0
+
+
+def dense_n2_bruteforce(count, A0, lodf, lim, f):
+    """The N-2 enumeration of SAW.n2_bruteforce before it ran in
+    parallel, kept as a reference. Returns the (i, j, violations) rows."""
+    rows = []
+    for i in range(count - 1):
+        for j in range(i + 1, count):
+            if not A0[i, j]:
+                continue
+            det = lodf[i, i] * lodf[j, j] - lodf[i, j] * lodf[j, i]
+            if det == 0:
+                continue
+            xq_0 = (lodf[j, j] * f[i] - lodf[i, j] * f[j]) / det
+            xq_1 = (lodf[i, i] * f[j] - lodf[j, i] * f[i]) / det
+            f_new = f - lodf[:, i] * xq_0 - lodf[:, j] * xq_1
+            num = np.sum(abs(f_new) > lim) - (f_new[i] > lim[i]) - (f_new[j] > lim[j])
+            if num > 0:
+                rows.append((i, j, num))
+    return np.array(rows, dtype=float).reshape(-1, 3)
+
+
+class N2TestCase(unittest.TestCase):
+    """Tiled SAW.n2_fast and parallel SAW.n2_bruteforce against the dense
+    versions they replaced."""
+
+    def setUp(self):
+        self.saw = fake_saw()
+        rng = np.random.default_rng(7)
+        self.count = count = 60
+        lodf = rng.uniform(-0.4, 0.4, (count, count))
+        lodf[rng.random((count, count)) < 0.8] = 0
+        np.fill_diagonal(lodf, -1)
+        self.lodf = lodf
+        self.f = rng.uniform(-100, 100, count)
+        self.f[3] = 0
+        self.lim = np.abs(self.f) * rng.uniform(3, 8, count) + 5
+        self.c1 = np.zeros(count)
+        self.c1[[5, 17]] = 1
+
+    def run_quietly(self, method, *args, **kw):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return method(*args, **kw)
+
+    def expected(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            A0 = dense_n2_fast(self.c1, self.count, self.lodf.copy(), self.f, self.lim)
+        return A0, dense_n2_bruteforce(self.count, A0, self.lodf, self.lim, self.f)
+
+    def test_n2_fast(self):
+        A0, expected = self.expected()
+        self.assertGreater(len(expected), 0)
+        self.assertLess(np.sum(A0), self.count * (self.count - 1) / 2)
+        for tile in (None, 7):
+            secure, result = self.run_quietly(
+                self.saw.n2_fast, self.c1, self.count, self.lodf, self.f, self.lim, tile=tile
+            )
+            self.assertFalse(secure)
+            np.testing.assert_array_equal(result, expected)
+
+    def test_n2_bruteforce(self):
+        A0, expected = self.expected()
+        for workers, chunk in ((1, 2**20), (3, 2**20), (1, 5), (3, 1)):
+            secure, result = self.run_quietly(
+                self.saw.n2_bruteforce, self.count, A0.astype(bool), self.lodf,
+                self.lim, self.f, workers=workers, chunk=chunk,
+            )
+            self.assertFalse(secure)
+            np.testing.assert_array_equal(result, expected)
+
+    def test_n2_bruteforce_secure(self):
+        A0 = np.zeros((self.count, self.count), dtype=bool)
+        secure, result = self.run_quietly(
+            self.saw.n2_bruteforce, self.count, A0, self.lodf, self.lim, self.f
+        )
+        self.assertTrue(secure)
+        self.assertIsNone(result)
+
+
+class N2ViolationsTestCase(unittest.TestCase):
+    """The n2_violations kernel writes each row's violations from its
+    offset on and counts the singular pairs."""
+
+    def test_rows(self):
+        rng = np.random.default_rng(11)
+        count = 12
+        lodf = rng.uniform(-0.5, 0.5, (count, count))
+        np.fill_diagonal(lodf, -1)
+        # Outage of 2 and 9 together is singular
+        lodf[2, 9] = lodf[9, 2] = 1.0
+        f = rng.uniform(-100, 100, count)
+        lim = np.abs(f) * 1.1
+        A0 = np.triu(rng.random((count, count)) < 0.7, 1)
+        A0[2, 9] = True
+
+        rows = np.array([0, 2, 5, 9])
+        sizes = A0[rows].sum(axis=1)
+        offsets = np.r_[0, np.cumsum(sizes)[:-1]].astype(np.int64)
+        out = np.full((sizes.sum(), 3), -1.0)
+        counts = np.zeros(len(rows), dtype=np.int64)
+        fake = np.zeros(len(rows), dtype=np.int64)
+        n2_violations(lodf, f, lim, A0, rows, offsets, out, counts, fake)
+
+        expected = dense_n2_bruteforce(count, A0, lodf, lim, f)
+        self.assertGreater(len(expected), 0)
+        for r, i in enumerate(rows):
+            found = out[offsets[r] : offsets[r] + counts[r]]
+            np.testing.assert_array_equal(found, expected[expected[:, 0] == i])
+        self.assertEqual(fake.tolist(), [0, 1, 0, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+import numpy as np
+
+from . import fake_saw, workbench_components
+
+Branch = workbench_components().Branch
+from gridwb.workbench.core.powerworld import PowerWorldIO
+
+
+class NetworkSnapshotTestCase(unittest.TestCase):
+    """PowerWorldIO.network follows writes made through the IO."""
+
+    def setUp(self):
+        self.io = PowerWorldIO("fake.pwb")
+        self.io.esa = fake_saw()
+
+    def test_open_branch(self):
+        network = self.io.network
+        n = network.nbranch
+        closed = network.incidence(closed_only=True)
+        self.assertEqual(closed.shape[0], n)
+
+        first = np.arange(n) == 0
+        self.io[Branch, first, 'LineStatus'] = 'Open'
+
+        network = self.io.network
+        self.assertEqual(network.branch['LineStatus'].tolist()[:2], ['Open', 'Closed'])
+        closed = network.incidence(closed_only=True)
+        self.assertEqual(closed.shape[0], n - 1)
+        # Branch 0 is the row left out
+        self.assertTrue((closed != network.incidence()[1:]).nnz == 0)
+
+    def test_other_types_keep_snapshot(self):
+        network = self.io.network
+        self.io.refresh_network('Contingency')
+        self.assertIs(self.io.network, network)
+        self.io.refresh_network('Branch')
+        self.assertIsNot(self.io.network, network)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+import math
+import unittest
+import warnings
+
+import networkx as nx
+import numpy as np
+
+from gridwb._robustness import rcf, energy_flow_matrix, ecological_metrics
+from . import fake_saw
+
+
+def graph_rcf(from_bus, to_bus, circuit, flow, max_percent):
+    """RCF on a networkx MultiDiGraph, as SAW.run_robustness_analysis
+    computed it before it was vectorized, with every parallel branch
+    using its own tolerance."""
+    graph = nx.MultiDiGraph()
+    for u, v, key, mw, pct in zip(from_bus, to_bus, circuit, flow, max_percent):
+        if mw < 0:
+            u, v = v, u
+        graph.add_edge(u, v, key=key, mw=abs(mw), tolerance=100 / (pct + 0.000001))
+    nodes = [u for u, deg in graph.out_degree() if deg]
+    outflow = {u: sum(d["mw"] for _, _, d in graph.out_edges(u, data=True)) for u in nodes}
+    total_distribution = sum(outflow.values())
+    result = 0
+    for u in nodes:
+        total = outflow[u] or 0.000001
+        nodal_robust = 0
+        for _, _, d in graph.out_edges(u, data=True):
+            p = d["mw"] / total
+            nodal_robust -= d["tolerance"] * p * math.log(p + 1e-6, 10)
+        result += nodal_robust * outflow[u] / total_distribution
+    return result
+
+
+def dense_efm(gen_bus, gen_flow, load_bus, load_flow, f, t, flow, loss, n_bus):
+    """The energy flow matrix built entry by entry in a dense array, with
+    one actor per generator."""
+    n_gen = len(gen_bus)
+    T = np.zeros((n_gen + n_bus + 3, n_gen + n_bus + 3))
+    for g, (b, mw) in enumerate(zip(gen_bus, gen_flow)):
+        T[0, 1 + g] = mw
+        T[1 + g, 1 + n_gen + b] = mw
+    for b, mw in zip(load_bus, load_flow):
+        T[1 + n_gen + b, 1 + n_gen + n_bus] += mw
+    for i, j, mw, lost in zip(f, t, flow, loss):
+        if mw > 0:
+            T[1 + n_gen + i, 1 + n_gen + j] += abs(mw)
+        else:
+            T[1 + n_gen + j, 1 + n_gen + i] += abs(mw)
+        T[1 + n_gen + i, 2 + n_gen + n_bus] += abs(lost)
+    return T
+
+
+def dense_metrics(T):
+    """Ecological metrics from a dense EFM with a dense Leontief inverse,
+    as SAW.run_ecological_analysis computed them before they were
+    vectorized."""
+    s = len(T)
+    P = T.T
+    P_rsum = P.sum(axis=1)
+    Q = np.zeros((s, s))
+    for i in range(s):
+        if P_rsum[i] > 0 and P_rsum[1] != 0:
+            Q[i] = P[i] / P_rsum[1]
+    N = np.linalg.inv(np.eye(s) - Q)
+    tstp = T.sum()
+    tstf = T[0].sum() + T[2 : s - 2].sum()
+    d_N = N.diagonal()[1 : s - 2]
+    tstc = np.dot((d_N - 1) / d_N, P_rsum[1 : s - 2])
+    T_csum, T_rsum = T.sum(axis=0), T.sum(axis=1)
+    asc = dc = 0
+    for i in range(s):
+        for j in range(s):
+            if T[i, j] > 0:
+                asc += T[i, j] * math.log(T[i, j] * tstp / (T_rsum[i] * T_csum[j]), 2)
+                dc -= T[i, j] * math.log(T[i, j] / tstp, 2)
+    reco = -(asc / dc) * math.log(asc / dc)
+    return reco, asc, dc, tstc, tstc / tstf, dc - asc
+
+
+class RCFTestCase(unittest.TestCase):
+    """The vectorized RCF metric against the graph-based computation."""
+
+    def setUp(self):
+        self.saw = fake_saw()
+        self.branch = self.saw.GetParametersMultipleElement(
+            "branch", ["BusNum", "BusNum:1", "LineCircuit", "LineMW", "LineMaxPercent"]
+        )
+
+    def test_case(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            value = self.saw.run_robustness_analysis()
+        b = self.branch
+        expected = graph_rcf(
+            b["BusNum"], b["BusNum:1"], b["LineCircuit"], b["LineMW"], b["LineMaxPercent"]
+        )
+        self.assertAlmostEqual(value, expected, places=9)
+
+    def test_parallel_branches_and_operating_points(self):
+        rng = np.random.default_rng(5)
+        f = np.array([0, 0, 1, 1, 2, 3, 0])
+        t = np.array([1, 1, 2, 3, 3, 0, 2])
+        circuit = ["1", "2", "1", "1", "1", "1", "1"]
+        flow = rng.uniform(-50, 50, (3, len(f)))
+        flow[1, 2] = 0
+        pct = rng.uniform(10, 90, (3, len(f)))
+        values = rcf(f, t, flow, pct)
+        self.assertEqual(values.shape, (3,))
+        for k in range(3):
+            expected = graph_rcf(f, t, circuit, flow[k], pct[k])
+            self.assertAlmostEqual(values[k], expected, places=9)
+            self.assertAlmostEqual(rcf(f, t, flow[k], pct[k]), expected, places=9)
+
+
+class EcologicalTestCase(unittest.TestCase):
+    """The sparse energy flow matrix and its metrics against dense
+    computations."""
+
+    def setUp(self):
+        self.saw = fake_saw()
+        rng = np.random.default_rng(9)
+        n_bus, n_gen, n_load, n_branch = 8, 4, 5, 12
+        self.args = (
+            rng.integers(0, n_bus, n_gen),
+            rng.uniform(10, 100, n_gen),
+            rng.integers(0, n_bus, n_load),
+            rng.uniform(10, 100, n_load),
+            rng.integers(0, n_bus, n_branch),
+            rng.integers(0, n_bus, n_branch),
+            rng.uniform(-80, 80, n_branch),
+            rng.uniform(0, 2, n_branch),
+            n_bus,
+        )
+
+    def test_efm(self):
+        EFM = energy_flow_matrix(*self.args)
+        np.testing.assert_allclose(EFM.toarray(), dense_efm(*self.args))
+
+    def test_merged_generators(self):
+        gen_bus, gen_flow = self.args[:2]
+        gen_bus[1] = gen_bus[0]
+        EFM = energy_flow_matrix(*self.args, split_generator=False)
+        buses, actor = np.unique(gen_bus, return_inverse=True)
+        merged = np.bincount(actor, weights=gen_flow)
+        expected = dense_efm(buses, merged, *self.args[2:])
+        np.testing.assert_allclose(EFM.toarray(), expected)
+
+    def test_metrics(self):
+        T = dense_efm(*self.args)
+        np.testing.assert_allclose(ecological_metrics(T, block=3), dense_metrics(T))
+
+    def test_case(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            *metrics, EFM = self.saw.run_ecological_analysis()
+        T = EFM.toarray()
+        self.assertGreater(T.sum(), 0)
+        np.testing.assert_allclose(metrics, dense_metrics(T))
+
+
+if __name__ == "__main__":
+    unittest.main()
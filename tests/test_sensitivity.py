@@ -0,0 +1,152 @@
+import contextlib
+import io
+import unittest
+
+import numpy as np
+
+from gridwb.sensitivity import DCSensitivity
+from . import fake_saw
+
+
+def dense_sensitivities(Bf, Cft, slack):
+    """PTDF and LODF from a dense inverse of the reduced Bbus. LODF rows
+    of outages which split the network are zero, but for the -1 on the
+    diagonal."""
+    Bf, Cft = Bf.toarray(), Cft.toarray()
+    n_branch, n_bus = Bf.shape
+    noslack = np.delete(np.arange(n_bus), slack)
+    Bbus = Cft.T @ Bf
+    ptdf = np.zeros((n_branch, n_bus))
+    ptdf[:, noslack] = Bf[:, noslack] @ np.linalg.inv(Bbus[np.ix_(noslack, noslack)])
+    H = ptdf @ Cft.T
+    div = 1 - np.diag(H)
+    islands = np.abs(div) <= 1e-10
+    lodf = H / np.where(islands, np.inf, div)
+    np.fill_diagonal(lodf, -1)
+    return ptdf, lodf.T, islands
+
+
+class DCSensitivityTestCase(unittest.TestCase):
+    """PTDF and LODF rows and columns from one factorization against a
+    dense inverse."""
+
+    def setUp(self):
+        self.saw = fake_saw()
+        self.sens = self.saw.get_sensitivity()
+        self.ptdf, self.lodf, self.isl = dense_sensitivities(
+            self.sens.Bf, self.sens.Cft, self.sens.slack
+        )
+
+    def test_ptdf(self):
+        sens = self.sens
+        np.testing.assert_allclose(sens.ptdf_columns(), self.ptdf, atol=1e-10)
+        buses = [4, 0, 4, sens.slack]
+        np.testing.assert_allclose(sens.ptdf_columns(buses), self.ptdf[:, buses], atol=1e-10)
+        branches = [7, 2, 7]
+        np.testing.assert_allclose(sens.ptdf_rows(branches), self.ptdf[branches], atol=1e-10)
+        np.testing.assert_allclose(sens.ptdf_rows(), self.ptdf, atol=1e-10)
+        np.testing.assert_allclose(self.saw.get_ptdf_matrix_fast(), self.ptdf, atol=1e-10)
+
+    def test_lodf(self):
+        sens = self.sens
+        self.assertTrue(self.isl.any())
+        np.testing.assert_array_equal(sens.islands(), self.isl)
+        np.testing.assert_allclose(sens.lodf(), self.lodf, atol=1e-10)
+        outages, monitored = [3, 11, 3], [0, 3, 20, 11]
+        np.testing.assert_allclose(
+            sens.lodf(outages, monitored), self.lodf[np.ix_(outages, monitored)], atol=1e-10
+        )
+        np.testing.assert_allclose(self.saw.get_lodf_matrix_fast(), self.lodf, atol=1e-10)
+
+    def test_cache_limit(self):
+        sens = DCSensitivity(
+            self.sens.Cft.T @ self.sens.Bf, self.sens.Bf, self.sens.Cft,
+            self.sens.slack, max_columns=3,
+        )
+        for buses in ([0, 1], [2, 3], [1, 5]):
+            np.testing.assert_allclose(
+                sens.ptdf_columns(buses), self.ptdf[:, buses], atol=1e-10
+            )
+        self.assertEqual(list(sens._ptdf_cols), [3, 1, 5])
+        sens.ptdf_columns([0], cache=False)
+        self.assertNotIn(0, sens._ptdf_cols)
+        sens.clear_cache()
+        self.assertEqual(len(sens._ptdf_cols), 0)
+
+    def test_operator(self):
+        op = self.sens.ptdf_operator()
+        rng = np.random.default_rng(2)
+        p = rng.normal(size=self.sens.n_bus)
+        F = rng.normal(size=(self.sens.n_branch, 2))
+        np.testing.assert_allclose(op @ p, self.ptdf @ p, atol=1e-10)
+        np.testing.assert_allclose(op.T @ F, self.ptdf.T @ F, atol=1e-10)
+
+
+class ScreenN1TestCase(unittest.TestCase):
+    """Blocked N-1 screening against post-contingency flows from the
+    dense LODF."""
+
+    def setUp(self):
+        self.saw = fake_saw()
+        self.sens = self.saw.get_sensitivity()
+        _, self.lodf, self.isl = dense_sensitivities(
+            self.sens.Bf, self.sens.Cft, self.sens.slack
+        )
+        rng = np.random.default_rng(4)
+        n = self.sens.n_branch
+        self.flows = rng.uniform(-100, 100, n)
+        self.limits = np.abs(self.flows) * rng.uniform(1.05, 2, n)
+        self.limits[5] = 0  # no limit
+
+    def expected(self, outages, monitored, threshold=1.0):
+        post = self.flows[monitored] + self.lodf[np.ix_(outages, monitored)] * (
+            self.flows[outages, None]
+        )
+        limits = np.where(self.limits == 0, np.inf, self.limits)[monitored]
+        loading = np.abs(post) / limits
+        loading[self.isl[outages]] = 0
+        i, j = np.nonzero(loading > threshold)
+        return outages[i], monitored[j], loading[i, j]
+
+    def check(self, outages=None, monitored=None, **kw):
+        n = self.sens.n_branch
+        df = self.sens.screen_n1(self.flows, self.limits, outages, monitored, **kw)
+        outages = np.arange(n) if outages is None else np.asarray(outages)
+        monitored = np.arange(n) if monitored is None else np.asarray(monitored)
+        ctg, branch, loading = self.expected(outages, monitored, kw.get("threshold", 1.0))
+        self.assertGreater(len(ctg), 0)
+        self.assertEqual(df["Contingency"].tolist(), ctg.tolist())
+        self.assertEqual(df["Branch"].tolist(), branch.tolist())
+        np.testing.assert_allclose(df["Loading"], loading)
+
+    def test_blocks(self):
+        self.check()
+        # A tiny budget gives one outage per block
+        self.check(max_bytes=1)
+        self.check(max_bytes=8 * 300, workers=3)
+
+    def test_subsets(self):
+        every = np.arange(self.sens.n_branch)
+        ctg, branch, _ = self.expected(every, every)
+        outages = np.unique(ctg)[::2]
+        monitored = np.r_[np.unique(branch)[::2], 5]
+        self.check(outages=outages, monitored=monitored)
+        self.check(threshold=0.9, max_bytes=8 * 500)
+
+    def test_fast_n1_test(self):
+        self.saw.pw_order = True
+        br = self.saw.GetParametersMultipleElement(
+            "branch", ["LineMW", "LineLimMVA", "LineStatus"]
+        )
+        self.saw.pw_order = False
+        br = br[br["LineStatus"] != "Open"]
+        self.flows = br["LineMW"].to_numpy(dtype=float)
+        self.limits = br["LineLimMVA"].to_numpy(dtype=float)
+        n = self.sens.n_branch
+        ctg, _, _ = self.expected(np.arange(n), np.arange(n))
+        with contextlib.redirect_stdout(io.StringIO()):
+            secure = self.saw.fast_n1_test(workers=2)
+        self.assertEqual(secure, len(ctg) == 0)
+
+if __name__ == "__main__":
+    unittest.main()
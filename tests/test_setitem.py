@@ -0,0 +1,89 @@
+import unittest
+
+import numpy as np
+
+from . import fake_saw, workbench_components
+
+Gen = workbench_components().Gen
+from gridwb.workbench.core.powerworld import PowerWorldIO
+
+
+class DeltaWriteTestCase(unittest.TestCase):
+    """PowerWorldIO.__setitem__ sends only the rows and fields that
+    change."""
+
+    def setUp(self):
+        self.io = PowerWorldIO("fake.pwb")
+        self.io.esa = fake_saw()
+        self.sent = []
+        change = self.io.esa.change_parameters_multiple_element_df
+
+        def counted(ObjectType, df):
+            self.sent.append(df.copy())
+            return change(ObjectType, df)
+
+        self.io.esa.change_parameters_multiple_element_df = counted
+        self.gens = self.io[Gen, ["GenMW", "GenMVR", "GenVoltSet"]]
+
+    def read(self):
+        return self.io[Gen, ["GenMW", "GenMVR", "GenVoltSet"]]
+
+    def test_unchanged_fields(self):
+        self.io[Gen, "GenMW"] = self.gens["GenMW"].to_numpy()
+        self.io[Gen, ["GenMW", "GenMVR"]] = self.gens[["GenMW", "GenMVR"]].to_numpy()
+        self.assertEqual(self.sent, [])
+
+    def test_changed_rows(self):
+        mw = self.gens["GenMW"].to_numpy().copy()
+        mw[[1, 3]] += 10
+        self.io[Gen, ["GenMW", "GenVoltSet"]] = np.c_[mw, self.gens["GenVoltSet"]]
+        self.assertEqual(len(self.sent), 1)
+        df = self.sent[0]
+        self.assertEqual(df.columns.tolist(), ["BusNum", "GenID", "GenMW"])
+        self.assertEqual(df.index.tolist(), [1, 3])
+        np.testing.assert_allclose(self.read()["GenMW"], mw)
+
+    def test_where(self):
+        where = np.arange(len(self.gens)) < 2
+        self.io[Gen, where, "GenMVR"] = self.gens["GenMVR"].to_numpy()[:2] + 1
+        self.assertEqual(self.sent[0].index.tolist(), [0, 1])
+        self.assertEqual(self.sent[0].columns.tolist(), ["BusNum", "GenID", "GenMVR"])
+
+    def test_whole_frames(self):
+        frame = self.gens.copy()
+        self.io[Gen] = frame
+        self.assertEqual(len(self.sent[0]), len(frame))
+
+        frame = frame.copy()
+        frame.loc[2, "GenVoltSet"] = 1.04
+        self.io[Gen] = frame
+        self.assertEqual(self.sent[1].index.tolist(), [2])
+        self.assertEqual(self.sent[1].columns.tolist(), ["BusNum", "GenID", "GenVoltSet"])
+
+        self.io[Gen] = frame.copy()
+        self.assertEqual(len(self.sent), 2)
+        self.assertEqual(self.read()["GenVoltSet"][2], 1.04)
+
+    def test_whole_frame_after_field_write(self):
+        self.io[Gen] = self.gens.copy()
+        # The field form changes the case behind the last frame sent
+        self.io[Gen, "GenMW"] = self.gens["GenMW"].to_numpy() + 1
+        self.io[Gen] = self.gens.copy()
+        self.assertEqual(len(self.sent), 3)
+        self.assertEqual(len(self.sent[2]), len(self.gens))
+        np.testing.assert_allclose(self.read()["GenMW"], self.gens["GenMW"])
+
+    def test_other_columns_sent_whole(self):
+        self.io[Gen] = self.gens.copy()
+        self.io[Gen] = self.gens[["BusNum", "GenID", "GenMW"]].copy()
+        self.assertEqual(len(self.sent[1]), len(self.gens))
+
+    def test_batch_sends_whole(self):
+        with self.io.batch():
+            self.io[Gen, "GenMW"] = self.gens["GenMW"].to_numpy()
+        self.assertEqual(len(self.sent), 1)
+        self.assertEqual(len(self.sent[0]), len(self.gens))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+import numpy as np
+
+from . import fake_saw
+
+
+class NativeYbusTestCase(unittest.TestCase):
+    """SAW.get_ybus(native=True) against the Ybus file written by
+    SaveYbusInMatlabFormat."""
+
+    def setUp(self):
+        self.saw = fake_saw()
+        key = self.saw.get_key_field_list("branch")
+        branch = self.saw.GetParametersMultipleElement("branch", key + ["LineC"])
+        rng = np.random.default_rng(3)
+        branch["LineG"] = rng.uniform(0, 0.05, len(branch))
+        self.saw.change_parameters_multiple_element_df("branch", branch[key + ["LineG"]].copy())
+        branch = branch.iloc[:2][key].copy().assign(LineStatus="Open")
+        self.saw.change_parameters_multiple_element_df("branch", branch)
+
+    def check(self):
+        native = self.saw.get_ybus(full=True, native=True)
+        file = self.saw.get_ybus(full=True)
+        # The file follows PowerWorld's bus order
+        pw_order = self.saw.pw_order
+        self.saw.pw_order = True
+        file_buses = self.saw.GetParametersMultipleElement("bus", ["BusNum"])
+        self.saw.pw_order = pw_order
+        buses = self.saw.GetParametersMultipleElement("bus", ["BusNum"])
+        pos = {b: i for i, b in enumerate(file_buses["BusNum"].astype(int))}
+        order = [pos[b] for b in buses["BusNum"].astype(int)]
+        np.testing.assert_allclose(native, file[np.ix_(order, order)], atol=1e-5)
+
+    def test_line_conductance(self):
+        self.check()
+        g = self.saw.GetParametersMultipleElement("branch", ["LineG"])["LineG"]
+        self.assertTrue((g > 0).all())
+
+    def test_pw_order(self):
+        self.saw.pw_order = True
+        self.check()
+
+
+if __name__ == "__main__":
+    unittest.main()